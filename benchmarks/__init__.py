@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for habits.txt.
+
+Each module is a standalone script, to be run from the repository root, e.g.:
+
+    python -m benchmarks.bench_parser
+"""
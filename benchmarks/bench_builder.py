@@ -0,0 +1,33 @@
+"""
+Show that building the state at a date scales linearly with the number of directives.
+
+Usage: python -m benchmarks.bench_builder [MAX_DIRECTIVES]
+"""
+
+import datetime as dt
+import sys
+
+import habits_txt.builder as builder
+import habits_txt.parser as parser
+from benchmarks.common import best_time, generate_journal
+
+
+def main(max_directives: int = 1_000_000):
+    n_directives = 1_000
+    while n_directives <= max_directives:
+        # About 8 directives a day with 10 habits
+        lines = generate_journal(n_directives // 8, retrack_every=90)
+        directives = list(parser.iter_directives(lines))
+        seconds = best_time(
+            lambda: builder.get_state_at_date(directives, dt.date.max),
+            repeat=3 if len(directives) < 100_000 else 1,
+        )
+        print(
+            f"{len(directives):>10,} directives: {seconds:>8.3f} s "
+            f"{seconds / len(directives) * 1e6:>6.2f} us/directive"
+        )
+        n_directives *= 10
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
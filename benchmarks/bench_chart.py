@@ -0,0 +1,75 @@
+"""
+Compare computing a weekly chart with one `info` call per week and in a single pass, then time
+the single pass with finer and coarser intervals and a rolling window.
+
+Usage: python -m benchmarks.bench_chart [N_DAYS]
+"""
+
+import datetime as dt
+import functools
+import os
+import sys
+import tempfile
+import typing
+
+import habits_txt.defaults as defaults
+import habits_txt.journal as journal
+from benchmarks.common import best_time, generate_journal, write_journal
+
+
+def _info_by_interval(journal_file: str, end_date: dt.date) -> None:
+    interval_td = dt.timedelta(weeks=1)
+    start_date = journal.filter(journal_file, None, end_date, None, None)[0].date
+    while start_date <= end_date:
+        journal.info(
+            journal_file,
+            start_date,
+            start_date + interval_td - dt.timedelta(days=1),
+            None,
+            None,
+        )
+        start_date += interval_td
+
+
+def main(n_days: int = 3 * 365):
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the journal cache out of the user data
+        defaults.APPDATA_PATH = os.path.join(directory, "appdata")
+        journal_file = os.path.join(directory, "habits.journal")
+        lines = generate_journal(n_days)
+        write_journal(journal_file, lines)
+        end_date = dt.date(2000, 1, 1) + dt.timedelta(days=n_days)
+        print(f"{len(lines):,} lines, {n_days // 7:,} weeks")
+
+        timings: list[typing.Tuple[str, typing.Callable[[], typing.Any]]] = [
+            ("info by week", lambda: _info_by_interval(journal_file, end_date))
+        ]
+        for interval in ("daily", "weekly", "monthly", "yearly"):
+            timings.append(
+                (
+                    interval,
+                    functools.partial(
+                        journal.get_interval_completions,
+                        journal_file,
+                        interval,
+                        None,
+                        end_date,
+                        None,
+                        None,
+                    ),
+                )
+            )
+        timings.append(
+            (
+                "rolling 30d",
+                lambda: journal.get_rolling_completions(
+                    journal_file, 30, None, end_date, None, None
+                ),
+            )
+        )
+        for name, func in timings:
+            print(f"{name:>12}: {best_time(func, repeat=1):>8.3f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Compare the specialized date matchers with the datetime_matcher and strptime path.
+
+Usage: python -m benchmarks.bench_dates [N_DATES]
+"""
+
+import datetime as dt
+import sys
+
+import habits_txt.parser as parser
+from benchmarks.common import best_time
+
+DATE_FMTS = ("%Y-%m-%d", "%d/%m/%Y", "%d %b %Y")
+
+
+def main(n_dates: int = 100_000):
+    start_date = dt.date(2000, 1, 1)
+    dates = [start_date + dt.timedelta(days=i % 10_000) for i in range(n_dates)]
+
+    for date_fmt in DATE_FMTS:
+        lines = [f'{date.strftime(date_fmt)} "Habit" yes' for date in dates]
+        matchers = {
+            "strptime": lambda line: parser._match_date_strptime(date_fmt, line),
+            "specialized": parser._get_date_matcher(date_fmt),
+        }
+        rates = {}
+        for name, match in matchers.items():
+            seconds = best_time(lambda: [match(line) for line in lines])
+            rates[name] = n_dates / seconds
+        print(
+            f"{date_fmt:>10}: "
+            + ", ".join(f"{name} {rate:,.0f} dates/s" for name, rate in rates.items())
+            + f" ({rates['specialized'] / rates['strptime']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Compare next-date lookups through croniter with the compiled day schedule, and counting
+expected dates by walking them with counting them per month.
+
+Usage: python -m benchmarks.bench_frequency [N_CALLS]
+"""
+
+import datetime as dt
+import sys
+
+import croniter
+
+import habits_txt.cron as cron
+from benchmarks.common import FREQUENCIES, best_time
+
+
+def main(n_calls: int = 20_000):
+    dates = [dt.date(2000, 1, 1) + dt.timedelta(days=i) for i in range(n_calls)]
+    for frequency in FREQUENCIES:
+        cron_str = f"0 0 {frequency}"
+        schedule = cron.compile(cron_str)
+        assert schedule is not None, f"Unsupported frequency: {frequency}"
+
+        def with_croniter():
+            for date in dates:
+                croniter.croniter(
+                    cron_str, dt.datetime.combine(date, dt.time())
+                ).get_next(dt.datetime).date()
+
+        def with_schedule():
+            for date in dates:
+                schedule.next_date(date)
+
+        croniter_rate = n_calls / best_time(with_croniter)
+        schedule_rate = n_calls / best_time(with_schedule)
+        print(
+            f"{frequency:>10}: croniter {croniter_rate:>10,.0f} calls/s, "
+            f"schedule {schedule_rate:>10,.0f} calls/s, "
+            f"{schedule_rate / croniter_rate:.1f}x"
+        )
+
+    start_date, end_date = dt.date(2000, 1, 1), dt.date(2004, 12, 31)
+    for frequency in FREQUENCIES:
+        schedule = cron.compile(f"0 0 {frequency}")
+        assert schedule is not None, f"Unsupported frequency: {frequency}"
+
+        def walk():
+            n_dates, date = 0, start_date
+            while (date := schedule.next_date(date)) <= end_date:
+                n_dates += 1
+            return n_dates
+
+        walk_seconds = best_time(walk)
+        count_seconds = best_time(lambda: schedule.count(start_date, end_date))
+        print(
+            f"{frequency:>10}: 5 years walked in {walk_seconds * 1e3:>7.2f} ms, "
+            f"counted in {count_seconds * 1e3:>5.2f} ms, "
+            f"{walk_seconds / count_seconds:.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""
+Measure how computing the stats of `info` in several processes scales with the number of jobs.
+
+The journal is loaded in each run, the load time is shown to tell the stats time apart.
+
+Usage: python -m benchmarks.bench_info [N_DAYS] [N_HABITS] [MAX_JOBS]
+"""
+
+import datetime as dt
+import os
+import sys
+import tempfile
+
+import habits_txt.defaults as defaults
+import habits_txt.journal as journal
+from benchmarks.common import best_time, generate_journal, write_journal
+
+
+def main(
+    n_days: int = 5 * 365, n_habits: int = 300, max_jobs: int = os.cpu_count() or 1
+):
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the journal cache out of the user data
+        defaults.APPDATA_PATH = os.path.join(directory, "appdata")
+        journal_file = os.path.join(directory, "habits.journal")
+        lines = generate_journal(n_days, n_habits, retrack_every=90)
+        write_journal(journal_file, lines)
+        end_date = dt.date(2000, 1, 1) + dt.timedelta(days=n_days)
+
+        n_matches = len(
+            journal._filter_state(journal_file, None, end_date, None, None)[2]
+        )
+        load_seconds = best_time(
+            lambda: journal._filter_state(journal_file, None, end_date, None, None),
+            repeat=1,
+        )
+        print(
+            f"{len(lines):,} lines, {n_matches:,} tracking intervals, "
+            f"load {load_seconds:.2f} s"
+        )
+
+        jobs = 1
+        baseline = None
+        while jobs <= max_jobs:
+            seconds = best_time(
+                lambda: journal.info(
+                    journal_file, None, end_date, None, None, jobs=jobs
+                ),
+                repeat=1,
+            )
+            stats_seconds = seconds - load_seconds
+            baseline = baseline or stats_seconds
+            print(
+                f"{jobs:>4} jobs: {seconds:>7.2f} s, stats {stats_seconds:>7.2f} s "
+                f"{baseline / stats_seconds:>5.1f}x"
+            )
+            jobs *= 2
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
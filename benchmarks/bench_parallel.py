@@ -0,0 +1,33 @@
+"""
+Measure how multi-process parsing scales with the number of jobs.
+
+Usage: python -m benchmarks.bench_parallel [N_DAYS] [MAX_JOBS]
+"""
+
+import os
+import sys
+
+import habits_txt.parser as parser
+from benchmarks.common import best_time, generate_journal
+
+
+def main(n_days: int = 20_000, max_jobs: int = os.cpu_count() or 1):
+    data = ("\n".join(generate_journal(n_days)) + "\n").encode()
+    print(f"{len(data) / 2**20:.1f} MiB, {data.count(b'\n'):,} lines")
+
+    jobs = 1
+    baseline = None
+    while jobs <= max_jobs:
+        parser.set_jobs(jobs)
+        seconds = best_time(lambda: parser.parse_bytes(data), repeat=1)
+        baseline = baseline or seconds
+        print(
+            f"{jobs:>4} jobs: {seconds:>7.2f} s "
+            f"{len(data) / 2**20 / seconds:>7.1f} MiB/s {baseline / seconds:>5.1f}x"
+        )
+        jobs *= 2
+    parser.set_jobs(None)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,33 @@
+"""
+Compare the single-pass directive tokenizer with the field-by-field parsing path.
+
+Usage: python -m benchmarks.bench_parser [N_DAYS]
+"""
+
+import sys
+
+import habits_txt.defaults as defaults
+import habits_txt.parser as parser
+from benchmarks.common import best_time, generate_journal
+
+
+def main(n_days: int = 10_000):
+    lines = generate_journal(n_days)
+    print(f"{len(lines):,} directive lines")
+
+    tokenizers = {
+        "field-by-field": parser._tokenize_directive_by_fields,
+        "single-pass": parser._tokenize_directive,
+    }
+    rates = {}
+    for name, tokenize in tokenizers.items():
+        seconds = best_time(
+            lambda: [tokenize(line, defaults.DATE_FMT) for line in lines]
+        )
+        rates[name] = len(lines) / seconds
+        print(f"{name:>16}: {rates[name]:>12,.0f} lines/s")
+    print(f"{'speedup':>16}: {rates['single-pass'] / rates['field-by-field']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
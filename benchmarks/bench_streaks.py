@@ -0,0 +1,48 @@
+"""
+Compare the per-record streak loop with the run-length streak engine.
+
+Usage: python -m benchmarks.bench_streaks [N_HABITS]
+"""
+
+import sys
+
+import numpy as np
+
+import habits_txt.records_query as records_query
+from benchmarks.common import best_time
+
+
+def _loop_streaks(completions: list[list[bool]]) -> tuple[list[int], list[int]]:
+    longest_streaks, latest_streaks = [], []
+    for habit_completions in completions:
+        longest = current = 0
+        for completion in habit_completions:
+            current = current + 1 if completion else 0
+            longest = max(longest, current)
+        longest_streaks.append(longest)
+        latest_streaks.append(current)
+    return longest_streaks, latest_streaks
+
+
+def main(n_habits: int = 10_000):
+    # One year of daily records per habit, completed 70% of the time
+    rng = np.random.default_rng(0)
+    completions = list(rng.random((n_habits, 365)) < 0.7)
+    completion_lists = [habit_completions.tolist() for habit_completions in completions]
+
+    assert [s.tolist() for s in records_query.get_streak_lengths(completions)] == list(
+        _loop_streaks(completion_lists)
+    )
+    for name, func in (
+        ("loop", lambda: _loop_streaks(completion_lists)),
+        ("engine", lambda: records_query.get_streak_lengths(completions)),
+    ):
+        seconds = best_time(func)
+        print(
+            f"{name:>6}: {seconds:>8.3f} s "
+            f"{n_habits / seconds / 1e3:>8.1f} habit-years/ms"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,88 @@
+import datetime as dt
+import random
+import time
+import typing
+
+FREQUENCIES = ("* * *", "* * 1,3,5", "1 * *", "* * 0,6")
+
+
+def generate_journal(
+    n_days: int,
+    n_habits: int = 10,
+    start_date: dt.date = dt.date(2000, 1, 1),
+    retrack_every: int | None = None,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Generate the lines of a consistent synthetic journal.
+
+    Every habit is tracked on the start date and recorded most days, some records having metadata.
+    Every third habit is measurable.
+
+    :param n_days: Number of days covered by the journal.
+    :param n_habits: Number of habits.
+    :param start_date: Date of the first directive.
+    :param retrack_every: If set, untrack and retrack every habit every `retrack_every` days.
+    :param seed: Random seed.
+    :return: Journal lines.
+    """
+    rng = random.Random(seed)
+    habits = [
+        (f"Habit {i}", FREQUENCIES[i % len(FREQUENCIES)], i % 3 == 2)
+        for i in range(n_habits)
+    ]
+
+    lines = []
+    for name, frequency, is_measurable in habits:
+        lines.append(_track_line(start_date, name, frequency, is_measurable))
+    for day in range(1, n_days):
+        date = start_date + dt.timedelta(days=day)
+        for name, frequency, is_measurable in habits:
+            if retrack_every and day % retrack_every == 0:
+                lines.append(f'{date} untrack "{name}"')
+                continue
+            if retrack_every and day > retrack_every and day % retrack_every == 1:
+                lines.append(_track_line(date, name, frequency, is_measurable))
+            if rng.random() < 0.2:
+                continue
+            value = (
+                f"{rng.uniform(0, 100):.1f}"
+                if is_measurable
+                else rng.choice(("yes", "yes", "no"))
+            )
+            metadata = " place:home" if rng.random() < 0.1 else ""
+            lines.append(f'{date} "{name}"{metadata} {value}')
+    return lines
+
+
+def _track_line(date: dt.date, name: str, frequency: str, is_measurable: bool) -> str:
+    return (
+        f'{date} track "{name}" ({frequency}){" measurable" if is_measurable else ""}'
+    )
+
+
+def write_journal(path: str, lines: list[str]) -> None:
+    """
+    Write journal lines to a file.
+
+    :param path: Path to the journal file.
+    :param lines: Journal lines.
+    """
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def best_time(func: typing.Callable[[], typing.Any], repeat: int = 3) -> float:
+    """
+    Run a function several times and return the best wall time.
+
+    :param func: Function to time.
+    :param repeat: Number of runs.
+    :return: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
@@ -10,29 +10,36 @@ def main():
     logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     config_.setup()
+    journal = config_.snapshot().journal
     cli.cli(
         sys.argv[1:],
         default_map={
             "fill": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
             },
             "filter": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
             },
             "info": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
             },
             "chart": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
             },
             "tracked": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
             },
             "edit": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
             },
             "check": {
-                "file": config_.get("journal", "CLI"),
+                "file": journal,
+            },
+            "compile": {
+                "file": journal,
+            },
+            "sync": {
+                "file": journal,
             },
         },
     )
@@ -0,0 +1,403 @@
+import datetime as dt
+import re
+import typing
+
+import numpy as np
+import pandas as pd
+
+import habits_txt.builder as builder
+import habits_txt.record_table as record_table
+
+COLUMNS = ("date", "habit", "value", "interval")
+STATISTICS = ("mean", "sum", "count", "completion")
+# Named intervals, as a number of days or of calendar months
+INTERVALS = {
+    "daily": (1, 0),
+    "weekly": (7, 0),
+    "monthly": (0, 1),
+    "quarterly": (0, 3),
+    "yearly": (0, 12),
+}
+_UNIX_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+_DAYS_INTERVAL_RE = re.compile(r"([1-9][0-9]*)d")
+
+
+def build_frame(
+    index: builder.TrackingIndex, records: record_table.RecordView
+) -> pd.DataFrame:
+    """
+    Build a tidy data frame of records, one row per record.
+
+    The columns are built from the record table columns without going through record objects:
+    - date: Date of the record.
+    - habit: Habit name, categorical.
+    - value: Value, 1 and 0 for yes and no, NaN if the record has no value.
+    - interval: Index of the tracking interval of the record in `index.intervals`.
+    - One categorical column per metadata key of the records, prefixed with "metadata." if the
+      key is one of the columns above.
+
+    :param index: Tracking index of the records.
+    :param records: Records to keep, in the index table.
+    :return: Data frame, in the order of the records.
+    """
+    table = records.table
+    rows = records.rows
+    strings = np.array(table.strings, dtype=object)
+
+    dates = table.dates[rows]
+    record_habit_ids = table.habit_ids[rows]
+    habit_ids, habit_codes = np.unique(record_habit_ids, return_inverse=True)
+    frame = pd.DataFrame(
+        {
+            "date": (dates - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]"),
+            "habit": pd.Categorical.from_codes(habit_codes, strings[habit_ids]),
+            "value": table.values[rows],
+            "interval": _get_interval_ids(index, record_habit_ids, dates),
+        }
+    )
+
+    # Each metadata key is a column of codes, looked up by the metadata set of each record
+    metadata_ids = table.metadata_ids[rows]
+    key_codes: dict[int, np.ndarray] = {}
+    for set_id in np.unique(metadata_ids).tolist():
+        for key_id, value_id in table.metadata_sets[set_id]:
+            if key_id not in key_codes:
+                key_codes[key_id] = np.full(len(table.metadata_sets), -1, np.int64)
+            key_codes[key_id][set_id] = value_id
+    for key_id, value_ids in key_codes.items():
+        used_value_ids = value_ids[metadata_ids]
+        categories, codes = np.unique(used_value_ids, return_inverse=True)
+        if len(categories) and categories[0] == -1:
+            categories = categories[1:]
+            codes = codes - 1
+        key = table.strings[key_id]
+        column = f"metadata.{key}" if key in COLUMNS else key
+        frame[column] = pd.Categorical.from_codes(codes, strings[categories])
+    return frame
+
+
+def _get_interval_ids(
+    index: builder.TrackingIndex, habit_ids: np.ndarray, dates: np.ndarray
+) -> np.ndarray:
+    """
+    Find the tracking interval of records.
+
+    Intervals of a habit do not overlap, so the interval of a record is the last one of its
+    habit starting at or before its date. They are all found with one binary search on keys
+    sorted by habit id then date.
+
+    :param index: Tracking index of the records.
+    :param habit_ids: Habit ids of the records, in the index table.
+    :param dates: Date ordinals of the records.
+    :return: Position of the interval of each record in `index.intervals`, -1 if none.
+    """
+    intervals = []
+    for position, interval in enumerate(index.intervals):
+        habit_id = index.records.get_habit_id(interval.habit.name)
+        if habit_id is not None:
+            end_date = interval.end_date or dt.date.max
+            intervals.append(
+                (
+                    habit_id << 32 | interval.start_date.toordinal(),
+                    end_date.toordinal(),
+                    position,
+                )
+            )
+    if not intervals:
+        return np.full(len(dates), -1, dtype=np.int64)
+    intervals.sort()
+    interval_keys, end_dates, positions = (
+        np.array(column, dtype=np.int64) for column in zip(*intervals)
+    )
+
+    keys = habit_ids.astype(np.int64) << 32 | dates
+    found = np.maximum(np.searchsorted(interval_keys, keys, "right") - 1, 0)
+    is_valid = (interval_keys[found] >> 32 == habit_ids) & (
+        interval_keys[found] <= keys
+    )
+    is_valid &= dates < end_dates[found]
+    return np.where(is_valid, positions[found], -1)
+
+
+def build_interval_frame(
+    index: builder.TrackingIndex,
+    intervals: typing.Sequence[builder.TrackingInterval],
+    start_date: dt.date | None,
+    end_date: dt.date,
+) -> pd.DataFrame:
+    """
+    Build a data frame of tracking intervals, with the number of records expected in each of
+    them between two dates, like `journal.info`.
+
+    :param index: Tracking index of the intervals.
+    :param intervals: Tracking intervals to keep.
+    :param start_date: Start date, None to start at the beginning of each interval.
+    :param end_date: End date.
+    :return: Data frame indexed by the position of the intervals in `index.intervals`, with the
+        habit name, the number of expected records and the start and end dates.
+    """
+    positions = {id(interval): i for i, interval in enumerate(index.intervals)}
+    habit_names = []
+    n_records_expected = []
+    start_dates = []
+    end_dates = []
+    for interval in intervals:
+        effective_start_date = interval.start_date
+        if start_date and start_date > effective_start_date:
+            effective_start_date = start_date
+        effective_end_date = end_date
+        if interval.end_date and interval.end_date < end_date:
+            effective_end_date = interval.end_date
+
+        habit_names.append(interval.habit.name)
+        n_records_expected.append(
+            interval.habit.frequency.get_n_dates(
+                effective_start_date, effective_end_date
+            )
+        )
+        start_dates.append(effective_start_date)
+        end_dates.append(effective_end_date)
+
+    return pd.DataFrame(
+        {
+            "habit": pd.Categorical(habit_names),
+            "n_records_expected": np.array(n_records_expected, dtype=np.int64),
+            "start_date": pd.to_datetime(start_dates),
+            "end_date": pd.to_datetime(end_dates),
+        },
+        index=pd.Index(
+            [positions[id(interval)] for interval in intervals],
+            dtype=np.int64,
+            name="interval",
+        ),
+    )
+
+
+def get_completion(
+    frame: pd.DataFrame, intervals: pd.DataFrame, ignore_missing: bool = False
+) -> pd.DataFrame:
+    """
+    Get the completion of each tracking interval, like `journal.info`.
+
+    :param frame: Records, see `build_frame`.
+    :param intervals: Tracking intervals, see `build_interval_frame`.
+    :param ignore_missing: Average over the records rather than the expected records.
+    :return: Data frame indexed by tracking interval, with the habit name, the numbers of
+        records and expected records, the average value, not rounded, and the start and end
+        dates. Intervals without records are kept.
+    """
+    completed_values = frame["value"].where(_is_completed(frame), 0.0)
+    grouped = completed_values.groupby(frame["interval"])
+    completion = intervals.assign(
+        n_records=grouped.size().reindex(intervals.index, fill_value=0),
+        sum_values=grouped.sum().reindex(intervals.index, fill_value=0.0),
+    )
+    n_values = completion["n_records" if ignore_missing else "n_records_expected"]
+    completion["average_value"] = (
+        completion["sum_values"] / n_values.where(n_values > 0)
+    ).fillna(0.0)
+    return completion[
+        [
+            "habit",
+            "n_records",
+            "n_records_expected",
+            "average_value",
+            "start_date",
+            "end_date",
+        ]
+    ]
+
+
+def resample(frame: pd.DataFrame, rule: str, statistic: str = "mean") -> pd.DataFrame:
+    """
+    Resample the values of each habit by period.
+
+    :param frame: Records, see `build_frame`.
+    :param rule: Pandas frequency of the periods, such as "D", "W" or "MS".
+    :param statistic: "mean", "sum" or "count" of the values, or "completion" for the share of
+        records with a truthy value.
+    :return: Data frame with one row per period and one column per habit.
+
+    Example:
+    >>> frame = pd.DataFrame({"date": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+    ...                       "habit": pd.Categorical(["Read", "Read"]), "value": [1.0, 0.0]})
+    >>> resample(frame, "MS", "completion").to_dict()
+    {'Read': {Timestamp('2024-01-01 00:00:00'): 0.5}}
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f"Invalid statistic: {statistic}")
+    values = frame["value"]
+    if statistic == "completion":
+        values = _is_completed(frame).astype(np.float64)
+    return (
+        frame.assign(value=values)
+        .groupby(["habit", pd.Grouper(key="date", freq=rule)], observed=True)["value"]
+        .agg("mean" if statistic == "completion" else statistic)
+        .unstack("habit")
+    )
+
+
+def parse_interval(interval: str) -> typing.Tuple[int, int]:
+    """
+    Parse an interval name.
+
+    :param interval: Interval: daily, weekly, monthly, quarterly, yearly, or a number of days
+        such as "28d".
+    :return: Number of days and number of calendar months of the interval, one of them is 0.
+
+    Example:
+    >>> parse_interval("quarterly"), parse_interval("10d")
+    ((0, 3), (10, 0))
+    """
+    if interval in INTERVALS:
+        return INTERVALS[interval]
+    match = _DAYS_INTERVAL_RE.fullmatch(interval)
+    if match is None:
+        raise ValueError(f"Invalid interval: {interval}")
+    return int(match.group(1)), 0
+
+
+def get_periods(
+    dates: np.ndarray, interval: str, start_date: dt.date
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the period of an interval containing each date.
+
+    Periods of days follow each other from the start date, periods of months start on the first
+    day of a month, a quarter or a year, whatever the start date.
+
+    :param dates: Date ordinals.
+    :param interval: Interval, see `parse_interval`.
+    :param start_date: Start date of the first period of days.
+    :return: Ordinals of the first and last dates of the period of each date.
+
+    Example:
+    >>> get_periods(np.array([dt.date(2024, 5, 17).toordinal()]), "quarterly", dt.date(2024, 1, 1))
+    (array([738977]), array([739067]))
+    """
+    n_days, n_months = parse_interval(interval)
+    if n_days:
+        start = start_date.toordinal()
+        first_dates = start + (dates - start) // n_days * n_days
+        return first_dates, first_dates + n_days - 1
+    months = (
+        (dates - _UNIX_EPOCH_ORDINAL)
+        .astype("datetime64[D]")
+        .astype("datetime64[M]")
+        .astype(np.int64)
+    )
+    first_months = months - months % n_months
+    return (
+        _get_month_ordinals(first_months),
+        _get_month_ordinals(first_months + n_months) - 1,
+    )
+
+
+def _get_month_ordinals(months: np.ndarray) -> np.ndarray:
+    """
+    Get the first date of months.
+
+    :param months: Months since January 1970.
+    :return: Date ordinals.
+    """
+    return (
+        months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        + _UNIX_EPOCH_ORDINAL
+    )
+
+
+def build_expected_frame(
+    intervals: typing.Sequence[builder.TrackingInterval],
+    start_date: dt.date,
+    end_date: dt.date,
+) -> pd.DataFrame:
+    """
+    Build a data frame of the dates where records are expected, from the frequency of the
+    habits while they are tracked.
+
+    :param intervals: Tracking intervals.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :return: Data frame with the date and the habit name of each expected record.
+    """
+    dates = []
+    habit_names = []
+    for interval in intervals:
+        first_date = max(interval.start_date, start_date)
+        last_date = end_date
+        if interval.end_date is not None:
+            last_date = min(last_date, interval.end_date - dt.timedelta(days=1))
+        interval_dates = interval.habit.frequency.get_dates(first_date, last_date)
+        dates.append(interval_dates)
+        habit_names.extend([interval.habit.name] * len(interval_dates))
+    ordinals = np.concatenate(dates) if dates else np.empty(0, dtype=np.int64)
+    return pd.DataFrame(
+        {
+            "date": (ordinals - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]"),
+            "habit": pd.Categorical(habit_names),
+        }
+    )
+
+
+def get_rolling_completion(
+    frame: pd.DataFrame,
+    expected: pd.DataFrame,
+    start_date: dt.date,
+    end_date: dt.date,
+    window: int,
+    ignore_missing: bool = False,
+) -> pd.DataFrame:
+    """
+    Get the completion of each habit over a rolling window of days.
+
+    The records and expected records of each habit are counted by day in one pass, then summed
+    over the window. The first windows are shorter, they start at the start date.
+
+    :param frame: Records, see `build_frame`.
+    :param expected: Expected records, see `build_expected_frame`.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :param window: Number of days of the window.
+    :param ignore_missing: Average over the records rather than the expected records.
+    :return: Data frame with one row per day and one column per habit, with the average value
+        over the window ending on the day, NaN if no record is expected in the window.
+    """
+    habits = pd.Index(expected["habit"].astype(object)).append(
+        pd.Index(frame["habit"].astype(object))
+    )
+    habits = habits.unique()
+    n_days = (end_date - start_date).days + 1
+    days = pd.date_range(start_date, periods=max(n_days, 0), freq="D", name="date")
+
+    def count_by_day(records: pd.DataFrame, weights: pd.Series | None) -> pd.DataFrame:
+        offsets = (records["date"] - pd.Timestamp(start_date)).dt.days.to_numpy()
+        habit_codes = habits.get_indexer(records["habit"].astype(object))
+        is_kept = (offsets >= 0) & (offsets < n_days)
+        counts = np.bincount(
+            habit_codes[is_kept] * n_days + offsets[is_kept],
+            weights=None if weights is None else weights.to_numpy()[is_kept],
+            minlength=len(habits) * n_days,
+        )
+        return pd.DataFrame(
+            counts.reshape(len(habits), n_days).T.astype(np.float64),
+            index=days,
+            columns=pd.Index(habits, name="habit"),
+        )
+
+    sums = count_by_day(frame, frame["value"].where(_is_completed(frame), 0.0))
+    n_values = (
+        count_by_day(frame, None) if ignore_missing else count_by_day(expected, None)
+    )
+    rolling_sums = sums.rolling(window, min_periods=1).sum()
+    rolling_n_values = n_values.rolling(window, min_periods=1).sum()
+    return rolling_sums / rolling_n_values.where(rolling_n_values > 0)
+
+
+def _is_completed(frame: pd.DataFrame) -> pd.Series:
+    """
+    Check which records have a truthy value.
+
+    :param frame: Records, see `build_frame`.
+    :return: Whether each record has a truthy value.
+    """
+    return frame["value"].fillna(0.0) != 0
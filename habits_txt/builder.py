@@ -1,9 +1,15 @@
+import bisect
+import calendar
 import datetime as dt
+import itertools
 import typing
+from dataclasses import dataclass, field
 
 import habits_txt.directives as directives
 import habits_txt.exceptions as exceptions
 import habits_txt.models as models
+import habits_txt.record_table as record_table
+from habits_txt.date import get_date_range
 
 
 def _sort_directives(
@@ -25,6 +31,131 @@ def _sort_directives(
     return sorted(directives_, key=lambda directive_: directive_.date)
 
 
+class ValidationContext:
+    """
+    Consistency state of a sweep over directives sorted by date.
+
+    Tracked habits are indexed by name and records by habit name and date, so every check takes
+    constant time. Use `validate` to check a whole journal.
+
+    Example:
+    >>> context = ValidationContext()
+    >>> context.track(directives.TrackDirective(dt.date(2024, 1, 1), "Habit 1", models.Frequency("* * *")))
+    >>> context.record(directives.RecordDirective(dt.date(2024, 1, 1), "Habit 1", True))
+    >>> context.record(directives.RecordDirective(dt.date(2024, 1, 1), "Habit 1", True))
+    Traceback (most recent call last):
+    ConsistencyError: Several records of the same habit on the same day: Habit 1
+    """
+
+    def __init__(self):
+        self.tracked_habits: dict[str, models.Habit] = {}
+        self.tracking_start_dates: dict[str, dt.date] = {}
+        self.recorded: set[typing.Tuple[str, dt.date]] = set()
+
+    def track(self, directive: directives.TrackDirective) -> models.Habit:
+        """
+        Start tracking a habit.
+
+        :param directive: Track directive.
+        :return: Tracked habit.
+        """
+        if directive.habit_name in self.tracked_habits:
+            raise exceptions.ConsistencyError(
+                f"Several tracked habits with the same name: {directive.habit_name}",
+                directive,
+            )
+        habit = _build_habit_from_track_directive(directive)
+        self.tracked_habits[directive.habit_name] = habit
+        self.tracking_start_dates[directive.habit_name] = directive.date
+        return habit
+
+    def untrack(self, directive: directives.UntrackDirective) -> models.Habit:
+        """
+        Stop tracking a habit.
+
+        :param directive: Untrack directive.
+        :return: Untracked habit.
+        """
+        habit = self.tracked_habits.pop(directive.habit_name, None)
+        if habit is None:
+            raise exceptions.ConsistencyError(
+                f"Untracked habit without a corresponding track directive: {directive.habit_name}",
+                directive,
+            )
+        del self.tracking_start_dates[directive.habit_name]
+        return habit
+
+    def record(self, directive: directives.RecordDirective):
+        """
+        Add a record.
+
+        :param directive: Record directive.
+        """
+        error = self.get_record_error(directive)
+        if error is not None:
+            raise error
+        self.recorded.add((directive.habit_name, directive.date))
+
+    def get_record_error(
+        self, directive: directives.RecordDirective
+    ) -> exceptions.ConsistencyError | None:
+        """
+        Get the error of a record directive, without adding the record.
+
+        :param directive: Record directive.
+        :return: Consistency error, None if the directive is valid.
+        """
+        habit = self.tracked_habits.get(directive.habit_name)
+        if habit is None:
+            return exceptions.ConsistencyError(
+                f"Recorded habit without a corresponding track directive: {directive.habit_name}",
+                directive,
+            )
+        if (directive.habit_name, directive.date) in self.recorded:
+            return exceptions.ConsistencyError(
+                f"Several records of the same habit on the same day: {directive.habit_name}",
+                directive,
+            )
+        if habit.is_measurable and not isinstance(directive.value, float):
+            return exceptions.ConsistencyError(
+                f"Measurable habit with a non-float value: {directive.habit_name}",
+                directive,
+            )
+        if not habit.is_measurable and not isinstance(directive.value, bool):
+            return exceptions.ConsistencyError(
+                f"Non-measurable habit with a non-bool value: {directive.habit_name}",
+                directive,
+            )
+        return None
+
+
+def validate(
+    directives_: typing.Iterable[directives.Directive], date: dt.date
+) -> ValidationContext:
+    """
+    Check the directives up to a given date are consistent, without building records.
+
+    Raises the same error as `get_state_at_date`.
+
+    :param directives_: Iterable of directives, in any order.
+    :param date: Date to check.
+    :return: Validation context at the date.
+
+    Example:
+    >>> directive1 = directives.TrackDirective(dt.datetime(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.RecordDirective(dt.datetime(2024, 1, 1), "Habit 1", False)
+    >>> context = validate([directive1, directive2], dt.datetime(2024, 1, 1))
+    >>> print(context.tracked_habits)
+    {"Habit 1": Habit 1}
+    """
+    context = ValidationContext()
+    for _ in _iter_record_directives(
+        _sort_directives([d for d in directives_ if d.date <= date]), context
+    ):
+        pass
+    return context
+
+
 def _get_tracked_habits_at_date(
     directives_: list[directives.Directive], date: dt.date
 ) -> set[models.Habit]:
@@ -48,81 +179,14 @@ def _get_tracked_habits_at_date(
     ]
     sorted_directives = _sort_directives(directives_before_date)
 
-    current_state: set[models.Habit] = set()
+    context = ValidationContext()
     for directive in sorted_directives:
         if isinstance(directive, directives.TrackDirective):
-            _check_track_directive_is_valid(directive, current_state)
-            current_state.add(_build_habit_from_track_directive(directive))
+            context.track(directive)
         elif isinstance(directive, directives.UntrackDirective):
-            _check_untrack_directive_is_valid(directive, current_state)
-            current_state = _remove_habit_from_state(
-                directive.habit_name, current_state
-            )
+            context.untrack(directive)
 
-    return current_state
-
-
-def _check_track_directive_is_valid(
-    directive: directives.TrackDirective, tracked_habits: set[models.Habit]
-):
-    """
-    Check if a track directive is valid.
-
-    :param directive: Track directive.
-    :param tracked_habits: Tracked habits.
-
-    Example:
-    >>> directive1 = directives.TrackDirective(dt.datetime(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
-    >>> directive2 = directives.TrackDirective(dt.datetime(2024, 1, 2), "Habit 2", models.Frequency("* * *"))
-    >>> tracked_habits = {models.Habit("Habit 1", models.Frequency("* * *"))}
-    >>> _check_track_directive_is_valid(directive2, tracked_habits)
-    """
-    if directive.habit_name in {habit.name for habit in tracked_habits}:
-        raise exceptions.ConsistencyError(
-            f"Several tracked habits with the same name: {directive.habit_name}",
-            directive,
-        )
-
-
-def _check_untrack_directive_is_valid(
-    directive: directives.UntrackDirective, tracked_habits: set[models.Habit]
-):
-    """
-    Check if an untrack directive is valid.
-
-    :param directive: Untrack directive.
-    :param tracked_habits: Tracked habits.
-
-    Example:
-    >>> directive = directives.UntrackDirective(dt.datetime(2024, 1, 1), "Habit 1")
-    >>> tracked_habits = {models.Habit("Habit 1", models.Frequency("* * *"))}
-    >>> _check_untrack_directive_is_valid(directive, tracked_habits)
-    """
-    if directive.habit_name not in {habit.name for habit in tracked_habits}:
-        raise exceptions.ConsistencyError(
-            f"Untracked habit without a corresponding track directive: {directive.habit_name}",
-            directive,
-        )
-
-
-def _remove_habit_from_state(
-    habit_name: str, tracked_habits: set[models.Habit]
-) -> set[models.Habit]:
-    """
-    Remove a habit from the state.
-
-    :param habit_name: Name of the habit to remove.
-    :param tracked_habits: Tracked habits.
-    :return: Updated tracked habits.
-
-    Example:
-    >>> habit_name = "Habit 1"
-    >>> tracked_habits = {models.Habit("Habit 1", models.Frequency("* * *"))}
-    >>> updated_tracked_habits = _remove_habit_from_state(habit_name, tracked_habits)
-    >>> print(updated_tracked_habits)
-    []
-    """
-    return {habit for habit in tracked_habits if habit.name != habit_name}
+    return set(context.tracked_habits.values())
 
 
 def _build_habit_from_track_directive(
@@ -189,69 +253,265 @@ def _get_records_up_to_date(
     directives_before_date = [
         directive for directive in directives_ if directive.date <= date
     ]
-    sorted_directives = _sort_directives(directives_before_date)
+    return list(
+        _iter_records(_sort_directives(directives_before_date), ValidationContext())
+    )
 
-    records: list[models.HabitRecord] = []
-    for directive in sorted_directives:
-        if isinstance(directive, directives.RecordDirective):
-            tracked_habits_at_date = _get_tracked_habits_at_date(
-                directives_, directive.date
-            )
-            _check_record_directive_is_valid(directive, tracked_habits_at_date, records)
-            records.append(_build_habit_record_from_record_directive(directive))
 
-    return records
+def _iter_records(
+    sorted_directives: list[directives.Directive],
+    context: ValidationContext,
+) -> typing.Iterator[models.HabitRecord]:
+    """
+    Sweep directives sorted by date once and yield the valid records.
 
+    :param sorted_directives: Directives sorted by date.
+    :param context: Validation context, updated as the directives are applied.
+    :return: Iterator over the records.
 
-def _check_record_directive_is_valid(
-    directive: directives.RecordDirective,
-    tracked_habits: set[models.Habit],
-    records: list[models.HabitRecord],
-):
+    Example:
+    >>> directive1 = directives.TrackDirective(dt.datetime(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.RecordDirective(dt.datetime(2024, 1, 1), "Habit 1", False)
+    >>> context = ValidationContext()
+    >>> records = list(_iter_records([directive1, directive2], context))
+    >>> print(records, context.tracked_habits)
+    [HabitRecord(Habit 1, False)] {"Habit 1": Habit 1}
     """
-    Check if a record directive is valid.
+    return map(
+        _build_habit_record_from_record_directive,
+        _iter_record_directives(sorted_directives, context),
+    )
 
-    :param directive: Record directive.
-    :param tracked_habits: Tracked habits.
-    :param records: List of records.
+
+def _iter_record_directives(
+    sorted_directives: list[directives.Directive],
+    context: ValidationContext,
+) -> typing.Iterator[directives.RecordDirective]:
+    """
+    Sweep directives sorted by date once, applying them to a validation context and yielding
+    the valid record directives.
+
+    Track and untrack directives of a day apply before the records of that day. Errors are the
+    ones of validating every track and untrack directive first and the records after: an invalid
+    track or untrack directive is reported even if an earlier record is invalid.
+
+    :param sorted_directives: Directives sorted by date.
+    :param context: Validation context, updated as the directives are applied.
+    :return: Iterator over the record directives.
+    """
+    record_error: exceptions.ConsistencyError | None = None
+    for _, day_directives_iter in itertools.groupby(
+        sorted_directives, key=lambda directive_: directive_.date
+    ):
+        day_directives = list(day_directives_iter)
+        for directive in day_directives:
+            if isinstance(directive, directives.TrackDirective):
+                context.track(directive)
+            elif isinstance(directive, directives.UntrackDirective):
+                context.untrack(directive)
+
+        if record_error is not None:
+            continue
+        for directive in day_directives:
+            if isinstance(directive, directives.RecordDirective):
+                record_error = context.get_record_error(directive)
+                if record_error is not None:
+                    break
+                context.recorded.add((directive.habit_name, directive.date))
+                yield directive
+
+    if record_error is not None:
+        raise record_error
+
+
+@dataclass
+class TrackingInterval:
+    """
+    Interval during which a habit is tracked, from the track directive date included to the
+    untrack directive date excluded.
+    """
+
+    habit: models.Habit
+    track_directive: directives.TrackDirective
+    untrack_directive: directives.UntrackDirective | None
+
+    @property
+    def start_date(self) -> dt.date:
+        return self.track_directive.date
+
+    @property
+    def end_date(self) -> dt.date | None:
+        if self.untrack_directive is None:
+            return None
+        return self.untrack_directive.date
+
+
+class TrackingIndex:
+    """
+    Tracking intervals and records of each habit, indexed by date.
+
+    The index is built once from the directives, then finding the habits tracked at a date or the
+    records of an interval are binary searches. It does not check the directives are consistent,
+    see `get_tracking_index_at_date`.
 
     Example:
-    >>> directive = directives.RecordDirective(dt.datetime(2024, 1, 1), "Habit 1", False)
-    >>> tracked_habits = {models.Habit("Habit 1", models.Frequency("* * *"))}
-    >>> records = [models.HabitRecord(dt.datetime(2024, 1, 1), "Habit 2", True)]
-    >>> _check_record_directive_is_valid(directive, tracked_habits, records)
-    """
-    if directive.habit_name not in {habit.name for habit in tracked_habits}:
-        raise exceptions.ConsistencyError(
-            f"Recorded habit without a corresponding track directive: {directive.habit_name}",
-            directive,
-        )
+    >>> directive1 = directives.TrackDirective(dt.date(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.UntrackDirective(dt.date(2024, 1, 3), "Habit 1")
+    >>> directive3 = directives.RecordDirective(dt.date(2024, 1, 2), "Habit 1", True)
+    >>> index = TrackingIndex([directive1, directive2, directive3])
+    >>> index.get_tracked_at(dt.date(2024, 1, 3))
+    []
+    >>> index.get_interval_at("Habit 1", dt.date(2024, 1, 2)).end_date
+    datetime.date(2024, 1, 3)
+    """
 
-    if any(
-        record.date == directive.date and record.habit_name == directive.habit_name
-        for record in records
+    def __init__(
+        self,
+        directives_: list[directives.Directive],
+        records: record_table.RecordTable | None = None,
     ):
-        raise exceptions.ConsistencyError(
-            f"Several records of the same habit on the same day: {directive.habit_name}",
-            directive,
+        """
+        :param directives_: Directives, in file order. Record directives are skipped, the
+            records of the index are the ones of `records`.
+        :param records: Valid records in date order, as built by `get_tracking_index_at_date`.
+        """
+        self.intervals: list[TrackingInterval] = []
+        self.records = (
+            records
+            if records is not None
+            else record_table.RecordTable.from_records([])
         )
+        self._intervals_by_name: dict[str, list[TrackingInterval]] = {}
+        self._start_dates_by_name: dict[str, list[dt.date]] = {}
+
+        track_untrack_directives = [
+            directive
+            for directive in directives_
+            if not isinstance(directive, directives.RecordDirective)
+        ]
 
-    for habit in tracked_habits:
-        if habit.name == directive.habit_name:
-            if habit.is_measurable and not isinstance(directive.value, float):
-                raise exceptions.ConsistencyError(
-                    f"Measurable habit with a non-float value: {directive.habit_name}",
-                    directive,
+        for directive in _sort_directives(track_untrack_directives):
+            intervals = self._intervals_by_name.setdefault(directive.habit_name, [])
+            if isinstance(directive, directives.TrackDirective):
+                interval = TrackingInterval(
+                    _build_habit_from_track_directive(directive), directive, None
                 )
-            if not habit.is_measurable and not isinstance(directive.value, bool):
-                raise exceptions.ConsistencyError(
-                    f"Non-measurable habit with a non-bool value: {directive.habit_name}",
-                    directive,
+                intervals.append(interval)
+                self.intervals.append(interval)
+                self._start_dates_by_name.setdefault(directive.habit_name, []).append(
+                    directive.date
                 )
+            elif (
+                isinstance(directive, directives.UntrackDirective)
+                and intervals
+                and intervals[-1].untrack_directive is None
+            ):
+                intervals[-1].untrack_directive = directive
+
+    def get_intervals(self, habit_name: str) -> list[TrackingInterval]:
+        """
+        Get the tracking intervals of a habit.
+
+        :param habit_name: Habit name.
+        :return: Tracking intervals, sorted by date.
+        """
+        return self._intervals_by_name.get(habit_name, [])
+
+    def get_interval_at(
+        self, habit_name: str, date: dt.date
+    ) -> TrackingInterval | None:
+        """
+        Get the tracking interval of a habit containing a date.
+
+        :param habit_name: Habit name.
+        :param date: Date.
+        :return: Tracking interval, None if the habit is not tracked at the date.
+        """
+        start_dates = self._start_dates_by_name.get(habit_name)
+        if not start_dates:
+            return None
+        i = bisect.bisect_right(start_dates, date) - 1
+        if i < 0:
+            return None
+        interval = self._intervals_by_name[habit_name][i]
+        if interval.end_date is not None and interval.end_date <= date:
+            return None
+        return interval
+
+    def get_tracked_at(self, date: dt.date) -> list[TrackingInterval]:
+        """
+        Get the tracking intervals containing a date, one per tracked habit.
+
+        :param date: Date.
+        :return: Tracking intervals, in tracking order.
+        """
+        intervals = [
+            interval
+            for interval in (
+                self.get_interval_at(habit_name, date)
+                for habit_name in self._intervals_by_name
+            )
+            if interval is not None
+        ]
+        order = {id(interval): i for i, interval in enumerate(self.intervals)}
+        return sorted(intervals, key=lambda interval: order[id(interval)])
+
+    def get_record_view(
+        self,
+        interval: TrackingInterval,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        metadata: dict[str, str] | None = None,
+    ) -> record_table.RecordView:
+        """
+        Get a view of the valid records of a tracking interval, optionally between two dates,
+        both included.
+
+        :param interval: Tracking interval.
+        :param start_date: Start date.
+        :param end_date: End date.
+        :param metadata: Keep the records with these metadata values.
+        :return: Record view, in date order.
+        """
+        first_date = interval.start_date
+        if start_date is not None and start_date > first_date:
+            first_date = start_date
+        last_date = end_date
+        if interval.end_date is not None:
+            day_before_end = interval.end_date - dt.timedelta(days=1)
+            if last_date is None or day_before_end < last_date:
+                last_date = day_before_end
+        return self.records.get_view(
+            interval.habit.name, first_date, last_date, metadata
+        )
+
+
+def get_tracking_index_at_date(
+    directives_: typing.Iterable[directives.Directive], date: dt.date
+) -> TrackingIndex:
+    """
+    Check the directives up to a given date are consistent and index them.
+
+    :param directives_: Iterable of directives, in any order.
+    :param date: Date to check.
+    :return: Tracking index, with the valid records.
+
+    Example:
+    >>> directive1 = directives.TrackDirective(dt.datetime(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.RecordDirective(dt.datetime(2024, 1, 1), "Habit 1", False)
+    >>> index = get_tracking_index_at_date([directive1, directive2], dt.datetime(2024, 1, 1))
+    >>> print(list(index.records))
+    [HabitRecord(Habit 1, False)]
+    """
+    directives_ = [directive for directive in directives_ if directive.date <= date]
+    records = record_table.RecordTable.from_directives(
+        _iter_record_directives(_sort_directives(directives_), ValidationContext())
+    )
+    return TrackingIndex(directives_, records)
 
 
 def get_state_at_date(
-    directives_: list[directives.Directive], date: dt.date
+    directives_: typing.Iterable[directives.Directive], date: dt.date
 ) -> typing.Tuple[
     set[models.Habit],
     list[models.HabitRecord],
@@ -260,7 +520,10 @@ def get_state_at_date(
     """
     Get the state of the habits at a given date.
 
-    :param directives_: List of directives.
+    Only the directives up to the date are kept in memory, so directives can be streamed from
+    `parser.iter_directives`.
+
+    :param directives_: Iterable of directives, in any order.
     :param date: Date to check.
     :return: List of tracked habits, list of records, list of matches.
 
@@ -277,28 +540,90 @@ def get_state_at_date(
     >>> print(habits_records_matches)
     [(Habit 1, [HabitRecord(Habit 1, False)], 2024-01-01, None)]
     """
-    tracked_habits = _get_tracked_habits_at_date(directives_, date)
-    records = _get_records_up_to_date(directives_, date)
-
-    track_untrack_record_matches = get_track_untrack_record_matches_at_date(
-        directives_, date
-    )
+    index = get_tracking_index_at_date(directives_, date)
+    tracked_habits = {interval.habit for interval in index.get_tracked_at(date)}
     habits_records_matches = [
-        models.HabitRecordMatch(
-            habit=_build_habit_from_track_directive(track_directive),
-            habit_records=[
-                _build_habit_record_from_record_directive(record_directive)
-                for record_directive in record_directives
-            ],
-            tracking_start_date=track_directive.date,
-            tracking_end_date=(
-                untrack_directive.date if untrack_directive is not None else None
-            ),
-        )
-        for track_directive, untrack_directive, record_directives in track_untrack_record_matches
+        build_habit_record_match(index, interval) for interval in index.intervals
     ]
+    return tracked_habits, list(index.records), habits_records_matches
+
+
+def iter_states(
+    directives_: typing.Iterable[directives.Directive],
+    start_date: dt.date,
+    end_date: dt.date,
+) -> typing.Iterator[
+    typing.Tuple[dt.date, set[models.Habit], list[models.HabitRecord]]
+]:
+    """
+    Replay the directives once and yield the tracked habits and records at each date of a range.
+
+    The state at each date is the one `get_state_at_date` returns for that date, and errors are
+    raised when the first date they affect is reached. The list of records is extended in place
+    from one date to the next, copy it to keep the records of a date.
+
+    :param directives_: Iterable of directives, in any order.
+    :param start_date: Start date.
+    :param end_date: End date, included.
+    :return: Iterator over the dates, tracked habits and records.
 
-    return tracked_habits, records, habits_records_matches
+    Example:
+    >>> directive1 = directives.TrackDirective(dt.date(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.RecordDirective(dt.date(2024, 1, 2), "Habit 1", False)
+    >>> for date, tracked_habits, records in iter_states(\
+    [directive1, directive2], dt.date(2024, 1, 1), dt.date(2024, 1, 2)):
+    ...     print(date, tracked_habits, len(records))
+    2024-01-01 {Habit 1} 0
+    2024-01-02 {Habit 1} 1
+    """
+    sorted_directives = _sort_directives(
+        [directive for directive in directives_ if directive.date <= end_date]
+    )
+    n_before_start = bisect.bisect_left(
+        sorted_directives, start_date, key=lambda directive_: directive_.date
+    )
+    directives_before_start = sorted_directives[:n_before_start]
+    context = ValidationContext()
+    records = list(_iter_records(directives_before_start, context))
+    tracked_habits = set(context.tracked_habits.values())
+
+    days = itertools.groupby(
+        sorted_directives[n_before_start:], key=lambda directive_: directive_.date
+    )
+    next_day = next(days, None)
+    for date in get_date_range(start_date, end_date, dt.timedelta(days=1)):
+        if next_day is not None and next_day[0] == date:
+            records.extend(_iter_records(list(next_day[1]), context))
+            tracked_habits = set(context.tracked_habits.values())
+            next_day = next(days, None)
+        yield date, tracked_habits, records
+
+
+def build_habit_record_match(
+    index: TrackingIndex,
+    interval: TrackingInterval,
+    start_date: dt.date | None = None,
+    end_date: dt.date | None = None,
+    metadata: dict[str, str] | None = None,
+) -> models.HabitRecordMatch:
+    """
+    Build the match between the habit of a tracking interval and its records.
+
+    The records of the match are a view of the index records, built when they are read.
+
+    :param index: Tracking index.
+    :param interval: Tracking interval.
+    :param start_date: Keep the records from this date.
+    :param end_date: Keep the records up to this date.
+    :param metadata: Keep the records with these metadata values.
+    :return: Habit record match.
+    """
+    return models.HabitRecordMatch(
+        habit=interval.habit,
+        habit_records=index.get_record_view(interval, start_date, end_date, metadata),
+        tracking_start_date=interval.start_date,
+        tracking_end_date=interval.end_date,
+    )
 
 
 def get_track_untrack_record_matches_at_date(
@@ -313,6 +638,9 @@ def get_track_untrack_record_matches_at_date(
     """
     Get the matches of track, untrack, and record directives at a given date.
 
+    Each track directive is matched with the next untrack directive of the habit, and with the
+    records from the track date included to the untrack date excluded.
+
     :param directives_: List of directives.
     :param date: Date to check.
     :return: List of matches.
@@ -327,49 +655,280 @@ def get_track_untrack_record_matches_at_date(
     >>> print(matches)
     [(directive1, directive2, [directive4]), (directive3, None, [])]
     """
-    directives_before_date = [
-        directive for directive in directives_ if directive.date <= date
+    directives_ = [directive for directive in directives_ if directive.date <= date]
+    index = TrackingIndex(directives_)
+    record_directives_by_name: dict[str, list[directives.RecordDirective]] = {}
+    for directive in directives_:
+        if isinstance(directive, directives.RecordDirective):
+            record_directives_by_name.setdefault(directive.habit_name, []).append(
+                directive
+            )
+    return [
+        (
+            interval.track_directive,
+            interval.untrack_directive,
+            [
+                directive
+                for directive in record_directives_by_name.get(interval.habit.name, [])
+                if interval.start_date <= directive.date
+                and (interval.end_date is None or directive.date < interval.end_date)
+            ],
+        )
+        for interval in index.intervals
     ]
-    sorted_directives = _sort_directives(directives_before_date)
 
-    track_directives: list[directives.TrackDirective] = []
-    untrack_directives: list[directives.UntrackDirective] = []
-    matches: list[
-        typing.Tuple[directives.TrackDirective, directives.UntrackDirective | None]
-    ] = []
-    for directive in sorted_directives:
-        if isinstance(directive, directives.TrackDirective):
-            track_directives.append(directive)
-        elif isinstance(directive, directives.UntrackDirective):
-            untrack_directives.append(directive)
-
-    for track_directive in track_directives:
-        match = next(
-            (
-                untrack_directive
-                for untrack_directive in untrack_directives
-                if untrack_directive.habit_name == track_directive.habit_name
-            ),
-            None,
-        )
-        matches.append((track_directive, match))
 
-    all_matches: list[
-        typing.Tuple[
-            directives.TrackDirective,
-            directives.UntrackDirective | None,
-            list[directives.RecordDirective],
-        ]
-    ] = []
-    for track_directive, untrack_directive in matches:
-        start_date = track_directive.date
-        end_date = untrack_directive.date if untrack_directive is not None else date
-        record_directives = [
+@dataclass
+class Checkpoint:
+    """
+    Summary of the state of the habits at the end of a date, to replay the journal from there
+    instead of from the first directive.
+
+    Example:
+        date: 2024-01-31
+        tracked_habits: {"Read": Habit("Read", Frequency("* * *"))}
+        tracking_start_dates: {"Read": 2024-01-01}
+        last_record_dates: {"Read": 2024-01-30}
+    """
+
+    date: dt.date
+    tracked_habits: dict[str, models.Habit] = field(default_factory=dict)
+    tracking_start_dates: dict[str, dt.date] = field(default_factory=dict)
+    last_record_dates: dict[str, dt.date] = field(default_factory=dict)
+
+
+def build_checkpoints(
+    directives_: typing.Iterable[directives.Directive],
+) -> list[Checkpoint]:
+    """
+    Build a checkpoint at the end of each month followed by later directives.
+
+    Checkpoints stop at the first consistency error, the journal is replayed from the last one
+    to report it.
+
+    :param directives_: Iterable of directives, in any order.
+    :return: Checkpoints, sorted by date.
+
+    Example:
+    >>> directive1 = directives.TrackDirective(dt.date(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.RecordDirective(dt.date(2024, 2, 1), "Habit 1", True)
+    >>> [checkpoint.date for checkpoint in build_checkpoints([directive1, directive2])]
+    [datetime.date(2024, 1, 31)]
+    """
+    checkpoints: list[Checkpoint] = []
+    context = ValidationContext()
+    last_record_dates: dict[str, dt.date] = {}
+    month: typing.Tuple[int, int] | None = None
+    for date, day_directives in itertools.groupby(
+        _sort_directives(list(directives_)), key=lambda directive_: directive_.date
+    ):
+        if month is not None and (date.year, date.month) != month:
+            year, month_ = month
+            checkpoints.append(
+                _make_checkpoint(
+                    dt.date(year, month_, calendar.monthrange(year, month_)[1]),
+                    context,
+                    last_record_dates,
+                )
+            )
+        month = (date.year, date.month)
+        try:
+            for directive in _iter_record_directives(list(day_directives), context):
+                last_record_dates[directive.habit_name] = directive.date
+        except exceptions.ConsistencyError:
+            break
+    return checkpoints
+
+
+def get_checkpoint_at_date(
+    directives_: typing.Iterable[directives.Directive],
+    date: dt.date,
+    checkpoint: Checkpoint | None = None,
+) -> Checkpoint:
+    """
+    Check the directives up to a given date are consistent and summarize the state at the date.
+
+    Only the directives after the checkpoint are replayed: the directives up to its date must be
+    the ones it was built from. Raises the same error as `get_state_at_date`.
+
+    :param directives_: Iterable of directives, in any order.
+    :param date: Date to check.
+    :param checkpoint: Checkpoint to start from, at or before the date.
+    :return: Summary of the state at the date.
+
+    Example:
+    >>> directive1 = directives.TrackDirective(dt.date(2024, 1, 1), "Habit 1", models.Frequency("* * *"))
+    >>> directive2 = directives.RecordDirective(dt.date(2024, 2, 1), "Habit 1", True)
+    >>> checkpoint = build_checkpoints([directive1, directive2])[0]
+    >>> get_checkpoint_at_date([directive2], dt.date(2024, 2, 1), checkpoint).last_record_dates
+    {'Habit 1': datetime.date(2024, 2, 1)}
+    """
+    context = ValidationContext()
+    last_record_dates: dict[str, dt.date] = {}
+    start_date = None
+    if checkpoint is not None:
+        context.tracked_habits = dict(checkpoint.tracked_habits)
+        context.tracking_start_dates = dict(checkpoint.tracking_start_dates)
+        last_record_dates = dict(checkpoint.last_record_dates)
+        start_date = checkpoint.date
+    sorted_directives = _sort_directives(
+        [
             directive
             for directive in directives_
-            if isinstance(directive, directives.RecordDirective)
-            and directive.habit_name == track_directive.habit_name
-            and start_date <= directive.date <= end_date
+            if directive.date <= date
+            and (start_date is None or directive.date > start_date)
         ]
-        all_matches.append((track_directive, untrack_directive, record_directives))
-    return all_matches
+    )
+    for directive in _iter_record_directives(sorted_directives, context):
+        last_record_dates[directive.habit_name] = directive.date
+    return _make_checkpoint(date, context, last_record_dates)
+
+
+def _make_checkpoint(
+    date: dt.date,
+    context: ValidationContext,
+    last_record_dates: dict[str, dt.date],
+) -> Checkpoint:
+    """
+    Copy the state of a sweep to a checkpoint.
+
+    :param date: Date of the checkpoint.
+    :param context: Validation context of the sweep.
+    :param last_record_dates: Date of the last record of each habit.
+    :return: Checkpoint.
+    """
+    return Checkpoint(
+        date,
+        dict(context.tracked_habits),
+        dict(context.tracking_start_dates),
+        dict(last_record_dates),
+    )
+
+
+class JournalState:
+    """
+    State of the habits, updated one directive at a time.
+
+    Directives are applied in date order, and the track and untrack directives of a date before
+    its records, as `get_state_at_date` sorts them. Each directive is checked like in a full
+    build and applied in constant amortized time. A directive that fails a check raises the same
+    error as `get_state_at_date` and leaves the state unchanged.
+
+    Example:
+    >>> state = JournalState()
+    >>> state.apply(directives.TrackDirective(dt.date(2024, 1, 1), "Habit 1", models.Frequency("* * *")))
+    >>> state.apply(directives.RecordDirective(dt.date(2024, 1, 2), "Habit 1", True))
+    >>> state.n_records
+    {'Habit 1': 1}
+    """
+
+    def __init__(self):
+        self.date: dt.date | None = None
+        self.records: list[models.HabitRecord] = []
+        self.habits_records_matches: list[models.HabitRecordMatch] = []
+        self.n_records: dict[str, int] = {}
+        self.value_sums: dict[str, float] = {}
+        self.last_record_dates: dict[str, dt.date] = {}
+        self._context = ValidationContext()
+        self._open_matches: dict[str, models.HabitRecordMatch] = {}
+        # Records of the open matches, which the state appends to
+        self._open_records: dict[str, list[models.HabitRecord]] = {}
+        self._last_record_date: dt.date | None = None
+
+    @property
+    def tracked_habits(self) -> set[models.Habit]:
+        """
+        Habits tracked at the date of the state.
+        """
+        return set(self._context.tracked_habits.values())
+
+    def get_state(
+        self,
+    ) -> typing.Tuple[
+        set[models.Habit],
+        list[models.HabitRecord],
+        list[models.HabitRecordMatch],
+    ]:
+        """
+        Get the state in the format of `get_state_at_date`. The lists are the ones of the state,
+        copy them to keep them while applying more directives.
+
+        :return: Tracked habits, list of records, list of matches.
+        """
+        return self.tracked_habits, self.records, self.habits_records_matches
+
+    def get_checkpoint(self) -> Checkpoint:
+        """
+        Summarize the state, see `get_checkpoint_at_date`.
+
+        :return: Checkpoint at the date of the state.
+        """
+        if self.date is None:
+            raise ValueError("No directive has been applied")
+        return _make_checkpoint(self.date, self._context, self.last_record_dates)
+
+    def apply(self, directive: directives.Directive):
+        """
+        Apply a directive.
+
+        :param directive: Directive, not older than the directives already applied.
+        """
+        if self.date is not None and directive.date < self.date:
+            raise ValueError(
+                f"Directive older than the state: {directive.date} < {self.date}"
+            )
+        if isinstance(directive, directives.RecordDirective):
+            self._apply_record(directive)
+        else:
+            if self._last_record_date == directive.date:
+                raise ValueError(
+                    "Track and untrack directives must be applied before the records of their date"
+                )
+            if isinstance(directive, directives.TrackDirective):
+                self._apply_track(directive)
+            elif isinstance(directive, directives.UntrackDirective):
+                self._apply_untrack(directive)
+        self.date = directive.date
+
+    def apply_many(self, directives_: typing.Iterable[directives.Directive]):
+        """
+        Apply directives, sorted by date and with the track and untrack directives of a date
+        first. Sorting is linear when the directives are already in order, such as appended
+        directives. If a directive fails a check, the directives before it stay applied.
+
+        :param directives_: Directives, not older than the directives already applied.
+        """
+        for directive in sorted(
+            directives_,
+            key=lambda directive_: (
+                directive_.date,
+                isinstance(directive_, directives.RecordDirective),
+            ),
+        ):
+            self.apply(directive)
+
+    def _apply_track(self, directive: directives.TrackDirective):
+        habit = self._context.track(directive)
+        habit_records: list[models.HabitRecord] = []
+        match = models.HabitRecordMatch(habit, habit_records, directive.date, None)
+        self.habits_records_matches.append(match)
+        self._open_matches[directive.habit_name] = match
+        self._open_records[directive.habit_name] = habit_records
+
+    def _apply_untrack(self, directive: directives.UntrackDirective):
+        self._context.untrack(directive)
+        self._open_matches.pop(directive.habit_name).tracking_end_date = directive.date
+        del self._open_records[directive.habit_name]
+
+    def _apply_record(self, directive: directives.RecordDirective):
+        self._context.record(directive)
+        record = _build_habit_record_from_record_directive(directive)
+        self.records.append(record)
+        self._open_records[directive.habit_name].append(record)
+        habit_name = directive.habit_name
+        self.n_records[habit_name] = self.n_records.get(habit_name, 0) + 1
+        self.value_sums[habit_name] = self.value_sums.get(habit_name, 0.0) + (
+            float(directive.value) if directive.value else 0.0
+        )
+        self.last_record_dates[habit_name] = directive.date
+        self._last_record_date = directive.date
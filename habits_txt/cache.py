@@ -0,0 +1,304 @@
+import dataclasses
+import datetime as dt
+import hashlib
+import itertools
+import logging
+import os
+import pickle
+import typing
+
+import habits_txt.builder as builder
+import habits_txt.compiled as compiled
+import habits_txt.config as config
+import habits_txt.defaults as defaults
+import habits_txt.directives as directives
+import habits_txt.parser as parser
+
+_CACHE_VERSION = 3
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+@dataclasses.dataclass
+class ParseCacheEntry:
+    """
+    Directives parsed from the first `offset` bytes of a journal file.
+
+    The prefix hash detects edits to the cached part of the file. Only complete lines are cached,
+    so `offset` is always at a line boundary. The checkpoints are built from the first
+    `n_checkpointed_directives` directives, dated up to `checkpointed_until`.
+
+    Example:
+        settings: Snapshot(date_fmt="%Y-%m-%d", comment_char="#", journal=None)
+        offset: 1024
+        prefix_hash: "9f86d081884c7d65..."
+        n_lines: 32
+        parsed_directives: [TrackDirective(...), RecordDirective(...)]
+        errors: ["Error parsing line 3: Invalid date format"]
+        checkpoints: [Checkpoint(date=2024-01-31, ...)]
+        n_checkpointed_directives: 40
+        checkpointed_until: 2024-02-01
+    """
+
+    settings: config.Snapshot
+    offset: int = 0
+    prefix_hash: str = hashlib.sha256().hexdigest()
+    n_lines: int = 0
+    parsed_directives: list[directives.Directive] = dataclasses.field(
+        default_factory=list
+    )
+    errors: list[str] = dataclasses.field(default_factory=list)
+    checkpoints: list[builder.Checkpoint] | None = None
+    n_checkpointed_directives: int = 0
+    checkpointed_until: dt.date | None = None
+    version: int = _CACHE_VERSION
+
+
+def iter_directives(
+    journal_file: str | os.PathLike,
+    on_error: typing.Callable[[str], None] | None = None,
+) -> typing.Iterator[directives.Directive]:
+    """
+    Parse a journal file like `parser.iter_directives`, reusing the directives cached by previous runs.
+
+    Only the bytes appended since the last run are parsed. If the cached part of the file has
+    changed, or the configuration it was parsed with, the whole file is parsed again.
+    A compiled sidecar newer than the journal is used instead of the cache.
+    Errors of the cached lines are reported again, before the errors of the new lines.
+
+    :param journal_file: Path to the journal file.
+    :param on_error: Function called with each parse error.
+    :return: Iterator over the parsed directives.
+    """
+    entry, _, uncached_directives = _load(journal_file, on_error)
+    if entry is not None:
+        yield from entry.parsed_directives
+    yield from uncached_directives
+
+
+def load_checkpoint(
+    journal_file: str | os.PathLike,
+    date: dt.date,
+    on_error: typing.Callable[[str], None] | None = None,
+) -> typing.Tuple[builder.Checkpoint | None, list[directives.Directive]]:
+    """
+    Parse a journal file like `iter_directives` and get the latest checkpoint at a date, with the
+    directives it does not cover.
+
+    Checkpoints are built from the cached directives and saved with them, so they are dropped
+    when the cached part of the file changes. They are built again once the cached directives
+    reach a month past the ones they were built from. A checkpoint is not used if a directive
+    it was not built from is dated at or before it.
+
+    :param journal_file: Path to the journal file.
+    :param date: Date of the state to build.
+    :param on_error: Function called with each parse error.
+    :return: Checkpoint, None if there is none to start from, and the directives after it.
+    """
+    entry, cache_path, uncached_directives = _load(journal_file, on_error)
+    if entry is None:
+        return None, uncached_directives
+
+    if _needs_checkpoints(entry):
+        entry.checkpoints = builder.build_checkpoints(entry.parsed_directives)
+        entry.n_checkpointed_directives = len(entry.parsed_directives)
+        entry.checkpointed_until = max(
+            (directive.date for directive in entry.parsed_directives), default=None
+        )
+        _save_entry(cache_path, entry)
+
+    n_checkpointed = entry.n_checkpointed_directives
+    checkpointed = entry.parsed_directives[:n_checkpointed]
+    not_checkpointed = entry.parsed_directives[n_checkpointed:]
+    not_checkpointed.extend(uncached_directives)
+    earliest_date = min(
+        (directive.date for directive in not_checkpointed), default=dt.date.max
+    )
+    checkpoint = None
+    for checkpoint_ in entry.checkpoints or []:
+        if checkpoint_.date > date or checkpoint_.date >= earliest_date:
+            break
+        checkpoint = checkpoint_
+    if checkpoint is None:
+        return None, checkpointed + not_checkpointed
+    return (
+        checkpoint,
+        [directive for directive in checkpointed if directive.date > checkpoint.date]
+        + not_checkpointed,
+    )
+
+
+def _needs_checkpoints(entry: ParseCacheEntry) -> bool:
+    """
+    Check if the checkpoints of a cache entry must be built again.
+
+    :param entry: Cache entry.
+    :return: True if they were never built or if a cached directive is in a later month than
+        the directives they were built from.
+    """
+    if entry.checkpoints is None:
+        return True
+    if entry.checkpointed_until is None:
+        return len(entry.parsed_directives) > entry.n_checkpointed_directives
+    last_month = (entry.checkpointed_until.year, entry.checkpointed_until.month)
+    return any(
+        (directive.date.year, directive.date.month) > last_month
+        for directive in itertools.islice(
+            entry.parsed_directives, entry.n_checkpointed_directives, None
+        )
+    )
+
+
+def _load(
+    journal_file: str | os.PathLike,
+    on_error: typing.Callable[[str], None] | None,
+) -> typing.Tuple[ParseCacheEntry | None, str, list[directives.Directive]]:
+    """
+    Parse a journal file, updating its cache entry.
+
+    :param journal_file: Path to the journal file.
+    :param on_error: Function called with each parse error.
+    :return: Cache entry, None if a compiled sidecar was loaded, path to the cache file, and the
+        directives that are not in the cache entry.
+    """
+    # The journal setting does not change how lines are parsed
+    settings = dataclasses.replace(config.snapshot(), journal=None)
+    cache_path = _get_cache_path(journal_file)
+    compiled_journal = compiled.load_if_fresh(journal_file, settings)
+    if compiled_journal is not None:
+        if on_error is not None:
+            for error in compiled_journal[1]:
+                on_error(error)
+        return None, cache_path, compiled_journal[0]
+
+    entry = _load_entry(cache_path, settings)
+
+    with open(journal_file, "rb") as file:
+        prefix_hash = _hash_prefix(file, entry.offset) if entry is not None else None
+        if (
+            entry is None
+            or prefix_hash is None
+            or prefix_hash.hexdigest() != entry.prefix_hash
+        ):
+            entry = ParseCacheEntry(settings)
+            prefix_hash = hashlib.sha256()
+        file.seek(entry.offset)
+        tail = file.read()
+
+    if on_error is not None:
+        for error in entry.errors:
+            on_error(error)
+
+    # A last line without a newline may still be being written, so it is parsed but not cached
+    cut = tail.rfind(b"\n") + 1
+    complete, partial = tail[:cut], tail[cut:]
+    if complete:
+        new_directives, new_errors, n_lines = _parse_bytes(
+            complete, entry.n_lines + 1, on_error
+        )
+        prefix_hash.update(complete)
+        entry.offset += len(complete)
+        entry.prefix_hash = prefix_hash.hexdigest()
+        entry.n_lines += n_lines
+        entry.parsed_directives.extend(new_directives)
+        entry.errors.extend(new_errors)
+        _save_entry(cache_path, entry)
+    uncached_directives: list[directives.Directive] = []
+    if partial:
+        uncached_directives, _, _ = _parse_bytes(partial, entry.n_lines + 1, on_error)
+    return entry, cache_path, uncached_directives
+
+
+def _parse_bytes(
+    data: bytes,
+    first_lineno: int,
+    on_error: typing.Callable[[str], None] | None,
+) -> typing.Tuple[list[directives.Directive], list[str], int]:
+    """
+    Parse a chunk of a journal file made of whole lines.
+
+    :param data: Raw bytes of the chunk.
+    :param first_lineno: Line number of the first line of the chunk.
+    :param on_error: Function called with each parse error.
+    :return: Parsed directives, errors, number of lines in the chunk.
+    """
+    errors: list[str] = []
+
+    def collect_error(error: str):
+        errors.append(error)
+        if on_error is not None:
+            on_error(error)
+
+    parsed, n_lines = parser.parse_bytes(data, collect_error, first_lineno)
+    return parsed, errors, n_lines
+
+
+def _hash_prefix(file: typing.BinaryIO, size: int) -> typing.Any | None:
+    """
+    Hash the first bytes of a file.
+
+    :param file: File opened in binary mode.
+    :param size: Number of bytes to hash.
+    :return: Hash object, None if the file is shorter than `size`.
+    """
+    prefix_hash = hashlib.sha256()
+    remaining = size
+    while remaining > 0:
+        chunk = file.read(min(remaining, _HASH_CHUNK_SIZE))
+        if not chunk:
+            return None
+        prefix_hash.update(chunk)
+        remaining -= len(chunk)
+    return prefix_hash
+
+
+def _get_cache_path(journal_file: str | os.PathLike) -> str:
+    """
+    Get the path of the cache file of a journal.
+
+    :param journal_file: Path to the journal file.
+    :return: Path to the cache file.
+    """
+    key = hashlib.sha256(os.fsencode(os.path.realpath(journal_file))).hexdigest()
+    return os.path.join(defaults.APPDATA_PATH, "cache", f"{key}.pickle")
+
+
+def _load_entry(cache_path: str, settings: config.Snapshot) -> ParseCacheEntry | None:
+    """
+    Load a cache entry.
+
+    :param cache_path: Path to the cache file.
+    :param settings: Current configuration settings.
+    :return: Cache entry, None if missing, unreadable or stale.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            entry = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.debug(f"Ignoring unreadable parse cache {cache_path}: {e}")
+        return None
+    if (
+        not isinstance(entry, ParseCacheEntry)
+        or entry.version != _CACHE_VERSION
+        or entry.settings != settings
+    ):
+        return None
+    return entry
+
+
+def _save_entry(cache_path: str, entry: ParseCacheEntry):
+    """
+    Save a cache entry atomically. Failing to save is not an error, the next run parses again.
+
+    :param cache_path: Path to the cache file.
+    :param entry: Cache entry.
+    """
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.debug(f"Cannot save parse cache {cache_path}: {e}")
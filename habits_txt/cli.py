@@ -4,16 +4,25 @@ import os
 import click
 from dateparser import parse
 
+import habits_txt.analytics as analytics_
 import habits_txt.config as config_
 import habits_txt.defaults as defaults
 import habits_txt.journal as journal_
+import habits_txt.parser as parser_
 import habits_txt.style as style_
 
 
 @click.group()
 @click.version_option()
-def cli():
-    pass
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of processes used to parse the journal "
+    "(defaults to all CPUs for large journals)",
+)
+def cli(jobs):
+    parser_.set_jobs(jobs)
 
 
 def _parse_date_callback(ctx, param, value):
@@ -33,6 +42,17 @@ def _parse_metadata_callback(ctx, param, value):
             raise click.BadParameter("Invalid metadata format. Use meta:value")
 
 
+def _parse_interval_callback(ctx, param, value):
+    try:
+        analytics_.parse_interval(value)
+    except ValueError:
+        raise click.BadParameter(
+            "Invalid interval. Use daily, weekly, monthly, quarterly, yearly "
+            "or a number of days such as 10d"
+        )
+    return value
+
+
 @cli.command()
 @click.argument("file", type=click.File("r+"))
 @click.option(
@@ -94,14 +114,15 @@ def fill(
         end,
         interactive,
     )
+    settings = config_.snapshot()
     if records:
         records_str = "\n".join(
-            [style_.style_habit_record(record) for record in records]
+            [style_.style_habit_record(record, settings) for record in records]
+        )
+        comment = (
+            f"{settings.comment_char} Filled on "
+            f"{dt.datetime.now().strftime(settings.date_fmt)}"
         )
-        comment = f"{config_.get(
-            'comment_char', 'CLI', defaults.COMMENT_CHAR
-        )} Filled on {dt.datetime.now().strftime(config_.get(
-            'date_fmt', 'CLI', defaults.DATE_FMT))}"
         records_str = f"{comment}\n{records_str}" if not no_comment else records_str
         if write_top or write_bottom:
             records_str = click.unstyle(records_str)
@@ -115,9 +136,7 @@ def fill(
         else:
             click.echo(records_str)
     else:
-        click.echo(
-            f"{config_.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} Nothing to fill for {date}"
-        )
+        click.echo(f"{settings.comment_char} Nothing to fill for {date}")
 
 
 @cli.command()
@@ -155,15 +174,14 @@ def filter(file, start, end, name, metadata):
     Filter habit records using FILE.
     """
     records = journal_.filter(file.name, start, end, name, metadata)
+    settings = config_.snapshot()
     if records:
         records_str = "\n".join(
-            [style_.style_habit_record(record) for record in records]
+            [style_.style_habit_record(record, settings) for record in records]
         )
         click.echo(records_str)
     else:
-        click.echo(
-            f"{config_.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} No records found"
-        )
+        click.echo(f"{settings.comment_char} No records found")
 
 
 @cli.command()
@@ -201,27 +219,44 @@ def filter(file, start, end, name, metadata):
     is_flag=True,
     help="Ignore missing records when computing stats",
 )
-def info(file, start, end, name, metadata, ignore_missing):
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of processes used to compute the stats of the habits "
+    "(defaults to one)",
+)
+def info(file, start, end, name, metadata, ignore_missing, jobs):
     """
     Get information about habit records using FILE.
     """
     habit_completion_infos = journal_.info(
-        file.name, start, end, name, metadata, ignore_missing
+        file.name, start, end, name, metadata, ignore_missing, jobs
     )
     if habit_completion_infos:
         for habit_completion_info in habit_completion_infos:
             click.echo(style_.style_completion_info(habit_completion_info))
             click.echo()
     else:
-        click.echo(
-            f"{config_.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} No records found"
-        )
+        click.echo(f"{config_.snapshot().comment_char} No records found")
 
 
 @cli.command()
 @click.argument("file", type=click.File("r"))
 @click.option(
-    "-i", "--interval", type=click.Choice(["weekly", "monthly"]), default="weekly"
+    "-i",
+    "--interval",
+    default="weekly",
+    callback=_parse_interval_callback,
+    help="Interval: daily, weekly, monthly, quarterly, yearly "
+    "or a number of days such as 10d (defaults to weekly)",
+)
+@click.option(
+    "-r",
+    "--rolling",
+    type=click.IntRange(min=1),
+    help="Plot the daily completion over a rolling window of this number of days "
+    "instead of intervals",
 )
 @click.option(
     "-s",
@@ -256,11 +291,13 @@ def info(file, start, end, name, metadata, ignore_missing):
     is_flag=True,
     help="Ignore missing records when computing stats",
 )
-def chart(file, interval, start, end, name, metadata, ignore_missing):
+def chart(file, interval, rolling, start, end, name, metadata, ignore_missing):
     """
     Generate a chart of habit records using FILE.
     """
-    journal_.chart(file.name, interval, start, end, name, metadata, ignore_missing)
+    journal_.chart(
+        file.name, interval, start, end, name, metadata, ignore_missing, rolling
+    )
 
 
 """ tracked command to list the tracked habits at the given date"""
@@ -280,13 +317,12 @@ def tracked(file, date):
     List the tracked habits at the given date.
     """
     tracked_habits = journal_.tracked(file.name, date)
+    settings = config_.snapshot()
     if tracked_habits:
         for habit, tracking_start_date in tracked_habits:
-            click.echo(style_.style_tracked_habit(habit, tracking_start_date))
+            click.echo(style_.style_tracked_habit(habit, tracking_start_date, settings))
     else:
-        click.echo(
-            f"{config_.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} No habits found"
-        )
+        click.echo(f"{settings.comment_char} No habits found")
 
 
 @cli.command()
@@ -364,6 +400,30 @@ def config_edit():
     click.edit(filename=defaults.APPDATA_PATH + "/config.ini")
 
 
+@cli.command()
+@click.argument("file", type=click.File("r"))
+def compile(file):
+    """
+    Compile FILE to a binary sidecar for faster loading.
+
+    The sidecar is used as long as it is newer than FILE.
+    """
+    sidecar_path, n_directives = journal_.compile(file.name)
+    click.echo(f"Compiled {n_directives} directives to {sidecar_path}")
+
+
+@cli.command()
+@click.argument("file", type=click.File("r"))
+def sync(file):
+    """
+    Mirror FILE to a SQLite database for faster filtering.
+
+    The database is used as long as it is newer than FILE.
+    """
+    database_path, n_directives = journal_.sync(file.name)
+    click.echo(f"Synced {n_directives} directives to {database_path}")
+
+
 @cli.command(help="Check the journal file is consistent at a given date")
 @click.argument("file", type=click.File("r"))
 @click.option(
@@ -0,0 +1,338 @@
+import array
+import datetime as dt
+import logging
+import mmap
+import os
+import struct
+import sys
+import typing
+
+import habits_txt.config as config
+import habits_txt.directives as directives
+import habits_txt.models as models
+
+SUFFIX = ".hbtxtc"
+
+_MAGIC = b"HBTXTC"
+_VERSION = 1
+_HEADER = struct.Struct("<6sHBxxxI")
+_SECTION = struct.Struct("<cxxxxxxxQ")
+_ALIGNMENT = 8
+
+_KINDS = (
+    directives.DirectiveType.TRACK,
+    directives.DirectiveType.UNTRACK,
+    directives.DirectiveType.RECORD,
+)
+_KIND_IDS = {kind: i for i, kind in enumerate(_KINDS)}
+
+_VALUE_NONE = 0
+_VALUE_FALSE = 1
+_VALUE_TRUE = 2
+_VALUE_NUMBER = 3
+
+# Column name and array typecode, in file order
+_COLUMNS = (
+    ("kinds", "b"),
+    ("dates", "i"),
+    ("linenos", "i"),
+    ("names", "i"),
+    ("value_types", "b"),
+    ("values", "d"),
+    ("frequencies", "i"),
+    ("measurable", "b"),
+    ("metadata", "i"),
+    ("metadata_offsets", "i"),
+    ("metadata_pairs", "i"),
+    ("errors", "i"),
+    ("settings", "i"),
+    ("string_offsets", "q"),
+    ("string_data", "B"),
+)
+
+
+def get_path(journal_file: str | os.PathLike) -> str:
+    """
+    Get the path of the compiled sidecar of a journal file.
+
+    :param journal_file: Path to the journal file.
+    :return: Path to the sidecar file.
+
+    Example:
+    >>> get_path("habits.journal")
+    'habits.journal.hbtxtc'
+    """
+    return os.fspath(journal_file) + SUFFIX
+
+
+def is_fresh(journal_file: str | os.PathLike) -> bool:
+    """
+    Check whether the sidecar of a journal file exists and is newer than the journal.
+
+    :param journal_file: Path to the journal file.
+    :return: True if the sidecar can be used instead of the journal.
+    """
+    try:
+        return (
+            os.stat(get_path(journal_file)).st_mtime_ns
+            > os.stat(journal_file).st_mtime_ns
+        )
+    except OSError:
+        return False
+
+
+def load_if_fresh(
+    journal_file: str | os.PathLike, settings: config.Snapshot
+) -> typing.Tuple[list[directives.Directive], list[str]] | None:
+    """
+    Load the directives of a journal file from its sidecar, if it is up to date.
+
+    :param journal_file: Path to the journal file.
+    :param settings: Configuration settings the journal is parsed with.
+    :return: Directives and parse errors, None if the journal must be parsed.
+    """
+    if not is_fresh(journal_file):
+        return None
+    try:
+        return load(get_path(journal_file), settings)
+    except (OSError, ValueError) as e:
+        logging.debug(f"Ignoring compiled journal {get_path(journal_file)}: {e}")
+        return None
+
+
+def write(
+    path: str | os.PathLike,
+    directives_: typing.Iterable[directives.Directive],
+    errors: typing.Iterable[str],
+    settings: config.Snapshot,
+):
+    """
+    Write directives and parse errors to a compiled sidecar.
+
+    The file is a header followed by one section per column. Each section is an array of fixed-size
+    items, aligned so that it can be read straight from a memory map. Strings are interned in a
+    single table and referenced by index.
+
+    :param path: Path to the sidecar file.
+    :param directives_: Parsed directives.
+    :param errors: Parse errors.
+    :param settings: Configuration settings the directives were parsed with.
+    """
+    columns: dict[str, array.array[typing.Any]] = {
+        name: array.array(typecode) for name, typecode in _COLUMNS
+    }
+    string_ids: dict[str, int] = {}
+    metadata_ids: dict[tuple, int] = {(): 0}
+    columns["metadata_offsets"].extend((0, 0))
+
+    def intern(string: str) -> int:
+        string_id = string_ids.get(string)
+        if string_id is None:
+            string_id = string_ids[string] = len(string_ids)
+        return string_id
+
+    for directive in directives_:
+        columns["kinds"].append(_KIND_IDS[directive.directive_type])
+        columns["dates"].append(directive.date.toordinal())
+        columns["linenos"].append(directive.lineno)
+        columns["names"].append(intern(directive.habit_name))
+
+        value = getattr(directive, "value", None)
+        if value is None:
+            columns["value_types"].append(_VALUE_NONE)
+        elif isinstance(value, bool):
+            columns["value_types"].append(_VALUE_TRUE if value else _VALUE_FALSE)
+        else:
+            columns["value_types"].append(_VALUE_NUMBER)
+        columns["values"].append(
+            value if isinstance(value, float) else float(value or 0)
+        )
+
+        frequency = getattr(directive, "frequency", None)
+        columns["frequencies"].append(
+            intern(frequency.cron_str) if frequency is not None else -1
+        )
+        columns["measurable"].append(getattr(directive, "is_measurable", False))
+
+        metadata_key = tuple(directive.metadata.items())
+        metadata_id = metadata_ids.get(metadata_key)
+        if metadata_id is None:
+            metadata_id = metadata_ids[metadata_key] = len(metadata_ids)
+            for key, value in metadata_key:
+                columns["metadata_pairs"].extend((intern(key), intern(value)))
+            columns["metadata_offsets"].append(len(columns["metadata_pairs"]))
+        columns["metadata"].append(metadata_id)
+
+    columns["errors"].extend(intern(error) for error in errors)
+    columns["settings"].extend(
+        (intern(settings.date_fmt), intern(settings.comment_char))
+    )
+
+    string_data = bytearray()
+    columns["string_offsets"].append(0)
+    for string in string_ids:
+        string_data += string.encode()
+        columns["string_offsets"].append(len(string_data))
+    columns["string_data"].frombytes(bytes(string_data))
+
+    tmp_path = f"{os.fspath(path)}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                _MAGIC, _VERSION, sys.byteorder == "big", len(columns["kinds"])
+            )
+        )
+        for name, typecode in _COLUMNS:
+            data = columns[name].tobytes()
+            f.write(_SECTION.pack(typecode.encode(), len(data)))
+            f.write(data)
+            f.write(b"\0" * (-len(data) % _ALIGNMENT))
+    os.replace(tmp_path, path)
+
+
+def load(
+    path: str | os.PathLike, settings: config.Snapshot
+) -> typing.Tuple[list[directives.Directive], list[str]] | None:
+    """
+    Load directives and parse errors from a compiled sidecar.
+
+    :param path: Path to the sidecar file.
+    :param settings: Configuration settings the journal is parsed with.
+    :return: Directives and parse errors, None if the sidecar was compiled with other settings.
+    :raises ValueError: If the file is not a compiled journal.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as buffer:
+            columns = _read_columns(buffer)
+
+    data = columns["string_data"].tobytes()
+    offsets = columns["string_offsets"].tolist()
+    strings = [data[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+
+    date_fmt_id, comment_char_id = columns["settings"].tolist()
+    if (strings[date_fmt_id], strings[comment_char_id]) != (
+        settings.date_fmt,
+        settings.comment_char,
+    ):
+        return None
+
+    metadata_offsets = columns["metadata_offsets"].tolist()
+    metadata_pairs = [strings[i] for i in columns["metadata_pairs"].tolist()]
+    metadata_table = [
+        tuple(zip(pairs[::2], pairs[1::2]))
+        for pairs in (
+            metadata_pairs[start:end]
+            for start, end in zip(metadata_offsets, metadata_offsets[1:])
+        )
+    ]
+    frequencies = {
+        frequency_id: models.Frequency.from_string(strings[frequency_id])
+        for frequency_id in set(columns["frequencies"].tolist()) - {-1}
+    }
+
+    # Journals have many directives per day, so each date object is shared
+    dates = {
+        ordinal: dt.date.fromordinal(ordinal)
+        for ordinal in set(columns["dates"].tolist())
+    }
+
+    parsed_directives: list[directives.Directive] = []
+    append = parsed_directives.append
+    for (
+        kind,
+        date,
+        lineno,
+        name,
+        value_type,
+        value,
+        frequency,
+        measurable,
+        metadata,
+    ) in zip(
+        columns["kinds"].tolist(),
+        columns["dates"].tolist(),
+        columns["linenos"].tolist(),
+        columns["names"].tolist(),
+        columns["value_types"].tolist(),
+        columns["values"].tolist(),
+        columns["frequencies"].tolist(),
+        columns["measurable"].tolist(),
+        columns["metadata"].tolist(),
+    ):
+        directive_type = _KINDS[kind]
+        if directive_type == directives.DirectiveType.RECORD:
+            if value_type == _VALUE_NUMBER:
+                parsed_value: bool | float | None = value
+            elif value_type == _VALUE_NONE:
+                parsed_value = None
+            else:
+                parsed_value = value_type == _VALUE_TRUE
+            append(
+                directives.RecordDirective(
+                    dates[date],
+                    strings[name],
+                    lineno,
+                    parsed_value,
+                    dict(metadata_table[metadata]),
+                )
+            )
+        elif directive_type == directives.DirectiveType.TRACK:
+            append(
+                directives.TrackDirective(
+                    dates[date],
+                    strings[name],
+                    lineno,
+                    dict(metadata_table[metadata]),
+                    frequencies[frequency],
+                    bool(measurable),
+                )
+            )
+        else:
+            append(
+                directives.UntrackDirective(
+                    dates[date],
+                    strings[name],
+                    lineno,
+                    dict(metadata_table[metadata]),
+                )
+            )
+
+    errors = [strings[i] for i in columns["errors"].tolist()]
+    return parsed_directives, errors
+
+
+def _read_columns(buffer: memoryview) -> dict[str, array.array]:
+    """
+    Read the columns of a compiled sidecar.
+
+    :param buffer: Contents of the sidecar file.
+    :return: Columns by name.
+    :raises ValueError: If the file is not a compiled journal.
+    """
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Truncated compiled journal")
+    magic, version, big_endian, n_directives = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Not a compiled journal or unsupported version")
+    swap = bool(big_endian) != (sys.byteorder == "big")
+
+    columns = {}
+    position = _HEADER.size
+    for name, typecode in _COLUMNS:
+        if position + _SECTION.size > len(buffer):
+            raise ValueError("Truncated compiled journal")
+        section_typecode, size = _SECTION.unpack_from(buffer, position)
+        position += _SECTION.size
+        if section_typecode != typecode.encode() or position + size > len(buffer):
+            raise ValueError("Corrupted compiled journal")
+        column = array.array(typecode)
+        end = position + size
+        column.frombytes(buffer[position:end])
+        if swap:
+            column.byteswap()
+        columns[name] = column
+        position = end + (-size % _ALIGNMENT)
+
+    if len(columns["kinds"]) != n_directives:
+        raise ValueError("Corrupted compiled journal")
+    return columns
@@ -1,9 +1,27 @@
 import configparser
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 
 import habits_txt.defaults as defaults
 
 
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Immutable snapshot of the configuration settings.
+
+    Example:
+        date_fmt: "%Y-%m-%d"
+        comment_char: "#"
+        journal: "/path/to/habits.journal"
+    """
+
+    date_fmt: str = defaults.DATE_FMT
+    comment_char: str = defaults.COMMENT_CHAR
+    journal: str | None = None
+
+
 def setup():
     if not os.path.exists(defaults.APPDATA_PATH):
         os.makedirs(defaults.APPDATA_PATH)
@@ -42,6 +60,7 @@ def set(key, value, section):
     config[section][key] = value
     with open(config_path, "w") as f:
         config.write(f)
+    _load_snapshot.cache_clear()
 
 
 def get(key, section, default=None):
@@ -61,6 +80,7 @@ def delete(key, section):
     del config[section][key]
     with open(config_path, "w") as f:
         config.write(f)
+    _load_snapshot.cache_clear()
 
 
 def get_all():
@@ -75,3 +95,42 @@ def get_section(section):
     config = configparser.ConfigParser()
     config.read(config_path)
     return dict(config[section])
+
+
+def snapshot() -> Snapshot:
+    """
+    Get a snapshot of the configuration settings.
+
+    The configuration file is read once per process, and read again only when it has been
+    modified since the last snapshot.
+
+    :return: Configuration snapshot.
+    """
+    config_path = os.path.join(defaults.APPDATA_PATH, "config.ini")
+    try:
+        stat = os.stat(config_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        version = None
+    return _load_snapshot(config_path, version)
+
+
+@lru_cache(maxsize=1)
+def _load_snapshot(config_path: str, version: tuple[int, int] | None) -> Snapshot:
+    """
+    Load a snapshot of the configuration settings.
+
+    :param config_path: Path to the configuration file.
+    :param version: Modification time and size of the configuration file, used as a cache key.
+    :return: Configuration snapshot.
+    """
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    if not config.has_section("CLI"):
+        return Snapshot()
+    section = config["CLI"]
+    return Snapshot(
+        date_fmt=section.get("date_fmt", defaults.DATE_FMT),
+        comment_char=section.get("comment_char", defaults.COMMENT_CHAR),
+        journal=section.get("journal"),
+    )
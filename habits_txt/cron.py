@@ -0,0 +1,276 @@
+import calendar
+import datetime as dt
+
+import croniter
+import numpy as np
+
+_ALL_DAYS_OF_MONTH = 0b11111111111111111111111111111110  # Bits 1 to 31
+_ALL_MONTHS = 0b1111111111110  # Bits 1 to 12
+_ALL_DAYS_OF_WEEK = 0b1111111  # Bits 0 (Sunday) to 6
+# Past this, the schedule gives up and lets croniter report that it never matches
+_MAX_YEARS_BETWEEN_MATCHES = 50
+_UNIX_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+
+
+class DaySchedule:
+    """
+    Day-granular cron schedule compiled to bitmasks.
+
+    Only the day of month, month and day of week fields select days, the minute and hour fields
+    only tell whether a date can match itself. Use `compile` to build one.
+
+    Example:
+        days_of_month: 0b10  # 1st of the month
+        months: 0b1111111111110  # Every month
+        days_of_week: 0b1111111  # Every day of the week
+        day_or: False
+        same_day: False
+    """
+
+    __slots__ = ("days_of_month", "months", "days_of_week", "day_or", "same_day")
+
+    def __init__(
+        self,
+        days_of_month: int,
+        months: int,
+        days_of_week: int,
+        day_or: bool,
+        same_day: bool,
+    ):
+        self.days_of_month = days_of_month
+        self.months = months
+        self.days_of_week = days_of_week
+        self.day_or = day_or
+        self.same_day = same_day
+
+    def matches(self, date: dt.date) -> bool:
+        """
+        Check whether the schedule fires on a date.
+
+        :param date: Date to check.
+        :return: True if the schedule fires on the date.
+        """
+        if not self.months >> date.month & 1:
+            return False
+        return self._matches_day(date.day, date.toordinal() % 7)
+
+    def _matches_day(self, day: int, day_of_week: int) -> bool:
+        dom_matches = self.days_of_month >> day & 1
+        dow_matches = self.days_of_week >> day_of_week & 1
+        if self.day_or:
+            return bool(dom_matches or dow_matches)
+        return bool(dom_matches and dow_matches)
+
+    def next_date(self, date: dt.date) -> dt.date | None:
+        """
+        Get the date of the next fire time after midnight of a date, like `croniter.get_next`.
+
+        :param date: Current date.
+        :return: Next date, None if the schedule does not fire in the next years.
+        """
+        ordinal = date.toordinal() + (0 if self.same_day else 1)
+        start = dt.date.fromordinal(ordinal)
+        year, month, day = start.year, start.month, start.day
+        # toordinal() % 7 is the cron day of week: 0 for Sunday
+        day_of_week = ordinal % 7
+
+        while year <= date.year + _MAX_YEARS_BETWEEN_MATCHES:
+            n_days = calendar.monthrange(year, month)[1]
+            if (
+                self.months >> month & 1
+                and self.days_of_week == _ALL_DAYS_OF_WEEK
+                and not self.day_or
+            ):
+                # Only the day of month matters, take the lowest matching day left
+                days_left = self.days_of_month >> day << day
+                next_day = (days_left & -days_left).bit_length() - 1
+                if 0 < next_day <= n_days:
+                    return dt.date(year, month, next_day)
+                day_of_week = (day_of_week + n_days - day + 1) % 7
+            elif self.months >> month & 1:
+                for day in range(day, n_days + 1):
+                    if self._matches_day(day, day_of_week):
+                        return dt.date(year, month, day)
+                    day_of_week = (day_of_week + 1) % 7
+            else:
+                day_of_week = (day_of_week + n_days - day + 1) % 7
+            day = 1
+            month += 1
+            if month > 12:
+                month = 1
+                year += 1
+        return None
+
+    def count(self, start_date: dt.date, end_date: dt.date) -> int:
+        """
+        Count the dates the schedule fires on between two dates, both included.
+
+        Each month is counted in bulk from the bitmasks, only the days matching both day fields
+        of OR schedules are enumerated, so this takes time proportional to the number of months.
+
+        :param start_date: Start date.
+        :param end_date: End date.
+        :return: Number of dates.
+
+        Example:
+        >>> compile("0 0 * * 1").count(dt.date(2024, 1, 1), dt.date(2024, 1, 31))
+        5
+        """
+        n_dates = 0
+        year, month = start_date.year, start_date.month
+        # toordinal() % 7 is the cron day of week: 0 for Sunday
+        first_day_of_week = dt.date(year, month, 1).toordinal() % 7
+        while (year, month) <= (end_date.year, end_date.month):
+            n_days = calendar.monthrange(year, month)[1]
+            if self.months >> month & 1:
+                first_day = (
+                    start_date.day
+                    if (year, month) == (start_date.year, start_date.month)
+                    else 1
+                )
+                last_day = (
+                    end_date.day
+                    if (year, month) == (end_date.year, end_date.month)
+                    else n_days
+                )
+                if first_day <= last_day:
+                    n_dates += self._count_in_month(
+                        first_day_of_week, first_day, last_day
+                    )
+            first_day_of_week = (first_day_of_week + n_days) % 7
+            month += 1
+            if month > 12:
+                month = 1
+                year += 1
+        return n_dates
+
+    def dates(self, start_date: dt.date, end_date: dt.date) -> np.ndarray:
+        """
+        Get the dates the schedule fires on between two dates, both included.
+
+        Every day of the range is checked at once against lookup tables of the bitmasks.
+
+        :param start_date: Start date.
+        :param end_date: End date.
+        :return: Date ordinals, in order.
+
+        Example:
+        >>> compile("0 0 * * 1").dates(dt.date(2024, 1, 1), dt.date(2024, 1, 10))
+        array([738886, 738893])
+        """
+        ordinals = np.arange(start_date.toordinal(), end_date.toordinal() + 1)
+        days = (ordinals - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+        months = days.astype("datetime64[M]")
+        month_numbers = months.astype(np.int64) % 12 + 1
+        day_numbers = (days - months).astype(np.int64) + 1
+
+        month_matches = _to_table(self.months, 13)[month_numbers]
+        dom_matches = _to_table(self.days_of_month, 32)[day_numbers]
+        # ordinal % 7 is the cron day of week: 0 for Sunday
+        dow_matches = _to_table(self.days_of_week, 7)[ordinals % 7]
+        if self.day_or:
+            day_matches = dom_matches | dow_matches
+        else:
+            day_matches = dom_matches & dow_matches
+        return ordinals[month_matches & day_matches]
+
+    def _count_in_month(
+        self, first_day_of_week: int, first_day: int, last_day: int
+    ) -> int:
+        """
+        Count the matching days of a month between two days, both included.
+
+        :param first_day_of_week: Cron day of week of the 1st of the month.
+        :param first_day: First day of month.
+        :param last_day: Last day of month.
+        :return: Number of days.
+        """
+        days = (1 << (last_day + 1)) - (1 << first_day)
+        dom_count = (self.days_of_month & days).bit_count()
+        if self.days_of_week == _ALL_DAYS_OF_WEEK and not self.day_or:
+            return dom_count
+
+        start_day_of_week = (first_day_of_week + first_day - 1) % 7
+        n_days = last_day - first_day + 1
+        dow_count = (n_days // 7) * self.days_of_week.bit_count()
+        for i in range(n_days % 7):
+            dow_count += self.days_of_week >> ((start_day_of_week + i) % 7) & 1
+        if self.days_of_month == _ALL_DAYS_OF_MONTH and not self.day_or:
+            return dow_count
+
+        both_count = 0
+        dom_days = self.days_of_month & days
+        while dom_days:
+            day = (dom_days & -dom_days).bit_length() - 1
+            both_count += self.days_of_week >> ((first_day_of_week + day - 1) % 7) & 1
+            dom_days &= dom_days - 1
+        if not self.day_or:
+            return both_count
+        # Days matching either field, without counting twice the ones matching both
+        return dom_count + dow_count - both_count
+
+
+def compile(cron_str: str) -> DaySchedule | None:
+    """
+    Compile a five-field cron string to a day schedule.
+
+    :param cron_str: Cron string with the minute and hour fields.
+    :return: Day schedule, None if the string uses features only croniter supports,
+        such as last day of month or nth day of week.
+
+    Example:
+    >>> schedule = compile("0 0 * * 1-5")
+    >>> schedule.next_date(dt.date(2024, 1, 5))
+    datetime.date(2024, 1, 8)
+    """
+    try:
+        fields, nth_weekday_of_month = croniter.croniter.expand(cron_str)
+    except (ValueError, TypeError):
+        return None
+    if len(fields) != 5 or nth_weekday_of_month:
+        return None
+    minutes, hours, days_of_month, months, days_of_week = fields
+
+    days_of_month_mask = _to_mask(days_of_month, _ALL_DAYS_OF_MONTH)
+    months_mask = _to_mask(months, _ALL_MONTHS)
+    days_of_week_mask = _to_mask(days_of_week, _ALL_DAYS_OF_WEEK, modulo=7)
+    if days_of_month_mask is None or months_mask is None or days_of_week_mask is None:
+        return None
+    return DaySchedule(
+        days_of_month_mask,
+        months_mask,
+        days_of_week_mask,
+        day_or=days_of_month[0] != "*" and days_of_week[0] != "*",
+        # Starting from midnight, a fire time later in the day is still on the same date
+        same_day=minutes != [0] or hours != [0],
+    )
+
+
+def _to_mask(values: list, all_values: int, modulo: int | None = None) -> int | None:
+    """
+    Convert an expanded cron field to a bitmask.
+
+    :param values: Expanded field values.
+    :param all_values: Bitmask of a field set to '*'.
+    :param modulo: Modulo applied to the values, 7 maps Sunday written as 7 to 0.
+    :return: Bitmask, None if a value is not a plain number.
+    """
+    if values == ["*"]:
+        return all_values
+    mask = 0
+    for value in values:
+        if not isinstance(value, int):
+            return None
+        mask |= 1 << (value % modulo if modulo else value)
+    return mask & all_values
+
+
+def _to_table(mask: int, n_values: int) -> np.ndarray:
+    """
+    Convert a bitmask to a lookup table.
+
+    :param mask: Bitmask.
+    :param n_values: Number of values of the field, bit 0 included.
+    :return: Whether each value is set.
+    """
+    return np.array([mask >> value & 1 for value in range(n_values)], dtype=np.bool_)
@@ -9,6 +9,8 @@ class ParseError(Exception):
 class ConsistencyError(Exception):
     def __init__(self, message: str, directive: directives.Directive):
         self.message = f"Consistency error in line {directive.lineno}: {message}"
+        self.reason = message
+        self.directive = directive
 
     def __str__(self):
         return self.message
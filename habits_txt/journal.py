@@ -1,20 +1,28 @@
 import datetime as dt
+import itertools
 import logging
 import typing
+from concurrent.futures import ProcessPoolExecutor
 
 import click
+import numpy as np
+import pandas as pd
 from plotly import express as px
 
+import habits_txt.analytics as analytics
 import habits_txt.builder as builder
+import habits_txt.compiled as compiled
 import habits_txt.config as config
-import habits_txt.defaults as defaults
 import habits_txt.exceptions as exceptions
 import habits_txt.models as models
 import habits_txt.parser as parser
 import habits_txt.records_query as records_query
-from habits_txt.date import get_date_range
+import habits_txt.storage as storage
 from habits_txt.style import style_habit_input
 
+# Each process of `info` gets a few batches of habits, so that slow habits are spread out
+_BATCHES_PER_JOB = 4
+
 
 def get_state_at_date(journal_file: str, date: dt.date) -> typing.Tuple[
     set[models.Habit],
@@ -28,12 +36,11 @@ def get_state_at_date(journal_file: str, date: dt.date) -> typing.Tuple[
     :param date: Date to check.
     :return: Tracked habits, records, matches between habits and records.
     """
-    directives, parse_errors = parser.parse_file(journal_file)
-    _log_errors(parse_errors)
     try:
-        tracked_habits, records, habits_records_matches = builder.get_state_at_date(
-            directives, date
-        )
+        with storage.get_storage(journal_file, logging.error) as storage_:
+            tracked_habits, records, habits_records_matches = builder.get_state_at_date(
+                storage_.iter_directives(), date
+            )
     except exceptions.ConsistencyError as e:
         logging.error(e)
         logging.error("Cannot continue due to consistency errors")
@@ -42,14 +49,83 @@ def get_state_at_date(journal_file: str, date: dt.date) -> typing.Tuple[
     return tracked_habits, records, habits_records_matches
 
 
-def _log_errors(errors: list[str]):
+def get_tracking_index_at_date(
+    journal_file: str,
+    date: dt.date,
+    habit_name: typing.Collection[str] | None = None,
+    metadata: dict[str, str] | None = None,
+    start_date: dt.date | None = None,
+) -> typing.Tuple[builder.TrackingIndex, dt.date | None]:
     """
-    Log errors.
+    Get the tracking index of the habits at a given date.
+
+    The filters are pushed down to the storage when it supports them, so the index may only have
+    the selected habits and records.
 
-    :param errors: List of errors.
+    :param journal_file: Path to the journal file.
+    :param date: Date to check.
+    :param habit_name: Habit names to select.
+    :param metadata: Metadata of the records to select.
+    :param start_date: Start date of the records to select.
+    :return: Tracking index, with the records, and date of the first record of the journal.
     """
-    for error in errors:
-        logging.error(error)
+    try:
+        with storage.get_storage(journal_file, logging.error) as storage_:
+            selection = storage_.select(date, habit_name, metadata, start_date)
+        index = builder.get_tracking_index_at_date(selection.directives, date)
+    except exceptions.ConsistencyError as e:
+        logging.error(e)
+        logging.error("Cannot continue due to consistency errors")
+        exit(1)
+    if selection.is_filtered:
+        return index, selection.first_record_date
+    return index, index.records.get_min_date()
+
+
+def get_checkpoint_at_date(
+    journal_file: str, date: dt.date, with_records: bool = True
+) -> builder.Checkpoint:
+    """
+    Get a summary of the state of the habits at a given date, starting from the latest
+    checkpoint saved with the journal cache.
+
+    :param journal_file: Path to the journal file.
+    :param date: Date to check.
+    :param with_records: If False, the dates of the last records may be missing.
+    :return: Tracked habits, their tracking start dates and the dates of their last record.
+    """
+    try:
+        with storage.get_storage(journal_file, logging.error) as storage_:
+            checkpoint, directives = storage_.load_checkpoint(date, with_records)
+        return builder.get_checkpoint_at_date(directives, date, checkpoint)
+    except exceptions.ConsistencyError as e:
+        logging.error(e)
+        logging.error("Cannot continue due to consistency errors")
+        exit(1)
+
+
+def iter_states(
+    journal_file: str, start_date: dt.date, end_date: dt.date
+) -> typing.Iterator[
+    typing.Tuple[dt.date, set[models.Habit], list[models.HabitRecord]]
+]:
+    """
+    Get the tracked habits and records at each date of a range, reading the journal once.
+
+    :param journal_file: Path to the journal file.
+    :param start_date: Start date.
+    :param end_date: End date, included.
+    :return: Iterator over the dates, tracked habits and records, see `builder.iter_states`.
+    """
+    try:
+        with storage.get_storage(journal_file, logging.error) as storage_:
+            yield from builder.iter_states(
+                storage_.iter_directives(), start_date, end_date
+            )
+    except exceptions.ConsistencyError as e:
+        logging.error(e)
+        logging.error("Cannot continue due to consistency errors")
+        exit(1)
 
 
 def fill(
@@ -87,9 +163,19 @@ def _fill_range(
     if not start_date or not end_date:
         return []
     records_fill = []
-    for date in get_date_range(start_date, end_date, dt.timedelta(days=1)):
-        records, stop = _fill_day(journal_file, date, interactive)
-        records_fill.extend(records)
+    last_record_dates: dict[str, dt.date] = {}
+    n_records = 0
+    for date, tracked_habits, records in iter_states(
+        journal_file, start_date, end_date
+    ):
+        # Records are sorted by date and the ones of the previous dates are kept
+        for record in itertools.islice(records, n_records, None):
+            last_record_dates[record.habit_name] = record.date
+        n_records = len(records)
+        day_records, stop = _fill_state(
+            date, tracked_habits, last_record_dates, interactive
+        )
+        records_fill.extend(day_records)
         if stop:
             break
     return records_fill
@@ -105,29 +191,33 @@ def _fill_day(
     date: dt.date,
     interactive: bool = False,
 ) -> typing.Tuple[list[models.HabitRecord], bool]:
-    records_fill: list[models.HabitRecord] = []
-    tracked_habits, records, habits_records_matches = get_state_at_date(
-        journal_file, date
+    checkpoint = get_checkpoint_at_date(journal_file, date)
+    return _fill_state(
+        date,
+        set(checkpoint.tracked_habits.values()),
+        checkpoint.last_record_dates,
+        interactive,
     )
+
+
+def _fill_state(
+    date: dt.date,
+    tracked_habits: set[models.Habit],
+    last_record_dates: dict[str, dt.date],
+    interactive: bool = False,
+) -> typing.Tuple[list[models.HabitRecord], bool]:
+    records_fill: list[models.HabitRecord] = []
     if not tracked_habits:
-        logging.info(
-            f"{config.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} No habits tracked"
-        )
+        logging.info(f"{config.snapshot().comment_char} No habits tracked")
         return [], False
     for habit in sorted(tracked_habits, key=lambda habit_: habit_.name):
-        habit_records = [
-            record for record in records if record.habit_name == habit.name
-        ]
-        if not habit_records:
+        last_record_date = last_record_dates.get(habit.name)
+        if last_record_date is None:
             # because we can have a record directive the day we start to track a habit
             next_due_date = habit.frequency.get_next_date(date - dt.timedelta(days=1))
         else:
-            most_recent_and_completed_record = (
-                records_query.get_most_recent_and_completed_record(habit, habit_records)
-            )
-            next_due_date = habit.frequency.get_next_date(
-                most_recent_and_completed_record.date
-            )
+            # Parsed records always have a value, so the last record is the last completed one
+            next_due_date = habit.frequency.get_next_date(last_record_date)
         if next_due_date <= date:
             append = True
             if interactive:
@@ -176,6 +266,46 @@ def _fill_day(
     return records_fill, False
 
 
+def _filter_index(
+    journal_file: str,
+    start_date: dt.date | None,
+    end_date: dt.date,
+    habit_name: typing.Tuple[str, ...] | None,
+    metadata: dict[str, str] | None,
+) -> typing.Tuple[
+    builder.TrackingIndex, dt.date | None, list[builder.TrackingInterval]
+]:
+    """
+    Get the tracking index of a filter and the tracking intervals it selects.
+
+    :param journal_file: Path to the journal file.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :param habit_name: Habit name.
+    :param metadata: Metadata.
+    :return: Tracking index, start date, the date of the first record if no start date is
+        given, None if there are no records, and tracking intervals between the dates.
+    """
+    index, first_record_date = get_tracking_index_at_date(
+        journal_file, end_date, habit_name or None, metadata, start_date
+    )
+    if not start_date:
+        start_date = first_record_date
+        if start_date is None:
+            return index, None, []
+
+    intervals = []
+    for interval in index.intervals:
+        if interval.start_date > end_date or (
+            interval.end_date and interval.end_date < start_date
+        ):
+            continue
+        if habit_name and interval.habit.name not in habit_name:
+            continue
+        intervals.append(interval)
+    return index, start_date, intervals
+
+
 def _filter_state(
     journal_file: str,
     start_date: dt.date | None,
@@ -184,11 +314,11 @@ def _filter_state(
     metadata: dict[str, str] | None,
 ) -> typing.Tuple[
     set[models.Habit],
-    list[models.HabitRecord],
+    typing.Sequence[models.HabitRecord],
     list[models.HabitRecordMatch],
 ]:
     """
-    Filter state.
+    Filter state. Records are views of the journal records, built when they are read.
 
     :param journal_file: Path to the journal file.
     :param start_date: Start date.
@@ -197,59 +327,31 @@ def _filter_state(
     :param metadata: Metadata.
     :return: Filtered state.
     """
-    tracked_habits, records, habits_records_matches = get_state_at_date(
-        journal_file, end_date
+    index, start_date, intervals = _filter_index(
+        journal_file, start_date, end_date, habit_name, metadata
     )
-    if not start_date:
-        try:
-            start_date = min(record.date for record in records)
-        except ValueError:
-            return set(), [], []
+    if start_date is None:
+        return set(), [], []
 
     filtered_tracked_habits = set(
         [
-            habit
-            for habit in tracked_habits
-            if (not habit_name or habit.name in habit_name)
+            interval.habit
+            for interval in index.get_tracked_at(end_date)
+            if (not habit_name or interval.habit.name in habit_name)
         ]
     )
 
-    filtered_records = [
-        record
-        for record in records
-        if start_date <= record.date <= end_date
-        and (not habit_name or record.habit_name in habit_name)
-        and (
-            not metadata
-            or (
-                record.metadata
-                and all(record.metadata.get(k) == v for k, v in metadata.items())
-            )
+    filtered_records = index.records.filter(
+        start_date, end_date, habit_name or None, metadata
+    )
+
+    filtered_habits_records_matches = [
+        builder.build_habit_record_match(
+            index, interval, start_date, end_date, metadata
         )
+        for interval in intervals
     ]
 
-    filtered_habits_records_matches = []
-    for match in habits_records_matches:
-        if match.tracking_start_date > end_date or (
-            match.tracking_end_date and match.tracking_end_date < start_date
-        ):
-            continue
-        if habit_name and match.habit.name not in habit_name:
-            continue
-        match.habit_records = [
-            record
-            for record in match.habit_records
-            if start_date <= record.date <= end_date
-            and (
-                not metadata
-                or (
-                    record.metadata
-                    and all(record.metadata.get(k) == v for k, v in metadata.items())
-                )
-            )
-        ]
-        filtered_habits_records_matches.append(match)
-
     return filtered_tracked_habits, filtered_records, filtered_habits_records_matches
 
 
@@ -270,7 +372,73 @@ def filter(
     :param metadata: Metadata.
     :return: Filtered records.
     """
-    return _filter_state(journal_file, start_date, end_date, habit_name, metadata)[1]
+    return list(
+        _filter_state(journal_file, start_date, end_date, habit_name, metadata)[1]
+    )
+
+
+def to_frame(
+    journal_file: str,
+    start_date: dt.date | None,
+    end_date: dt.date,
+    habit_name: typing.Tuple[str, ...] | None,
+    metadata: dict[str, str] | None,
+) -> pd.DataFrame:
+    """
+    Get the filtered records as a tidy data frame, see `analytics.build_frame`.
+
+    :param journal_file: Path to the journal file.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :param habit_name: Habit name.
+    :param metadata: Metadata.
+    :return: Data frame of the records, with the tracking interval of each record.
+
+    Example:
+        date        habit  value  interval  place
+        2024-01-02  Read   1.0    0         home
+        2024-01-02  Run    2.5    1         NaN
+    """
+    index, _, _ = _filter_index(
+        journal_file, start_date, end_date, habit_name, metadata
+    )
+    records = index.records.filter(start_date, end_date, habit_name or None, metadata)
+    return analytics.build_frame(index, records)
+
+
+def get_completion_frame(
+    journal_file: str,
+    start_date: dt.date | None,
+    end_date: dt.date,
+    habit_name: typing.Tuple[str, ...] | None,
+    metadata: dict[str, str] | None,
+    ignore_missing: bool = False,
+) -> pd.DataFrame:
+    """
+    Get the completion of habits as a data frame, one row per tracking interval.
+
+    The numbers are the ones of `info`, without the streaks, computed by grouping the records
+    of a data frame by tracking interval. Averages are not rounded.
+
+    :param journal_file: Path to the journal file.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :param habit_name: Habit name.
+    :param metadata: Metadata.
+    :param ignore_missing: Ignore missing records when computing stats.
+    :return: Completion of each tracking interval, see `analytics.get_completion`.
+    """
+    index, filter_start_date, intervals = _filter_index(
+        journal_file, start_date, end_date, habit_name, metadata
+    )
+    records = index.records.filter(
+        filter_start_date, end_date, habit_name or None, metadata
+    )
+    return analytics.get_completion(
+        analytics.build_frame(index, records),
+        analytics.build_interval_frame(index, intervals, start_date, end_date),
+        ignore_missing,
+    )
 
 
 def check(journal_file: str, date: dt.date) -> bool:
@@ -281,10 +449,39 @@ def check(journal_file: str, date: dt.date) -> bool:
     :param date: Date to check.
     :return: If it returns something, it means the journal is consistent.
     """
-    get_state_at_date(journal_file, date)
+    get_checkpoint_at_date(journal_file, date)
     return True
 
 
+def compile(journal_file: str) -> typing.Tuple[str, int]:
+    """
+    Compile the journal to a binary sidecar that is loaded instead of parsing the journal.
+
+    :param journal_file: Path to the journal file.
+    :return: Path to the sidecar file, number of compiled directives.
+    """
+    settings = config.snapshot()
+    errors: list[str] = []
+    with open(journal_file, "rb") as f:
+        directives, _ = parser.parse_bytes(f.read(), errors.append)
+    for error in errors:
+        logging.error(error)
+    sidecar_path = compiled.get_path(journal_file)
+    compiled.write(sidecar_path, directives, errors, settings)
+    return sidecar_path, len(directives)
+
+
+def sync(journal_file: str) -> typing.Tuple[str, int]:
+    """
+    Mirror the journal to a SQLite database that is read instead of the journal while it is up to
+    date.
+
+    :param journal_file: Path to the journal file.
+    :return: Path to the database, number of mirrored directives.
+    """
+    return storage.sync(journal_file, on_error=logging.error)
+
+
 def info(
     journal_file: str,
     start_date: dt.date | None,
@@ -292,104 +489,151 @@ def info(
     habit_name: typing.Tuple[str, ...] | None,
     metadata: dict[str, str] | None,
     ignore_missing: bool = False,
+    jobs: int | None = None,
 ) -> list[models.HabitCompletionInfo]:
     """
     Get information about the completion of habits.
 
+    The stats of each tracking interval are independent, so with several jobs they are computed
+    by batches in a process pool. The results are in the same order either way.
+
     :param journal_file: Path to the journal file.
     :param start_date: Start date.
     :param end_date: End date.
     :param habit_name: Habit name.
     :param metadata: Metadata.
     :param ignore_missing: Ignore missing records when computing stats.
+    :param jobs: Number of processes computing the stats, None to compute them in this process.
     :return: Information about the completion of habits.
     """
-    tracked_habits, records, habits_records_matches = _filter_state(
+    index, filter_start_date, intervals = _filter_index(
         journal_file, start_date, end_date, habit_name, metadata
     )
-    completion_infos = []
-    for match in habits_records_matches:
-        effective_start_date = match.tracking_start_date
+    tasks = []
+    for interval in intervals:
+        effective_start_date = interval.start_date
         if start_date and start_date > effective_start_date:
             effective_start_date = start_date
 
         effective_end_date = end_date
-        if match.tracking_end_date and match.tracking_end_date < end_date:
-            effective_end_date = match.tracking_end_date
-
-        n_records = len(match.habit_records)
-        n_records_expected = match.habit.frequency.get_n_dates(
-            effective_start_date, effective_end_date
+        if interval.end_date and interval.end_date < end_date:
+            effective_end_date = interval.end_date
+
+        # Arrays are sent to the processes rather than the records view and its whole table
+        view = index.get_record_view(interval, filter_start_date, end_date, metadata)
+        tasks.append(
+            _HabitStatsTask(
+                interval.habit.frequency,
+                view.dates,
+                view.values,
+                effective_start_date,
+                effective_end_date,
+            )
         )
 
-        non_none_values = [
-            record.value for record in match.habit_records if record.value
-        ]
-        sum_values = sum(float(value) for value in non_none_values)
+    if jobs is not None and jobs > 1 and len(tasks) > 1:
+        batches = _split_batches(tasks, jobs * _BATCHES_PER_JOB)
+        logging.debug(f"Computing stats of {len(tasks)} habits in {jobs} processes")
+        with ProcessPoolExecutor(min(jobs, len(batches))) as executor:
+            stats = list(
+                itertools.chain.from_iterable(
+                    executor.map(
+                        _get_habit_stats, batches, itertools.repeat(ignore_missing)
+                    )
+                )
+            )
+    else:
+        stats = _get_habit_stats(tasks, ignore_missing)
 
-        round_decimals = 2
-        average_total = (
-            round(sum_values / n_records_expected, round_decimals)
-            if n_records_expected
-            else 0
-        )
-        average_present = (
-            round(sum_values / n_records, round_decimals) if n_records else 0
+    return [
+        models.HabitCompletionInfo(
+            interval.habit, *habit_stats, task.start_date, task.end_date
         )
+        for interval, task, habit_stats in zip(intervals, tasks, stats)
+    ]
 
-        # add missing records
-        sorted_records = sorted(match.habit_records, key=lambda record: record.date)
-        all_records = []
-        next_expected_date = None
-        for record in sorted_records:
-            if next_expected_date:
-                while next_expected_date < record.date:
-                    all_records.append(
-                        models.HabitRecord(next_expected_date, match.habit.name, None)
-                    )
-                    next_expected_date = match.habit.frequency.get_next_date(
-                        next_expected_date
-                    )
-            all_records.append(record)
-            next_expected_date = match.habit.frequency.get_next_date(record.date)
 
-        if next_expected_date and next_expected_date <= effective_end_date:
-            while next_expected_date <= effective_end_date:
-                all_records.append(
-                    models.HabitRecord(next_expected_date, match.habit.name, None)
-                )
-                next_expected_date = match.habit.frequency.get_next_date(
-                    next_expected_date
+class _HabitStatsTask(typing.NamedTuple):
+    """
+    Records of a tracking interval, with the dates to compute their stats between.
+    """
+
+    frequency: models.Frequency
+    dates: np.ndarray
+    values: np.ndarray
+    start_date: dt.date
+    end_date: dt.date
+
+
+def _get_habit_stats(
+    tasks: list[_HabitStatsTask], ignore_missing: bool
+) -> list[typing.Tuple[int, int, float, int, int]]:
+    """
+    Compute the stats of tracking intervals.
+
+    :param tasks: Records of the tracking intervals.
+    :param ignore_missing: Ignore missing records when computing stats.
+    :return: Number of records, number of expected records, average value, longest streak and
+        latest streak of each tracking interval.
+    """
+    counts = []
+    completions = []
+    for task in tasks:
+        is_completed = (task.values != 0) & ~np.isnan(task.values)
+        n_records = len(task.dates)
+        n_records_expected = task.frequency.get_n_dates(task.start_date, task.end_date)
+        sum_values = sum(task.values[is_completed].tolist())
+
+        round_decimals = 2
+        if ignore_missing:
+            average_value = (
+                round(sum_values / n_records, round_decimals) if n_records else 0
+            )
+        else:
+            average_value = (
+                round(sum_values / n_records_expected, round_decimals)
+                if n_records_expected
+                else 0
+            )
+        counts.append((n_records, n_records_expected, average_value))
+
+        if ignore_missing or not n_records:
+            completions.append(is_completed)
+        else:
+            # Records are expected at the frequency dates after the first record
+            expected_dates = task.frequency.get_dates(
+                dt.date.fromordinal(int(task.dates[0]) + 1), task.end_date
+            )
+            completions.append(
+                records_query.get_completions_with_missing(
+                    task.dates, is_completed, expected_dates
                 )
+            )
 
-        longest_streak_total = records_query.get_longest_streak(
-            match.habit, all_records
+    # Streaks of all the habits are computed at once
+    longest_streaks, latest_streaks = records_query.get_streak_lengths(completions)
+    return [
+        habit_counts + (longest_streak, latest_streak)
+        for habit_counts, longest_streak, latest_streak in zip(
+            counts, longest_streaks.tolist(), latest_streaks.tolist()
         )
-        latest_streak_total = records_query.get_latest_streak(match.habit, all_records)
+    ]
 
-        longest_streak = records_query.get_longest_streak(
-            match.habit, match.habit_records
-        )
-        latest_streak = records_query.get_latest_streak(
-            match.habit, match.habit_records
-        )
 
-        completion_info = models.HabitCompletionInfo(
-            match.habit,
-            n_records,
-            n_records_expected,
-            average_present if ignore_missing else average_total,
-            longest_streak if ignore_missing else longest_streak_total,
-            latest_streak if ignore_missing else latest_streak_total,
-            effective_start_date,
-            effective_end_date,
-        )
-        completion_infos.append(completion_info)
+def _split_batches(items: list, n_batches: int) -> list[list]:
+    """
+    Split items into batches of about the same size, in order.
 
-    return completion_infos
+    :param items: Items.
+    :param n_batches: Maximum number of batches.
+    :return: Non-empty batches.
+    """
+    n_batches = max(1, min(n_batches, len(items)))
+    bounds = [len(items) * i // n_batches for i in range(n_batches + 1)]
+    return [items[start:end] for start, end in zip(bounds, bounds[1:])]
 
 
-def chart(
+def get_interval_completions(
     journal_file: str,
     interval: str,
     start_date: dt.date | None,
@@ -397,73 +641,233 @@ def chart(
     habit_name: typing.Tuple[str, ...] | None,
     metadata: dict[str, str] | None,
     ignore_missing: bool = False,
-) -> None:
+) -> dict[dt.date, list[models.IntervalCompletion]]:
     """
-    Get information about the completion of habits in a chart.
+    Get the completion of habits in each interval, as `info` computes it for the interval.
+
+    The state is loaded once, up to the end of the last interval, and the numbers of each
+    tracking interval are computed for all the intervals at once, from the ordinals of the
+    records and of the expected dates.
 
     :param journal_file: Path to the journal file.
-    :param interval: Interval (weekly or monthly).
+    :param interval: Interval, see `analytics.parse_interval`.
     :param start_date: Start date.
     :param end_date: End date.
     :param habit_name: Habit name.
     :param metadata: Metadata.
     :param ignore_missing: Ignore missing records when computing stats.
+    :return: Completions of each interval with records, by interval start date, in the order
+        of their first record.
     """
-    if interval == "weekly":
-        interval_td = dt.timedelta(weeks=1)
-    elif interval == "monthly":
-        interval_td = dt.timedelta(weeks=4)
+    # The last interval may end after the end date, the state is loaded up to its end
+    n_days, _ = analytics.parse_interval(interval)
+    if n_days:
+        last_date = end_date + dt.timedelta(days=n_days - 1)
     else:
-        raise ValueError(f"Invalid interval: {interval}")
+        _, last_dates = analytics.get_periods(
+            np.array([end_date.toordinal()]), interval, end_date
+        )
+        last_date = dt.date.fromordinal(int(last_dates[0]))
+    index, _ = get_tracking_index_at_date(
+        journal_file, last_date, habit_name or None, metadata, start_date
+    )
+    records = index.records.filter(start_date, end_date, habit_name or None, metadata)
+    if not len(records):
+        return {}
+    if not start_date:
+        start_date = dt.date.fromordinal(int(records.dates.min()))
+
+    period_starts, period_ends = analytics.get_periods(
+        records.dates, interval, start_date
+    )
+    # Intervals are sorted by date, the first one starts on the start date
+    interval_starts, first_rows = np.unique(period_starts, return_index=True)
+    interval_ends = period_ends[first_rows]
+    interval_starts = np.maximum(interval_starts, start_date.toordinal())
+    completions: dict[dt.date, list[models.IntervalCompletion]] = {
+        dt.date.fromordinal(interval_start): []
+        for interval_start in interval_starts[np.argsort(first_rows)].tolist()
+    }
+
+    round_decimals = 2
+    for tracking_interval in index.intervals:
+        if habit_name and tracking_interval.habit.name not in habit_name:
+            continue
+        tracking_start = tracking_interval.start_date.toordinal()
+        tracking_end = (
+            tracking_interval.end_date.toordinal()
+            if tracking_interval.end_date
+            else interval_ends[-1]
+        )
+        first_interval = np.searchsorted(interval_ends, tracking_start)
+        last_interval = np.searchsorted(interval_starts, tracking_end, side="right")
+        if first_interval >= last_interval:
+            continue
+        starts = interval_starts[first_interval:last_interval]
+        ends = interval_ends[first_interval:last_interval]
+        effective_starts = np.maximum(starts, tracking_start)
+        effective_ends = np.minimum(ends, tracking_end)
+
+        view = index.get_record_view(tracking_interval, start_date, None, metadata)
+        first_records = np.searchsorted(view.dates, starts)
+        last_records = np.searchsorted(view.dates, ends, side="right")
+        # Values are summed with `sum`, in date order, to round them like `info`
+        is_completed = (view.values != 0) & ~np.isnan(view.values)
+        completed_values = np.where(is_completed, view.values, 0.0).tolist()
+
+        # Like `get_n_dates`, the start date always counts, then the dates after it
+        expected_dates = tracking_interval.habit.frequency.get_dates(
+            dt.date.fromordinal(int(effective_starts[0]) + 1),
+            dt.date.fromordinal(int(effective_ends.max())),
+        )
+        n_records_expected = (
+            1
+            + np.searchsorted(expected_dates, effective_ends, side="right")
+            - np.searchsorted(expected_dates, effective_starts, side="right")
+        )
+        for values in zip(
+            starts.tolist(),
+            first_records.tolist(),
+            last_records.tolist(),
+            n_records_expected.tolist(),
+            effective_starts.tolist(),
+            effective_ends.tolist(),
+        ):
+            interval_start, first_record, last_record, n_expected, first, last = values
+            n_records = last_record - first_record
+            n_values = n_records if ignore_missing else n_expected
+            sum_values = sum(completed_values[first_record:last_record])
+            completions[dt.date.fromordinal(interval_start)].append(
+                models.IntervalCompletion(
+                    tracking_interval.habit,
+                    n_records,
+                    n_expected,
+                    round(sum_values / n_values, round_decimals) if n_values else 0,
+                    dt.date.fromordinal(first),
+                    dt.date.fromordinal(last),
+                )
+            )
+    return completions
+
+
+def get_rolling_completions(
+    journal_file: str,
+    window: int,
+    start_date: dt.date | None,
+    end_date: dt.date,
+    habit_name: typing.Tuple[str, ...] | None,
+    metadata: dict[str, str] | None,
+    ignore_missing: bool = False,
+) -> pd.DataFrame:
+    """
+    Get the completion of habits over a rolling window of days, for each day.
 
-    tracked_habits, records, habits_records_matches = _filter_state(
+    Records are expected on the dates of the frequency of a habit while it is tracked, the
+    untrack date excluded.
+
+    :param journal_file: Path to the journal file.
+    :param window: Number of days of the window.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :param habit_name: Habit name.
+    :param metadata: Metadata.
+    :param ignore_missing: Ignore missing records when computing stats.
+    :return: Average value of each habit over the window ending on each day, see
+        `analytics.get_rolling_completion`, empty if there are no records.
+    """
+    index, filter_start_date, intervals = _filter_index(
         journal_file, start_date, end_date, habit_name, metadata
     )
+    if filter_start_date is None:
+        return pd.DataFrame()
+    records = index.records.filter(
+        filter_start_date, end_date, habit_name or None, metadata
+    )
+    return analytics.get_rolling_completion(
+        analytics.build_frame(index, records),
+        analytics.build_expected_frame(intervals, filter_start_date, end_date),
+        filter_start_date,
+        end_date,
+        window,
+        ignore_missing,
+    )
 
-    if not records:
-        logging.info(
-            f"{config.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} No records to plot"
-        )
-        return
 
-    if not start_date:
-        start_date = min(record.date for record in records)
-
-    records_by_interval: dict[dt.date, list[models.HabitRecord]] = {}
-    for record in records:
-        interval_start = record.date - (record.date - start_date) % interval_td
-        if interval_start not in records_by_interval:
-            records_by_interval[interval_start] = []
-        records_by_interval[interval_start].append(record)
-
-    if len(records_by_interval) < 2:
-        logging.info(
-            f"{config.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} Not enough data to plot"
-        )
-        return
+def chart(
+    journal_file: str,
+    interval: str,
+    start_date: dt.date | None,
+    end_date: dt.date,
+    habit_name: typing.Tuple[str, ...] | None,
+    metadata: dict[str, str] | None,
+    ignore_missing: bool = False,
+    rolling: int | None = None,
+) -> None:
+    """
+    Get information about the completion of habits in a chart.
 
-    completion_infos = []
-    for interval_start, interval_records in records_by_interval.items():
-        interval_end = interval_start + interval_td - dt.timedelta(days=1)
-        interval_completion_infos = info(
+    :param journal_file: Path to the journal file.
+    :param interval: Interval, see `analytics.parse_interval`.
+    :param start_date: Start date.
+    :param end_date: End date.
+    :param habit_name: Habit name.
+    :param metadata: Metadata.
+    :param ignore_missing: Ignore missing records when computing stats.
+    :param rolling: Plot the completion of each day over a rolling window of this number of
+        days instead of intervals.
+    """
+    if rolling:
+        completion = get_rolling_completions(
             journal_file,
-            interval_start,
-            interval_end,
+            rolling,
+            start_date,
+            end_date,
             habit_name,
             metadata,
             ignore_missing,
         )
-        completion_infos.extend(interval_completion_infos)
-
-    if not completion_infos:
-        logging.info(
-            f"{config.get('comment_char', 'CLI', defaults.COMMENT_CHAR)} No data to plot"
+        if completion.empty:
+            logging.info(f"{config.snapshot().comment_char} No records to plot")
+            return
+
+        fig = px.line(
+            completion,
+            labels={"date": "Date", "value": "Average completion"},
+            title=f"Average completion by habit over {rolling} days",
         )
+        fig.show()
+        return
+
+    completions_by_interval = get_interval_completions(
+        journal_file,
+        interval,
+        start_date,
+        end_date,
+        habit_name,
+        metadata,
+        ignore_missing,
+    )
+
+    if not completions_by_interval:
+        logging.info(f"{config.snapshot().comment_char} No records to plot")
+        return
+
+    if len(completions_by_interval) < 2:
+        logging.info(f"{config.snapshot().comment_char} Not enough data to plot")
+        return
+
+    completions = [
+        completion
+        for interval_completions in completions_by_interval.values()
+        for completion in interval_completions
+    ]
+    if not completions:
+        logging.info(f"{config.snapshot().comment_char} No data to plot")
         return
 
-    habit_names = [info_.habit.name for info_ in completion_infos]
-    interval_starts = [info_.start_date for info_ in completion_infos]
-    average_value = [info_.average_value for info_ in completion_infos]
+    habit_names = [completion.habit.name for completion in completions]
+    interval_starts = [completion.start_date for completion in completions]
+    average_value = [completion.average_value for completion in completions]
 
     fig = px.line(
         x=interval_starts,
@@ -485,9 +889,8 @@ def tracked(
     :param date: Date to use.
     :return: Tracked habits and their tracking start date.
     """
-    _, _, matches = get_state_at_date(journal_file, date)
+    checkpoint = get_checkpoint_at_date(journal_file, date, with_records=False)
     return [
-        (match.habit, match.tracking_start_date)
-        for match in matches
-        if match.tracking_end_date is None
+        (habit, checkpoint.tracking_start_dates[habit_name])
+        for habit_name, habit in checkpoint.tracked_habits.items()
     ]
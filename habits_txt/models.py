@@ -1,38 +1,69 @@
 import datetime as dt
+import typing
 from dataclasses import dataclass
+from functools import lru_cache
 
 import croniter
+import numpy as np
 
 import habits_txt.config as config
+import habits_txt.cron as cron
 import habits_txt.defaults as defaults
 
+_NEXT_DATES_CACHE_SIZE = 4096
+
 
 class Frequency:
     """
     Frequency of a habit. Intraday frequencies are not supported.
+
+    Frequencies are immutable, use `Frequency.from_string` to get a shared instance.
     """
 
+    __slots__ = ("cron_str", "_schedule")
+
+    cron_str: str
+    _schedule: cron.DaySchedule | None
+
     def __init__(self, cron_str: str):
-        self.cron_str = cron_str
-        self._process_cron_str()
-        self._validate_cron_str()
+        object.__setattr__(self, "cron_str", self._process_cron_str(cron_str))
+        self._validate_cron_str(self.cron_str)
+        object.__setattr__(self, "_schedule", cron.compile(self.cron_str))
 
-    def _process_cron_str(self):
-        if len(self.cron_str.split()) == 3:
-            self.cron_str = f"0 0 {self.cron_str}"
+    @classmethod
+    def from_string(cls, cron_str: str) -> "Frequency":
+        """
+        Get the shared frequency of a cron string, validating it only the first time.
+
+        :param cron_str: Cron string, with or without the minute and hour fields.
+        :return: Frequency.
 
-    def _validate_cron_str(self):
+        Example:
+        >>> Frequency.from_string("* * *") is Frequency.from_string("0 0 * * *")
+        True
+        """
+        return _intern_frequency(cls._process_cron_str(cron_str))
+
+    @staticmethod
+    def _process_cron_str(cron_str: str) -> str:
+        if len(cron_str.split()) == 3:
+            return f"0 0 {cron_str}"
+        return cron_str
+
+    @staticmethod
+    def _validate_cron_str(cron_str: str) -> croniter.croniter:
         today = dt.date.today()
         try:
             cron = croniter.croniter(
-                self.cron_str, dt.datetime(today.year, today.month, today.day)
+                cron_str, dt.datetime(today.year, today.month, today.day)
             )
         except ValueError:
-            raise ValueError(f"Invalid cron string: {self.cron_str}")
+            raise ValueError(f"Invalid cron string: {cron_str}")
         if cron.get_next(dt.datetime) < dt.datetime(
             today.year, today.month, today.day, 23, 59, 59, 999999
         ):
             raise ValueError("Intraday frequencies are not supported.")
+        return cron
 
     def get_next_date(self, date: dt.date) -> dt.date:
         """
@@ -41,8 +72,12 @@ class Frequency:
         :param date: Current date.
         :return: Next date.
         """
-        cron = croniter.croniter(self.cron_str, dt.datetime.combine(date, dt.time()))
-        return cron.get_next(dt.datetime).date()
+        next_date = None
+        if self._schedule is not None:
+            next_date = self._schedule.next_date(date)
+        if next_date is None:
+            next_date = _get_cron_next_date(self.cron_str, date)
+        return next_date
 
     def get_n_dates(self, start_date: dt.date, end_date: dt.date) -> int:
         """
@@ -52,6 +87,11 @@ class Frequency:
         :param end_date: End date.
         :return: Number of dates.
         """
+        if self._schedule is not None:
+            # Same result as walking the dates below, counted in bulk
+            if start_date > end_date:
+                return 1
+            return 1 + self._schedule.count(start_date + dt.timedelta(days=1), end_date)
         n_dates = 1
         date = start_date
         while date <= end_date:
@@ -60,14 +100,63 @@ class Frequency:
                 n_dates += 1
         return n_dates
 
+    def get_dates(self, start_date: dt.date, end_date: dt.date) -> np.ndarray:
+        """
+        Get the dates between two dates, both included, based on the frequency.
+
+        :param start_date: Start date.
+        :param end_date: End date.
+        :return: Date ordinals, in order.
+        """
+        if self._schedule is not None:
+            return self._schedule.dates(start_date, end_date)
+        dates = []
+        date = self.get_next_date(start_date - dt.timedelta(days=1))
+        while date <= end_date:
+            dates.append(date.toordinal())
+            date = self.get_next_date(date)
+        return np.array(dates, dtype=np.int64)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Frequency is immutable")
+
+    def __reduce__(self):
+        return Frequency.from_string, (self.cron_str,)
+
     def __repr__(self):
         if self.cron_str.startswith("0 0"):
             return self.cron_str[4:]
         return self.cron_str
 
     def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Frequency):
+            return NotImplemented
         return self.cron_str == other.cron_str
 
+    def __hash__(self):
+        return hash(self.cron_str)
+
+
+@lru_cache(maxsize=None)
+def _intern_frequency(cron_str: str) -> Frequency:
+    return Frequency(cron_str)
+
+
+@lru_cache(maxsize=_NEXT_DATES_CACHE_SIZE)
+def _get_cron_next_date(cron_str: str, date: dt.date) -> dt.date:
+    """
+    Get the next date of a cron string with croniter, for the expressions the day schedule does
+    not support, such as "L * *".
+
+    :param cron_str: Five-field cron string.
+    :param date: Current date.
+    :return: Next date.
+    """
+    cron_iter = croniter.croniter(cron_str, dt.datetime.combine(date, dt.time()))
+    return cron_iter.get_next(dt.datetime).date()
+
 
 @dataclass
 class Habit:
@@ -118,8 +207,17 @@ class HabitRecord:
         return self.value is not None
 
     def __str__(self) -> str:
+        return self.to_str(config.snapshot())
+
+    def to_str(self, settings: config.Snapshot) -> str:
+        """
+        Format the record as a journal line.
+
+        :param settings: Configuration snapshot.
+        :return: Record directive line.
+        """
         return (
-            f"{dt.datetime.strftime(self.date, config.get("date_fmt", "CLI", defaults.DATE_FMT))} "
+            f"{dt.datetime.strftime(self.date, settings.date_fmt)} "
             f'"{self.habit_name}"{" " + self._str_meta() if self._str_meta() else ""} {self._str_value()}'
         )
 
@@ -157,6 +255,31 @@ class HabitCompletionInfo:
     end_date: dt.date | None
 
 
+@dataclass
+class IntervalCompletion:
+    """
+    Completion of a habit during an interval of a chart.
+    """
+
+    habit: Habit
+    n_records: int
+    n_records_expected: int
+    average_value: float
+    start_date: dt.date
+    end_date: dt.date
+
+
+@dataclass
+class Streak:
+    """
+    Consecutive completed records of a habit.
+    """
+
+    length: int
+    start_date: dt.date
+    end_date: dt.date
+
+
 @dataclass
 class HabitRecordMatch:
     """
@@ -164,6 +287,6 @@ class HabitRecordMatch:
     """
 
     habit: Habit
-    habit_records: list[HabitRecord]
+    habit_records: typing.Sequence[HabitRecord]
     tracking_start_date: dt.date
     tracking_end_date: dt.date | None
@@ -1,22 +1,70 @@
 import datetime as dt
+import io
 import logging
+import os
 import re
+import string
 import typing
-from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial, wraps
 
 from datetime_matcher import DatetimeMatcher
 
+import habits_txt.compiled as compiled
 import habits_txt.config as config
 import habits_txt.defaults as defaults
 import habits_txt.directives as directives
 import habits_txt.exceptions as exceptions
 import habits_txt.models as models
 
+_QUOTES = "".join(defaults.ALLOWED_QUOTES)
+_WHITESPACE_RE = re.compile(r"\s+")
+_QUOTE_RE = re.compile(rf"[{_QUOTES}]")
+_HABIT_NAME_RE = re.compile(rf"[{_QUOTES}].*[{_QUOTES}]")
+_FREQUENCY_RE = re.compile(r"\(.*\)")
+_METADATA_RE = re.compile(r"(\w+:\S+)")
+_ISO_DATE_FMT = "%Y-%m-%d"
+_DATE_FMT_FIELDS = {
+    "Y": ("year", "[0-9]{4}"),
+    "y": ("short_year", "[0-9]{2}"),
+    "m": ("month", "0[1-9]|1[0-2]"),
+    "d": ("day", "0[1-9]|[12][0-9]|3[01]"),
+}
+_DATE_FMT_LITERALS = frozenset("-/_:,") | frozenset(string.ascii_letters)
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])")
+# Journals at least this big are parsed in several processes unless a number of jobs is set
+PARALLEL_THRESHOLD = 16 * 1024 * 1024
+_MIN_CHUNK_SIZE = 1024 * 1024
+
+_jobs: int | None = None
+
+_DIRECTIVE_BODY_RE = re.compile(
+    rf" (?:(?P<directive_type>{'|'.join(t.value for t in directives.DirectiveType)}) )?"
+    rf"(?P<habit_name>[{_QUOTES}].*[{_QUOTES}])(?P<tail>.*)"
+)
+
+
+class _DirectiveTokens(typing.NamedTuple):
+    """
+    Fields of a directive line, as extracted by the tokenizers.
+    """
+
+    date: dt.date
+    directive_type: directives.DirectiveType
+    habit_name: str
+    metadata: dict[str, str]
+    frequency: models.Frequency | None = None
+    is_measurable: bool = False
+    value: bool | float | None = None
+
 
 def parse_file(file_path: str) -> typing.Tuple[list[directives.Directive], list[str]]:
     """
     Parse a journal file and return a list of directives and a list of parse errors.
 
+    If the journal has a compiled sidecar newer than itself, the directives are loaded from it.
+    Large journals are parsed in several processes, see `parse_bytes`.
+
     :param file_path: Path to the journal file.
     :return: List of parsed directives and list of errors.
 
@@ -29,68 +77,328 @@ def parse_file(file_path: str) -> typing.Tuple[list[directives.Directive], list[
     2024-01-04 "Sample habit" 2
     >>> directives, errors = parse_file("example.journal")
     """
-    logging.debug(f"Parsing file: {file_path}")
+    compiled_journal = compiled.load_if_fresh(file_path, config.snapshot())
+    if compiled_journal is not None:
+        logging.debug(f"Loaded {len(compiled_journal[0])} directives from the sidecar")
+        return compiled_journal
+    errors: list[str] = []
+    if _get_jobs(os.path.getsize(file_path)) > 1:
+        with open(file_path, "rb") as file:
+            parsed_directives, _ = parse_bytes(file.read(), errors.append)
+    else:
+        parsed_directives = list(iter_directives(file_path, errors.append))
+    logging.debug(f"Got {len(parsed_directives)} directives")
+    return parsed_directives, errors
+
+
+def set_jobs(jobs: int | None):
+    """
+    Set the number of processes used to parse journals.
+
+    :param jobs: Number of processes, None to use all CPUs for journals above `PARALLEL_THRESHOLD`.
+    """
+    global _jobs
+    _jobs = jobs
+
+
+def parse_bytes(
+    data: bytes,
+    on_error: typing.Callable[[str], None] | None = None,
+    first_lineno: int = 1,
+) -> typing.Tuple[list[directives.Directive], int]:
+    """
+    Parse the raw contents of a journal, or of a part of it starting at a line boundary.
+
+    Lines are independent, so big inputs are split at newlines into one chunk per job and the
+    chunks are parsed in a process pool. Directives and errors come back in line order.
+
+    :param data: Raw journal contents.
+    :param on_error: Function called with each parse error, in line order.
+    :param first_lineno: Line number of the first line.
+    :return: Parsed directives, number of lines.
+    """
+    chunks = _split_chunks(data, _get_jobs(len(data)))
+    chunk_linenos = [first_lineno]
+    for chunk in chunks[:-1]:
+        chunk_linenos.append(chunk_linenos[-1] + _count_lines(chunk))
+
+    if len(chunks) > 1:
+        logging.debug(f"Parsing {len(data)} bytes in {len(chunks)} processes")
+        with ProcessPoolExecutor(len(chunks)) as executor:
+            results = list(executor.map(_parse_chunk, chunks, chunk_linenos))
+    else:
+        results = [_parse_chunk(data, first_lineno)]
+
+    parsed_directives: list[directives.Directive] = []
+    n_lines = 0
+    for chunk_directives, chunk_errors, chunk_n_lines in results:
+        parsed_directives.extend(chunk_directives)
+        n_lines += chunk_n_lines
+        if on_error is not None:
+            for error in chunk_errors:
+                on_error(error)
+    return parsed_directives, n_lines
+
+
+def _get_jobs(size: int) -> int:
+    """
+    Get the number of processes to parse a journal with.
+
+    :param size: Size of the journal in bytes.
+    :return: Number of processes.
+    """
+    if _jobs is None:
+        jobs = (os.cpu_count() or 1) if size >= PARALLEL_THRESHOLD else 1
+    else:
+        jobs = _jobs
+    # Tiny chunks cost more to send to a process than to parse
+    return max(1, min(jobs, size // _MIN_CHUNK_SIZE))
+
+
+def _split_chunks(data: bytes, n_chunks: int) -> list[bytes]:
+    """
+    Split journal contents into chunks of about the same size, at line boundaries.
+
+    :param data: Raw journal contents.
+    :param n_chunks: Maximum number of chunks.
+    :return: Non-empty chunks, at least one.
+    """
+    chunks = []
+    start = 0
+    for i in range(1, n_chunks):
+        end = data.find(b"\n", max(start, len(data) * i // n_chunks)) + 1
+        if end <= 0:
+            break
+        chunks.append(data[start:end])
+        start = end
+    if start < len(data) or not chunks:
+        chunks.append(data[start:])
+    return chunks
+
+
+def _count_lines(data: bytes) -> int:
+    """
+    Count lines the way a file opened in text mode splits them, with universal newlines.
+
+    :param data: Raw journal contents.
+    :return: Number of lines.
+    """
+    n_lines = data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+    if data and not data.endswith((b"\n", b"\r")):
+        n_lines += 1
+    return n_lines
+
+
+def _parse_chunk(
+    data: bytes, first_lineno: int
+) -> typing.Tuple[list[directives.Directive], list[str], int]:
+    """
+    Parse a chunk of a journal. Runs in worker processes.
+
+    :param data: Raw chunk contents, starting at a line boundary.
+    :param first_lineno: Line number of the first line of the chunk.
+    :return: Parsed directives, errors, number of lines.
+    """
+    errors: list[str] = []
+    # Decode like `open` in text mode does, so that both paths read the same lines
+    lines = io.TextIOWrapper(io.BytesIO(data)).readlines()
+    parsed_directives = list(iter_directives(lines, errors.append, first_lineno))
+    return parsed_directives, errors, len(lines)
+
+
+def iter_directives(
+    source: str | os.PathLike | typing.Iterable[str],
+    on_error: typing.Callable[[str], None] | None = None,
+    first_lineno: int = 1,
+) -> typing.Iterator[directives.Directive]:
+    """
+    Parse a journal lazily, yielding directives as lines are read.
 
-    with open(file_path, "r") as file:
-        lines = file.readlines()
-        lines = [line.strip() for line in lines]
+    Lines are read one at a time from the buffered file, so memory does not grow with the
+    journal size.
 
-    parsed_directives = []
-    errors = []
-    for lineno, line in enumerate(lines):
-        lineno += 1
+    :param source: Path to the journal file, or journal lines, such as a file object opened in
+        text mode or a list of lines.
+    :param on_error: Function called with each parse error, as soon as it is found.
+    :param first_lineno: Line number of the first line, when parsing a part of a journal.
+    :return: Iterator over the parsed directives.
+
+    Example:
+    >>> errors = []
+    >>> for directive in iter_directives("example.journal", errors.append):
+    ...     print(directive)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        logging.debug(f"Parsing file: {source}")
+        with open(source, "r") as file:
+            yield from _iter_lines_directives(file, on_error, first_lineno)
+    else:
+        yield from _iter_lines_directives(source, on_error, first_lineno)
+
+
+def _iter_lines_directives(
+    lines: typing.Iterable[str],
+    on_error: typing.Callable[[str], None] | None,
+    first_lineno: int,
+) -> typing.Iterator[directives.Directive]:
+    """
+    Parse journal lines lazily.
+
+    :param lines: Journal lines.
+    :param on_error: Function called with each parse error.
+    :param first_lineno: Line number of the first line.
+    :return: Iterator over the parsed directives.
+    """
+    settings = config.snapshot()
+    for lineno, line in enumerate(lines, first_lineno):
+        line = line.strip()
 
         logging.debug(f"Parsing line {lineno}: {line}")
 
         try:
-            parsed_directive = _parse_directive(line, lineno)
-            if parsed_directive:
-                parsed_directives.append(parsed_directive)
+            parsed_directive = _parse_directive(line, lineno, settings)
         except exceptions.ParseError as e:
-            errors.append(f"Error parsing line {lineno}: {e.message}")
-
-    logging.debug(f"Got {len(parsed_directives)} directives")
-    return parsed_directives, errors
+            if on_error is not None:
+                on_error(f"Error parsing line {lineno}: {e.message}")
+            continue
+        if parsed_directive:
+            yield parsed_directive
 
 
-def _parse_directive(directive_line: str, lineno: int) -> directives.Directive | None:
+def _parse_directive(
+    directive_line: str, lineno: int, settings: config.Snapshot | None = None
+) -> directives.Directive | None:
     """
     Parse a single directive line.
     If the line is a comment or empty, return None.
 
     :param directive_line: Directive line.
     :param lineno: Line number.
+    :param settings: Configuration snapshot, defaults to the current one.
     :return: Parsed directive or None if not a directive.
 
     Example:
     >>> directive_line = '2024-01-01 track "Sample habit" (* * *)'
     >>> parsed_directive = _parse_directive(directive_line, 1)
     """
-    if not directive_line or directive_line.startswith(
-        config.get("comment_char", "CLI", defaults.COMMENT_CHAR)
-    ):
+    if settings is None:
+        settings = config.snapshot()
+    if not directive_line or directive_line.startswith(settings.comment_char):
+        return None
+    directive_line = _WHITESPACE_RE.sub(" ", directive_line)  # Remove extra spaces
+    tokens = _tokenize_directive(directive_line, settings.date_fmt)
+    if tokens is None:
+        tokens = _tokenize_directive_by_fields(directive_line, settings.date_fmt)
+
+    if tokens.directive_type == directives.DirectiveType.TRACK:
+        return directives.TrackDirective(
+            tokens.date,
+            tokens.habit_name,
+            lineno,
+            tokens.metadata,
+            tokens.frequency,  # type: ignore[arg-type]
+            tokens.is_measurable,
+        )
+    elif tokens.directive_type == directives.DirectiveType.UNTRACK:
+        return directives.UntrackDirective(
+            tokens.date, tokens.habit_name, lineno, tokens.metadata
+        )
+    elif tokens.directive_type == directives.DirectiveType.RECORD:
+        return directives.RecordDirective(
+            tokens.date, tokens.habit_name, lineno, tokens.value, tokens.metadata
+        )
+
+    return None
+
+
+def _tokenize_directive(directive_line: str, date_fmt: str) -> _DirectiveTokens | None:
+    """
+    Tokenize a directive line in a single pass, using precompiled patterns.
+
+    Only lines with the canonical shape (date, optional directive type, quoted habit name, rest)
+    are handled here. For anything else, including invalid lines, None is returned and the line
+    must go through `_tokenize_directive_by_fields`, which reports the precise parse error.
+
+    :param directive_line: Directive line, with extra spaces removed.
+    :param date_fmt: Date format.
+    :return: Directive tokens or None.
+
+    Example:
+    >>> directive_line = '2024-01-02 "Sample habit" meta:value yes'
+    >>> tokens = _tokenize_directive(directive_line, "%Y-%m-%d")
+    >>> print(tokens.habit_name, tokens.metadata, tokens.value)
+    Sample habit {'meta': 'value'} True
+    """
+    try:
+        date, date_end = _match_date(directive_line, date_fmt)
+    except exceptions.ParseError:
         return None
-    directive_line = re.sub(r"\s+", " ", directive_line)  # Remove extra spaces
-    date = _parse_date(directive_line)
+    body = _DIRECTIVE_BODY_RE.match(directive_line, date_end)
+    if body is None or directive_line.find(" ") != date_end:
+        return None
+
+    directive_type_str = body.group("directive_type")
+    directive_type = (
+        directives.DirectiveType(directive_type_str)
+        if directive_type_str
+        else directives.DirectiveType.RECORD
+    )
+    habit_name = body.group("habit_name")[1:-1]  # [1:-1] to remove quotes
+    frequency = None
+    is_measurable = False
+    value = None
+    try:
+        metadata = parse_metadata(directive_line) if ":" in directive_line else {}
+        if directive_type == directives.DirectiveType.TRACK:
+            frequency_match = _FREQUENCY_RE.search(body.group("tail"))
+            if frequency_match is None or "(" in habit_name:
+                return None
+            frequency = models.Frequency.from_string(frequency_match.group(0)[1:-1])
+            is_measurable = directive_line.endswith(defaults.MEASURABLE_KEYWORD)
+        elif directive_type == directives.DirectiveType.RECORD:
+            value = _parse_value_str(directive_line.rpartition(" ")[2])
+    except (exceptions.ParseError, ValueError):
+        return None
+
+    return _DirectiveTokens(
+        date, directive_type, habit_name, metadata, frequency, is_measurable, value
+    )
+
+
+def _tokenize_directive_by_fields(
+    directive_line: str, date_fmt: str
+) -> _DirectiveTokens:
+    """
+    Tokenize a directive line by parsing each field on its own.
+
+    This is slower than `_tokenize_directive` but handles every line shape, and raises the
+    parse error of the first invalid field.
+
+    :param directive_line: Directive line, with extra spaces removed.
+    :param date_fmt: Date format.
+    :return: Directive tokens.
+
+    Example:
+    >>> directive_line = '2024-01-01 track "Sample habit" (* * *)'
+    >>> tokens = _tokenize_directive_by_fields(directive_line, "%Y-%m-%d")
+    >>> print(tokens.directive_type)
+    DirectiveType.TRACK
+    """
+    date = _match_date(directive_line, date_fmt)[0]
     directive_type = _parse_directive_type(directive_line)
     habit_name = _parse_habit_name(directive_line)
     metadata = parse_metadata(directive_line)
 
     if directive_type == directives.DirectiveType.TRACK:
         frequency = _parse_frequency(directive_line)
-        is_measurable = (
-            re.search(rf"{defaults.MEASURABLE_KEYWORD}$", directive_line) is not None
-        )
-        return directives.TrackDirective(
-            date, habit_name, lineno, metadata, frequency, is_measurable
+        is_measurable = directive_line.endswith(defaults.MEASURABLE_KEYWORD)
+        return _DirectiveTokens(
+            date, directive_type, habit_name, metadata, frequency, is_measurable
         )
-    elif directive_type == directives.DirectiveType.UNTRACK:
-        return directives.UntrackDirective(date, habit_name, lineno, metadata)
     elif directive_type == directives.DirectiveType.RECORD:
         value = parse_value(directive_line)
-        return directives.RecordDirective(date, habit_name, lineno, value, metadata)
-
-    return None
+        return _DirectiveTokens(date, directive_type, habit_name, metadata, value=value)
+    return _DirectiveTokens(date, directive_type, habit_name, metadata)
 
 
 def _handle_index_error_decorator(name):
@@ -134,9 +442,133 @@ def _parse_date(directive_line: str) -> dt.date:
     >>> print(date)
     2024-01-01
     """
-    dtm = DatetimeMatcher()
-    date_fmt = config.get("date_fmt", "CLI", defaults.DATE_FMT)
-    res = dtm.search(rf"^{date_fmt}", directive_line)
+    return _match_date(directive_line, config.snapshot().date_fmt)[0]
+
+
+def _match_date(directive_line: str, date_fmt: str) -> typing.Tuple[dt.date, int]:
+    """
+    Match the date at the start of a directive line.
+
+    :param directive_line: Directive line.
+    :param date_fmt: Date format.
+    :return: Parsed date and the index where it ends in the line.
+    """
+    return _get_date_matcher(date_fmt)(directive_line)
+
+
+@lru_cache
+def _get_date_matcher(
+    date_fmt: str,
+) -> typing.Callable[[str], typing.Tuple[dt.date, int]]:
+    """
+    Get the fastest date matcher for a date format.
+
+    The default format is matched by slicing, formats made of year, month and day fields are
+    matched by a regex with integer extraction, and other formats go through datetime_matcher
+    and strptime.
+
+    :param date_fmt: Date format.
+    :return: Function matching the date at the start of a directive line.
+    """
+    if date_fmt == _ISO_DATE_FMT:
+        return _match_iso_date
+    fields_regex = _compile_date_fields_regex(date_fmt)
+    if fields_regex is not None:
+        return partial(_match_date_fields, fields_regex)
+    return partial(_match_date_strptime, date_fmt)
+
+
+def _match_iso_date(directive_line: str) -> typing.Tuple[dt.date, int]:
+    """
+    Match a YYYY-MM-DD date at the start of a directive line, extracting the fields by slicing.
+
+    :param directive_line: Directive line.
+    :return: Parsed date and the index where it ends in the line.
+    """
+    if _ISO_DATE_RE.match(directive_line) is None:
+        raise exceptions.ParseError(
+            f"Could not find a date in the directive: {directive_line}"
+        )
+    try:
+        date = dt.date(
+            int(directive_line[:4]), int(directive_line[5:7]), int(directive_line[8:10])
+        )
+    except ValueError:
+        raise exceptions.ParseError(
+            f"Found a date but it is invalid: {directive_line[:10]}"
+        )
+    return date, 10
+
+
+def _compile_date_fields_regex(date_fmt: str) -> re.Pattern[str] | None:
+    """
+    Compile a date format made of year, month and day fields into a regex capturing each field.
+
+    The field patterns are the ones generated by datetime_matcher, so that both match the same
+    dates.
+
+    :param date_fmt: Date format.
+    :return: Compiled regex, or None if the format has other directives or special characters.
+    """
+    parts = []
+    fields = set()
+    tokens = iter(date_fmt)
+    for char in tokens:
+        if char != "%":
+            if char not in _DATE_FMT_LITERALS:
+                return None
+            parts.append(char)
+            continue
+        directive = next(tokens, "")
+        field = _DATE_FMT_FIELDS.get(directive)
+        if field is None or field[0] in fields:
+            return None
+        fields.add(field[0])
+        parts.append(f"(?P<{field[0]}>{field[1]})")
+    if len(fields) != 3 or not fields >= {"month", "day"}:
+        return None
+    return re.compile("".join(parts))
+
+
+def _match_date_fields(
+    fields_regex: re.Pattern[str], directive_line: str
+) -> typing.Tuple[dt.date, int]:
+    """
+    Match a date at the start of a directive line, using a regex capturing each field.
+
+    :param fields_regex: Regex compiled by `_compile_date_fields_regex`.
+    :param directive_line: Directive line.
+    :return: Parsed date and the index where it ends in the line.
+    """
+    res = fields_regex.match(directive_line)
+    if res is None:
+        raise exceptions.ParseError(
+            f"Could not find a date in the directive: {directive_line}"
+        )
+    fields = res.groupdict()
+    if "year" in fields:
+        year = int(fields["year"])
+    else:
+        # Same pivot as strptime's %y
+        year = int(fields["short_year"])
+        year += 2000 if year <= 68 else 1900
+    try:
+        return dt.date(year, int(fields["month"]), int(fields["day"])), res.end()
+    except ValueError:
+        raise exceptions.ParseError(f"Found a date but it is invalid: {res.group(0)}")
+
+
+def _match_date_strptime(
+    date_fmt: str, directive_line: str
+) -> typing.Tuple[dt.date, int]:
+    """
+    Match a date in any format at the start of a directive line, using datetime_matcher and strptime.
+
+    :param date_fmt: Date format.
+    :param directive_line: Directive line.
+    :return: Parsed date and the index where it ends in the line.
+    """
+    res = _get_date_regex(date_fmt).match(directive_line)
     if res is None:
         raise exceptions.ParseError(
             f"Could not find a date in the directive: {directive_line}"
@@ -146,7 +578,18 @@ def _parse_date(directive_line: str) -> dt.date:
         date = dt.datetime.strptime(date_str, date_fmt).date()
     except ValueError:
         raise exceptions.ParseError(f"Found a date but it is invalid: {date_str}")
-    return date
+    return date, res.end()
+
+
+@lru_cache
+def _get_date_regex(date_fmt: str) -> re.Pattern[str]:
+    """
+    Compile the regex matching a date in the given format at the start of a line.
+
+    :param date_fmt: Date format.
+    :return: Compiled regex.
+    """
+    return re.compile(DatetimeMatcher().get_regex_from_dfregex(rf"^{date_fmt}"))
 
 
 @_handle_index_error_decorator(name="directive type")
@@ -167,14 +610,14 @@ def _parse_directive_type(directive_line: str) -> directives.DirectiveType:
     track
     """
     try:
-        directive_type_str = re.split(r"\s+", directive_line)[1]
+        directive_type_str = _WHITESPACE_RE.split(directive_line)[1]
     except IndexError:
         raise exceptions.ParseError(
             f"Could not find a directive type in the directive: {directive_line}"
         )
     try:
         # If there is no directive type, it is a record directive
-        if re.match(rf'[{"".join(defaults.ALLOWED_QUOTES)}]', directive_type_str):
+        if _QUOTE_RE.match(directive_type_str):
             return directives.DirectiveType.RECORD
         return directives.DirectiveType(directive_type_str)
     except ValueError:
@@ -197,10 +640,7 @@ def _parse_habit_name(directive_line: str) -> str:
     >>> print(habit_name)
     Sample habit
     """
-    habit_name = re.search(
-        rf'[{"".join(defaults.ALLOWED_QUOTES)}].*[{"".join(defaults.ALLOWED_QUOTES)}]',
-        directive_line,
-    )
+    habit_name = _HABIT_NAME_RE.search(directive_line)
     if habit_name is None:
         raise exceptions.ParseError(
             f"Could not find a habit name enclosed in quotes: {directive_line}"
@@ -222,7 +662,7 @@ def _parse_frequency(directive_line: str) -> models.Frequency:
     >>> directive_line = '2024-01-01 track "Sample habit" (* * *)'
     >>> frequency = _parse_frequency(directive_line)
     """
-    res = re.search(r"\(.*\)", directive_line)
+    res = _FREQUENCY_RE.search(directive_line)
     if res is None:
         raise exceptions.ParseError(
             f"Could not find a frequency enclosed in parenthesis: {directive_line}"
@@ -230,7 +670,7 @@ def _parse_frequency(directive_line: str) -> models.Frequency:
     frequency_str = res.group(0)
     frequency_str = frequency_str[1:-1]
     try:
-        frequency = models.Frequency(frequency_str)
+        frequency = models.Frequency.from_string(frequency_str)
         return frequency
     except ValueError:
         raise exceptions.ParseError(f"Invalid frequency format: {frequency_str}")
@@ -252,7 +692,7 @@ def parse_value(directive_line: str) -> bool | float:
     >>> print(value)
     True
     """
-    value_str = re.split(r"\s+", directive_line)[-1]
+    value_str = _WHITESPACE_RE.split(directive_line)[-1]
     return _parse_value_str(value_str)
 
 
@@ -294,9 +734,9 @@ def parse_metadata(directive_line: str) -> dict[str, str]:
     {'meta1': 'value1', 'meta2': 'value2'}
     """
     metadata = {}
-    metadata_str = re.findall(r"(\w+:\S+)", directive_line)
+    metadata_str = _METADATA_RE.findall(directive_line)
     for meta in metadata_str:
-        key, value = meta.split(":")
+        key, value = meta.split(":", 1)
         metadata[key] = value.strip()
 
     if len([c for c in directive_line if c == ":"]) != len(metadata_str):
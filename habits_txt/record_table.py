@@ -0,0 +1,439 @@
+import collections.abc
+import datetime as dt
+import typing
+
+import numpy as np
+
+import habits_txt.directives as directives
+import habits_txt.models as models
+
+
+class RecordTable:
+    """
+    Records stored by column, one NumPy array per field.
+
+    Habit names and metadata are interned: metadata are stored as the id of a tuple of
+    (key id, value id) pairs, shared by all the records with the same metadata. Records are turned
+    back into `models.HabitRecord` objects only when they are read.
+
+    Example:
+        dates: [738886, 738887]  # Ordinals of 2024-01-01 and 2024-01-02
+        habit_ids: [0, 0]
+        values: [1.0, 2.5]
+        is_bool: [True, False]
+        metadata_ids: [0, 1]
+        strings: ["Read", "author", "me"]
+        metadata_sets: [(), ((1, 2),)]
+    """
+
+    __slots__ = (
+        "dates",
+        "habit_ids",
+        "values",
+        "is_bool",
+        "metadata_ids",
+        "strings",
+        "metadata_sets",
+        "_string_ids",
+        "_habit_rows",
+        "_metadata_masks",
+    )
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        habit_ids: np.ndarray,
+        values: np.ndarray,
+        is_bool: np.ndarray,
+        metadata_ids: np.ndarray,
+        strings: list[str],
+        metadata_sets: list[typing.Tuple[typing.Tuple[int, int], ...]],
+    ):
+        """
+        :param dates: Date ordinals, int32.
+        :param habit_ids: Ids of the habit names in `strings`, int32.
+        :param values: Values, float64, NaN if the record has no value.
+        :param is_bool: Whether each value is a boolean, bool.
+        :param metadata_ids: Ids of the metadata in `metadata_sets`, int32.
+        :param strings: Interned habit names and metadata keys and values.
+        :param metadata_sets: Interned metadata, as (key id, value id) pairs.
+        """
+        self.dates = dates
+        self.habit_ids = habit_ids
+        self.values = values
+        self.is_bool = is_bool
+        self.metadata_ids = metadata_ids
+        self.strings = strings
+        self.metadata_sets = metadata_sets
+        self._string_ids = {string: i for i, string in enumerate(strings)}
+        self._habit_rows: dict[int, np.ndarray] | None = None
+        self._metadata_masks: dict[
+            typing.Tuple[typing.Tuple[str, str], ...], np.ndarray
+        ] = {}
+
+    @classmethod
+    def from_directives(
+        cls, record_directives: typing.Iterable[directives.RecordDirective]
+    ) -> "RecordTable":
+        """
+        Build a table from record directives.
+
+        :param record_directives: Record directives.
+        :return: Record table, in the order of the directives.
+
+        Example:
+        >>> directive = directives.RecordDirective(dt.date(2024, 1, 1), "Read", 1, True, {})
+        >>> list(RecordTable.from_directives([directive]))
+        [HabitRecord(date=datetime.date(2024, 1, 1), habit_name='Read', value=True, metadata={})]
+        """
+        return cls._build(
+            (directive.date, directive.habit_name, directive.value, directive.metadata)
+            for directive in record_directives
+        )
+
+    @classmethod
+    def from_records(
+        cls, records: typing.Iterable[models.HabitRecord]
+    ) -> "RecordTable":
+        """
+        Build a table from records.
+
+        :param records: Records.
+        :return: Record table, in the order of the records.
+        """
+        return cls._build(
+            (record.date, record.habit_name, record.value, record.metadata)
+            for record in records
+        )
+
+    @classmethod
+    def _build(
+        cls,
+        rows: typing.Iterable[
+            typing.Tuple[dt.date, str, bool | float | None, dict[str, str] | None]
+        ],
+    ) -> "RecordTable":
+        strings: list[str] = []
+        string_ids: dict[str, int] = {}
+        metadata_sets: list[typing.Tuple[typing.Tuple[int, int], ...]] = [()]
+        metadata_set_ids: dict[typing.Tuple[typing.Tuple[int, int], ...], int] = {(): 0}
+
+        def intern(string: str) -> int:
+            string_id = string_ids.get(string)
+            if string_id is None:
+                string_id = string_ids[string] = len(strings)
+                strings.append(string)
+            return string_id
+
+        dates: list[int] = []
+        habit_ids: list[int] = []
+        values: list[float] = []
+        is_bool: list[bool] = []
+        metadata_ids: list[int] = []
+        for date, habit_name, value, metadata in rows:
+            dates.append(date.toordinal())
+            habit_ids.append(intern(habit_name))
+            values.append(np.nan if value is None else float(value))
+            is_bool.append(isinstance(value, bool))
+            if metadata:
+                metadata_set = tuple(
+                    (intern(key), intern(value_)) for key, value_ in metadata.items()
+                )
+                metadata_id = metadata_set_ids.get(metadata_set)
+                if metadata_id is None:
+                    metadata_id = metadata_set_ids[metadata_set] = len(metadata_sets)
+                    metadata_sets.append(metadata_set)
+                metadata_ids.append(metadata_id)
+            else:
+                metadata_ids.append(0)
+
+        return cls(
+            np.array(dates, dtype=np.int32),
+            np.array(habit_ids, dtype=np.int32),
+            np.array(values, dtype=np.float64),
+            np.array(is_bool, dtype=np.bool_),
+            np.array(metadata_ids, dtype=np.int32),
+            strings,
+            metadata_sets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, row: int) -> models.HabitRecord:
+        """
+        Build the record of a row.
+
+        :param row: Row index.
+        :return: Habit record.
+        """
+        return self.build_records(np.array([row]))[0]
+
+    def __iter__(self) -> typing.Iterator[models.HabitRecord]:
+        return iter(self.build_records(slice(None)))
+
+    def build_records(self, rows: np.ndarray | slice) -> list[models.HabitRecord]:
+        """
+        Build the records of some rows. Each record gets its own metadata dictionary.
+
+        :param rows: Row indices or slice.
+        :return: Habit records, in the order of the rows.
+        """
+        strings = self.strings
+        metadata_sets = self.metadata_sets
+        return [
+            models.HabitRecord(
+                dt.date.fromordinal(date),
+                strings[habit_id],
+                None if value != value else bool(value) if is_bool else value,
+                {
+                    strings[key_id]: strings[value_id]
+                    for key_id, value_id in metadata_sets[metadata_id]
+                },
+            )
+            for date, habit_id, value, is_bool, metadata_id in zip(
+                self.dates[rows].tolist(),
+                self.habit_ids[rows].tolist(),
+                self.values[rows].tolist(),
+                self.is_bool[rows].tolist(),
+                self.metadata_ids[rows].tolist(),
+            )
+        ]
+
+    def take(self, rows: np.ndarray | slice) -> "RecordTable":
+        """
+        Get a table with some of the rows, sharing the interned strings and metadata.
+
+        :param rows: Row indices, boolean mask or slice.
+        :return: Record table.
+        """
+        return RecordTable(
+            self.dates[rows],
+            self.habit_ids[rows],
+            self.values[rows],
+            self.is_bool[rows],
+            self.metadata_ids[rows],
+            self.strings,
+            self.metadata_sets,
+        )
+
+    def get_habit_id(self, habit_name: str) -> int | None:
+        """
+        Get the id of a habit name.
+
+        :param habit_name: Habit name.
+        :return: Habit id, None if the table has no record of the habit.
+        """
+        return self._string_ids.get(habit_name)
+
+    def get_habit_rows(self, habit_name: str) -> np.ndarray:
+        """
+        Get the rows of a habit. Rows are grouped by habit once, on the first call.
+
+        :param habit_name: Habit name.
+        :return: Row indices, in date order then table order.
+        """
+        if self._habit_rows is None:
+            order = np.lexsort((self.dates, self.habit_ids))
+            habit_ids, starts = np.unique(self.habit_ids[order], return_index=True)
+            self._habit_rows = {
+                int(habit_id): rows
+                for habit_id, rows in zip(habit_ids, np.split(order, starts[1:]))
+            }
+        habit_id = self.get_habit_id(habit_name)
+        rows = self._habit_rows.get(habit_id) if habit_id is not None else None
+        return rows if rows is not None else np.empty(0, dtype=np.intp)
+
+    def get_habit(self, habit_name: str) -> "RecordTable":
+        """
+        Get the records of a habit.
+
+        :param habit_name: Habit name.
+        :return: Record table, in date order.
+        """
+        return self.take(self.get_habit_rows(habit_name))
+
+    def get_view(
+        self,
+        habit_name: str,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        metadata: dict[str, str] | None = None,
+    ) -> "RecordView":
+        """
+        Get a view of the records of a habit between two dates, both included.
+
+        The dates are found by binary search in the rows of the habit, so the view does not copy
+        the rows unless it also filters them by metadata.
+
+        :param habit_name: Habit name.
+        :param start_date: Start date.
+        :param end_date: End date.
+        :param metadata: Keep the records with these metadata values.
+        :return: Record view, in date order.
+        """
+        rows = self.get_habit_rows(habit_name)
+        dates = self.dates[rows]
+        start = 0
+        end = len(rows)
+        if start_date is not None:
+            start = int(np.searchsorted(dates, start_date.toordinal(), "left"))
+        if end_date is not None:
+            end = int(np.searchsorted(dates, end_date.toordinal(), "right"))
+        rows = rows[start:end] if start < end else rows[:0]
+        if metadata:
+            rows = rows[self.get_metadata_mask(metadata)[self.metadata_ids[rows]]]
+        return RecordView(self, rows)
+
+    def get_mask(
+        self,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        habit_names: typing.Container[str] | None = None,
+        metadata: dict[str, str] | None = None,
+    ) -> np.ndarray:
+        """
+        Get the rows matching a filter.
+
+        :param start_date: Keep the records from this date.
+        :param end_date: Keep the records up to this date.
+        :param habit_names: Keep the records of these habits.
+        :param metadata: Keep the records with these metadata values.
+        :return: Boolean mask of the rows.
+        """
+        mask = np.ones(len(self), dtype=np.bool_)
+        if start_date is not None:
+            mask &= self.dates >= start_date.toordinal()
+        if end_date is not None:
+            mask &= self.dates <= end_date.toordinal()
+        if habit_names is not None:
+            habit_ids = [
+                habit_id
+                for habit_id in np.unique(self.habit_ids)
+                if self.strings[habit_id] in habit_names
+            ]
+            mask &= np.isin(self.habit_ids, habit_ids)
+        if metadata:
+            mask &= self.get_metadata_mask(metadata)[self.metadata_ids]
+        return mask
+
+    def filter(
+        self,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        habit_names: typing.Container[str] | None = None,
+        metadata: dict[str, str] | None = None,
+    ) -> "RecordView":
+        """
+        Get a view of the rows matching a filter, see `get_mask`.
+
+        :param start_date: Keep the records from this date.
+        :param end_date: Keep the records up to this date.
+        :param habit_names: Keep the records of these habits.
+        :param metadata: Keep the records with these metadata values.
+        :return: Record view, in table order.
+        """
+        return RecordView(
+            self,
+            np.flatnonzero(self.get_mask(start_date, end_date, habit_names, metadata)),
+        )
+
+    def get_metadata_mask(self, metadata: dict[str, str]) -> np.ndarray:
+        """
+        Get the metadata sets matching some metadata values. Each set is checked once.
+
+        :param metadata: Metadata values.
+        :return: Boolean mask of `metadata_sets`, to index with `metadata_ids`.
+        """
+        key = tuple(sorted(metadata.items()))
+        metadata_mask = self._metadata_masks.get(key)
+        if metadata_mask is None:
+            metadata_mask = self._metadata_masks[key] = np.array(
+                [
+                    self._matches_metadata(metadata_set, metadata)
+                    for metadata_set in self.metadata_sets
+                ],
+                dtype=np.bool_,
+            )
+        return metadata_mask
+
+    def _matches_metadata(
+        self,
+        metadata_set: typing.Tuple[typing.Tuple[int, int], ...],
+        metadata: dict[str, str],
+    ) -> bool:
+        record_metadata = {
+            self.strings[key_id]: self.strings[value_id]
+            for key_id, value_id in metadata_set
+        }
+        return all(record_metadata.get(k) == v for k, v in metadata.items())
+
+    def get_min_date(self) -> dt.date | None:
+        """
+        Get the date of the oldest record.
+
+        :return: Date, None if the table is empty.
+        """
+        if not len(self):
+            return None
+        return dt.date.fromordinal(int(self.dates.min()))
+
+
+class RecordView(collections.abc.Sequence):
+    """
+    Read-only sequence of some rows of a record table.
+
+    Records are built from the table when the view is read, and views never modify the table.
+    """
+
+    __slots__ = ("table", "rows")
+
+    def __init__(self, table: RecordTable, rows: np.ndarray):
+        """
+        :param table: Record table.
+        :param rows: Row indices.
+        """
+        self.table = table
+        self.rows = rows
+
+    @property
+    def dates(self) -> np.ndarray:
+        """
+        Date ordinals of the records.
+        """
+        return self.table.dates[self.rows]
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        Values of the records, NaN if a record has no value.
+        """
+        return self.table.values[self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> models.HabitRecord: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> "RecordView": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordView(self.table, self.rows[index])
+        return self.table.build_records(self.rows[[index]])[0]
+
+    def __iter__(self) -> typing.Iterator[models.HabitRecord]:
+        return iter(self.table.build_records(self.rows))
+
+    def __reversed__(self) -> typing.Iterator[models.HabitRecord]:
+        return iter(self.table.build_records(self.rows[::-1]))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, collections.abc.Sequence):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
@@ -1,3 +1,8 @@
+import datetime as dt
+import typing
+
+import numpy as np
+
 import habits_txt.models as models
 
 
@@ -45,17 +50,10 @@ def get_longest_streak(habit: models.Habit, records: list[models.HabitRecord]) -
     :param records: List of records.
     :return: Longest streak.
     """
-    streak = 0
-    longest_streak = 0
-    for record in records:
-        if record.habit_name != habit.name:
-            continue
-        if record.value:
-            streak += 1
-        else:
-            longest_streak = max(streak, longest_streak)
-            streak = 0
-    return max(streak, longest_streak)
+    longest_streaks, _ = get_streak_lengths(
+        [get_completions(r for r in records if r.habit_name == habit.name)]
+    )
+    return int(longest_streaks[0])
 
 
 def get_latest_streak(habit: models.Habit, records: list[models.HabitRecord]) -> int:
@@ -66,12 +64,189 @@ def get_latest_streak(habit: models.Habit, records: list[models.HabitRecord]) ->
     :param records: List of records.
     :return: Current streak.
     """
-    streak = 0
-    for record in reversed(records):
-        if record.habit_name != habit.name:
-            continue
-        if record.value:
-            streak += 1
-        else:
-            break
-    return streak
+    _, latest_streaks = get_streak_lengths(
+        [get_completions(r for r in records if r.habit_name == habit.name)]
+    )
+    return int(latest_streaks[0])
+
+
+def get_completions(records: typing.Iterable[models.HabitRecord]) -> np.ndarray:
+    """
+    Get the completion array of records, to compute their streaks.
+
+    :param records: Records of a habit, in date order.
+    :return: Whether each record has a truthy value.
+    """
+    return np.array([bool(record.value) for record in records], dtype=np.bool_)
+
+
+def get_completions_with_missing(
+    dates: np.ndarray, completions: np.ndarray, expected_dates: np.ndarray
+) -> np.ndarray:
+    """
+    Add the missing expected records to the completion array of a habit.
+
+    A missing record only breaks streaks, so each gap between records with expected dates in it
+    becomes a single False instead of one per missing date. Streaks are the same as with every
+    missing record.
+
+    :param dates: Date ordinals of the records, in order.
+    :param completions: Completion array of the records.
+    :param expected_dates: Date ordinals where a record is expected, in order.
+    :return: Completion array, with a False after each record followed by a missing record.
+
+    Example:
+    >>> get_completions_with_missing(np.array([1, 2, 5]), np.array([True, True, True]), np.arange(1, 7))
+    array([ True,  True, False,  True, False])
+    """
+    next_dates = np.append(dates[1:], np.iinfo(np.int64).max)
+    n_missing = np.searchsorted(expected_dates, next_dates) - np.searchsorted(
+        expected_dates, dates, "right"
+    )
+    return np.insert(completions, np.flatnonzero(n_missing > 0) + 1, False)
+
+
+def get_streak_lengths(
+    completions: typing.Sequence[np.ndarray],
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the longest and latest streaks of several habits at once.
+
+    :param completions: Completion array of each habit, one boolean per record in date order.
+    :return: Length of the longest streak of each habit, length of the streak ending at the last
+        record of each habit.
+
+    Example:
+    >>> get_streak_lengths([np.array([True, True, False, True]), np.array([], dtype=bool)])
+    (array([2, 0]), array([1, 0]))
+    """
+    runs = _find_runs(completions)
+    return runs.longest_lengths, runs.latest_lengths
+
+
+def get_streaks(
+    completions: typing.Sequence[np.ndarray],
+    dates: typing.Sequence[np.ndarray],
+) -> typing.Tuple[list[models.Streak | None], list[models.Streak | None]]:
+    """
+    Get the longest and latest streaks of several habits at once, with their dates.
+
+    :param completions: Completion array of each habit, one boolean per record in date order.
+    :param dates: Date ordinals of the records of each habit.
+    :return: Longest streak of each habit, the first one if several have the same length, and
+        streak ending at the last record of each habit. None if a habit has no such streak.
+
+    Example:
+    >>> get_streaks([np.array([True, True, False])], [np.array([738886, 738887, 738888])])
+    ([Streak(length=2, start_date=datetime.date(2024, 1, 1), end_date=datetime.date(2024, 1, 2))], [None])
+    """
+    runs = _find_runs(completions)
+    flat_dates = _interleave(dates, np.zeros(1, dtype=np.int64), np.int64)
+    start_dates = flat_dates[runs.starts].tolist()
+    end_dates = flat_dates[runs.ends - 1].tolist()
+    run_lengths = runs.lengths.tolist()
+
+    def build_streaks(run_indices: np.ndarray) -> list[models.Streak | None]:
+        return [
+            (
+                models.Streak(
+                    run_lengths[run],
+                    dt.date.fromordinal(start_dates[run]),
+                    dt.date.fromordinal(end_dates[run]),
+                )
+                if run >= 0
+                else None
+            )
+            for run in run_indices.tolist()
+        ]
+
+    return build_streaks(runs.longest_runs), build_streaks(runs.latest_runs)
+
+
+class _Runs(typing.NamedTuple):
+    """
+    Runs of completed records of several habits, laid out in one array with a False separator
+    after each habit.
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    lengths: np.ndarray
+    longest_lengths: np.ndarray
+    longest_runs: np.ndarray
+    latest_lengths: np.ndarray
+    latest_runs: np.ndarray
+
+
+def _interleave(
+    arrays: typing.Sequence[np.ndarray], separator: np.ndarray, dtype: type
+) -> np.ndarray:
+    """
+    Concatenate arrays with a separator after each of them.
+
+    :param arrays: Arrays to concatenate.
+    :param separator: One-element array to put after each array.
+    :param dtype: Data type of the result.
+    :return: Concatenated array.
+    """
+    pieces = [separator] * (2 * len(arrays))
+    pieces[::2] = arrays
+    return np.concatenate(pieces, dtype=dtype) if pieces else np.empty(0, dtype)
+
+
+def _find_runs(completions: typing.Sequence[np.ndarray]) -> _Runs:
+    """
+    Find the runs of completed records of several habits with run-length encoding.
+
+    :param completions: Completion array of each habit.
+    :return: Runs, with the longest and latest run of each habit, -1 if there is none.
+    """
+    n_habits = len(completions)
+    # Each habit starts at its offset and is followed by a False separator, so runs never span
+    # two habits and every run ends before the end of the array
+    offsets = np.zeros(n_habits + 1, dtype=np.int64)
+    np.cumsum(
+        np.fromiter(map(len, completions), dtype=np.int64, count=n_habits) + 1,
+        out=offsets[1:],
+    )
+    flat = np.zeros(int(offsets[-1]) + 1, dtype=np.int8)
+    flat[1:] = _interleave(completions, np.zeros(1, dtype=np.bool_), np.bool_)
+    changes = np.diff(flat)
+    starts = np.flatnonzero(changes == 1)
+    ends = np.flatnonzero(changes == -1)
+    lengths = ends - starts
+
+    # Runs are sorted by habit, find the runs of each habit
+    first_runs = np.searchsorted(starts, offsets)
+    n_runs = np.diff(first_runs)
+    habits = np.repeat(np.arange(n_habits, dtype=np.int64), n_runs)
+    has_runs = n_runs > 0
+
+    longest_lengths = np.zeros(n_habits, dtype=np.int64)
+    longest_runs = np.full(n_habits, -1, dtype=np.int64)
+    if len(lengths):
+        longest_lengths[has_runs] = np.maximum.reduceat(
+            lengths, first_runs[:-1][has_runs]
+        )
+        longest = np.flatnonzero(lengths == longest_lengths[habits])
+        habits_with_longest, first_longest = np.unique(
+            habits[longest], return_index=True
+        )
+        longest_runs[habits_with_longest] = longest[first_longest]
+
+        last_runs = first_runs[1:] - 1
+        is_latest = has_runs & (ends[last_runs] == offsets[1:] - 1)
+        latest_runs = np.where(is_latest, last_runs, -1)
+        latest_lengths = np.where(is_latest, lengths[last_runs], 0)
+    else:
+        latest_lengths = np.zeros(n_habits, dtype=np.int64)
+        latest_runs = np.full(n_habits, -1, dtype=np.int64)
+    return _Runs(
+        starts,
+        ends,
+        lengths,
+        longest_lengths,
+        longest_runs,
+        latest_lengths,
+        latest_runs,
+    )
@@ -0,0 +1,501 @@
+import abc
+import dataclasses
+import datetime as dt
+import logging
+import os
+import sqlite3
+import typing
+
+import habits_txt.builder as builder
+import habits_txt.cache as cache
+import habits_txt.config as config
+import habits_txt.directives as directives
+import habits_txt.exceptions as exceptions
+import habits_txt.models as models
+
+SQLITE_SUFFIX = ".sqlite"
+
+_SCHEMA_VERSION = "2"
+# Consistency errors stored with the mirror, the first one applies from the earliest date
+_CONSISTENCY_ERRORS = ("consistency_error", "final_consistency_error")
+_SCHEMA = """
+CREATE TABLE directives (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    habit TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value,
+    frequency TEXT,
+    is_measurable INTEGER,
+    lineno INTEGER NOT NULL
+);
+CREATE INDEX directives_date ON directives (date);
+CREATE INDEX directives_habit_date ON directives (habit, date);
+CREATE INDEX directives_kind_date ON directives (kind, date);
+CREATE TABLE metadata (
+    directive_id INTEGER NOT NULL REFERENCES directives (id),
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (directive_id, key)
+);
+CREATE INDEX metadata_key_value ON metadata (key, value, directive_id);
+CREATE TABLE errors (id INTEGER PRIMARY KEY, message TEXT NOT NULL);
+CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_KINDS = {
+    directives.DirectiveType.TRACK: "track",
+    directives.DirectiveType.UNTRACK: "untrack",
+    directives.DirectiveType.RECORD: "record",
+}
+
+
+@dataclasses.dataclass
+class Selection:
+    """
+    Directives selected from a storage backend.
+
+    Backends that cannot filter return all the directives, which callers filter again. Filtered
+    selections only keep the track and untrack directives of the selected habits, and their
+    records with the selected metadata, so they also carry the date of the first record of the
+    journal.
+
+    Example:
+        directives: [TrackDirective(...), RecordDirective(...)]
+        first_record_date: 2024-01-02
+        is_filtered: True
+    """
+
+    directives: list[directives.Directive]
+    first_record_date: dt.date | None = None
+    is_filtered: bool = False
+
+
+class Storage(abc.ABC):
+    """
+    Backend the directives of a journal are read from.
+
+    Backends implement `iter_directives`, the other methods read all the directives unless the
+    backend can answer them faster.
+    """
+
+    @abc.abstractmethod
+    def iter_directives(self) -> typing.Iterator[directives.Directive]:
+        """
+        Read all the directives.
+
+        :return: Iterator over the directives, in file order.
+        """
+
+    def close(self):
+        """
+        Release the resources of the backend, such as a database connection.
+        """
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def load_checkpoint(
+        self, date: dt.date, with_records: bool = True
+    ) -> typing.Tuple[builder.Checkpoint | None, list[directives.Directive]]:
+        """
+        Get the latest checkpoint at a date, with the directives it does not cover.
+
+        :param date: Date of the state to build.
+        :param with_records: If False, records may be left out, so the state built from them has
+            no last record dates.
+        :return: Checkpoint, None if there is none to start from, and the directives after it.
+        """
+        return None, list(self.iter_directives())
+
+    def select(
+        self,
+        end_date: dt.date,
+        habit_names: typing.Collection[str] | None = None,
+        metadata: dict[str, str] | None = None,
+        start_date: dt.date | None = None,
+    ) -> Selection:
+        """
+        Select the directives up to a date, of some habits and with some metadata values.
+
+        :param end_date: End date, included.
+        :param habit_names: Keep the directives of these habits.
+        :param metadata: Keep the records with these metadata values.
+        :param start_date: Keep the records from this date.
+        :return: Selection.
+        """
+        return Selection(list(self.iter_directives()))
+
+
+class TextStorage(Storage):
+    """
+    Journal text file, parsed through the parse cache.
+    """
+
+    def __init__(
+        self,
+        journal_file: str | os.PathLike,
+        on_error: typing.Callable[[str], None] | None = None,
+    ):
+        """
+        :param journal_file: Path to the journal file.
+        :param on_error: Function called with each parse error.
+        """
+        self.journal_file = journal_file
+        self.on_error = on_error
+
+    def iter_directives(self) -> typing.Iterator[directives.Directive]:
+        return cache.iter_directives(self.journal_file, on_error=self.on_error)
+
+    def load_checkpoint(
+        self, date: dt.date, with_records: bool = True
+    ) -> typing.Tuple[builder.Checkpoint | None, list[directives.Directive]]:
+        return cache.load_checkpoint(self.journal_file, date, on_error=self.on_error)
+
+
+class SqliteStorage(Storage):
+    """
+    SQLite mirror of a journal, written by `sync`.
+
+    Date, habit and metadata predicates are run as indexed queries. The mirror stores the
+    consistency errors of the journal, see `_get_consistency_errors`, which are raised by queries
+    that reach their date, so that leaving directives out of a query does not hide them.
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        on_error: typing.Callable[[str], None] | None = None,
+    ):
+        """
+        :param connection: Connection to the database.
+        :param on_error: Function called with each parse error.
+        """
+        self.connection = connection
+        self.on_error = on_error
+        self.info = dict(connection.execute("SELECT key, value FROM info"))
+
+    def get_settings(self) -> config.Snapshot:
+        """
+        Get the configuration settings the journal was parsed with.
+
+        :return: Settings, without the journal path.
+        """
+        return config.Snapshot(self.info["date_fmt"], self.info["comment_char"])
+
+    def close(self):
+        self.connection.close()
+
+    def iter_directives(self) -> typing.Iterator[directives.Directive]:
+        return iter(self._read_directives("1", []))
+
+    def load_checkpoint(
+        self, date: dt.date, with_records: bool = True
+    ) -> typing.Tuple[builder.Checkpoint | None, list[directives.Directive]]:
+        self._raise_consistency_error(date)
+        where = "d.date <= ?"
+        if not with_records:
+            where += " AND d.kind != 'record'"
+        return None, self._read_directives(where, [date.isoformat()])
+
+    def select(
+        self,
+        end_date: dt.date,
+        habit_names: typing.Collection[str] | None = None,
+        metadata: dict[str, str] | None = None,
+        start_date: dt.date | None = None,
+    ) -> Selection:
+        self._raise_consistency_error(end_date)
+        where = ["d.date <= ?"]
+        parameters: list[typing.Any] = [end_date.isoformat()]
+        if start_date is not None:
+            where.append("(d.kind != 'record' OR d.date >= ?)")
+            parameters.append(start_date.isoformat())
+        if habit_names is not None:
+            if isinstance(habit_names, str):
+                habit_names = [habit_names]
+            where.append(f"d.habit IN ({', '.join('?' * len(habit_names))})")
+            parameters.extend(habit_names)
+        if metadata:
+            where.append(
+                "(d.kind != 'record' OR "
+                + " AND ".join(
+                    "d.id IN (SELECT directive_id FROM metadata WHERE key = ? AND value = ?)"
+                    for _ in metadata
+                )
+                + ")"
+            )
+            for key, value in metadata.items():
+                parameters.extend((key, value))
+        (first_record_date,) = self.connection.execute(
+            "SELECT MIN(date) FROM directives WHERE kind = 'record' AND date <= ?",
+            (end_date.isoformat(),),
+        ).fetchone()
+        return Selection(
+            self._read_directives(" AND ".join(where), parameters),
+            (
+                dt.date.fromisoformat(first_record_date)
+                if first_record_date is not None
+                else None
+            ),
+            True,
+        )
+
+    def _raise_consistency_error(self, date: dt.date):
+        """
+        Raise the consistency error of the journal at a date, if there is one.
+
+        :param date: Date of the query.
+        """
+        for prefix in reversed(_CONSISTENCY_ERRORS):
+            error_date = self.info.get(f"{prefix}_date")
+            if error_date is None or dt.date.fromisoformat(error_date) > date:
+                continue
+            directive = directives.Directive(
+                dt.date.fromisoformat(error_date),
+                self.info[f"{prefix}_habit"],
+                int(self.info[f"{prefix}_lineno"]),
+                {},
+            )
+            raise exceptions.ConsistencyError(self.info[f"{prefix}_reason"], directive)
+
+    def _read_directives(
+        self, where: str, parameters: list[typing.Any]
+    ) -> list[directives.Directive]:
+        """
+        Read the directives matching a condition, reporting the parse errors first.
+
+        :param where: SQL condition on the directives table, aliased as `d`.
+        :param parameters: Parameters of the condition.
+        :return: Directives, in file order.
+        """
+        if self.on_error is not None:
+            for (error,) in self.connection.execute(
+                "SELECT message FROM errors ORDER BY id"
+            ):
+                self.on_error(error)
+
+        metadata_by_id: dict[int, dict[str, str]] = {}
+        for directive_id, key, value in self.connection.execute(
+            "SELECT m.directive_id, m.key, m.value "
+            "FROM metadata AS m JOIN directives AS d ON d.id = m.directive_id "
+            f"WHERE {where}",
+            parameters,
+        ):
+            metadata_by_id.setdefault(directive_id, {})[key] = value
+
+        # Journals have many directives per day, so each date object is shared
+        dates: dict[str, dt.date] = {}
+        directives_: list[directives.Directive] = []
+        append = directives_.append
+        for (
+            directive_id,
+            date_str,
+            habit_name,
+            kind,
+            value,
+            frequency,
+            is_measurable,
+            lineno,
+        ) in self.connection.execute(
+            "SELECT d.id, d.date, d.habit, d.kind, d.value, d.frequency, "
+            f"d.is_measurable, d.lineno FROM directives AS d WHERE {where} "
+            "ORDER BY d.id",
+            parameters,
+        ):
+            date = dates.get(date_str)
+            if date is None:
+                date = dates[date_str] = dt.date.fromisoformat(date_str)
+            metadata = metadata_by_id.get(directive_id, {})
+            if kind == "record":
+                append(
+                    directives.RecordDirective(
+                        date,
+                        habit_name,
+                        lineno,
+                        bool(value) if isinstance(value, int) else value,
+                        metadata,
+                    )
+                )
+            elif kind == "track":
+                append(
+                    directives.TrackDirective(
+                        date,
+                        habit_name,
+                        lineno,
+                        metadata,
+                        models.Frequency.from_string(frequency),
+                        bool(is_measurable),
+                    )
+                )
+            else:
+                append(directives.UntrackDirective(date, habit_name, lineno, metadata))
+        return directives_
+
+
+def get_sqlite_path(journal_file: str | os.PathLike) -> str:
+    """
+    Get the path of the SQLite mirror of a journal file.
+
+    :param journal_file: Path to the journal file.
+    :return: Path to the database.
+
+    Example:
+    >>> get_sqlite_path("habits.journal")
+    'habits.journal.sqlite'
+    """
+    return os.fspath(journal_file) + SQLITE_SUFFIX
+
+
+def is_synced(journal_file: str | os.PathLike) -> bool:
+    """
+    Check whether the SQLite mirror of a journal file exists and is newer than the journal.
+
+    :param journal_file: Path to the journal file.
+    :return: True if the mirror can be used instead of the journal.
+    """
+    try:
+        return (
+            os.stat(get_sqlite_path(journal_file)).st_mtime_ns
+            > os.stat(journal_file).st_mtime_ns
+        )
+    except OSError:
+        return False
+
+
+def get_storage(
+    journal_file: str | os.PathLike,
+    on_error: typing.Callable[[str], None] | None = None,
+) -> Storage:
+    """
+    Get the storage of a journal: its SQLite mirror if it is up to date, the text file otherwise.
+
+    :param journal_file: Path to the journal file.
+    :param on_error: Function called with each parse error.
+    :return: Storage, to close once the directives are read.
+    """
+    if is_synced(journal_file):
+        path = get_sqlite_path(journal_file)
+        connection = None
+        try:
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            storage = SqliteStorage(connection, on_error)
+            settings = dataclasses.replace(config.snapshot(), journal=None)
+            if (
+                storage.info.get("version") == _SCHEMA_VERSION
+                and storage.get_settings() == settings
+            ):
+                return storage
+        except (sqlite3.Error, KeyError) as e:
+            logging.debug(f"Ignoring SQLite journal {path}: {e}")
+        if connection is not None:
+            connection.close()
+    return TextStorage(journal_file, on_error)
+
+
+def _get_consistency_errors(
+    directives_: list[directives.Directive],
+) -> list[exceptions.ConsistencyError]:
+    """
+    Get the consistency errors raised by validating the directives up to any date.
+
+    `builder.validate` reports an invalid track or untrack directive before an earlier invalid
+    record, so validating up to a date before the track or untrack directive reports the record.
+
+    :param directives_: Directives.
+    :return: Error raised from the earliest date that fails, then the error raised up to the
+        last date if it is another one.
+    """
+    try:
+        builder.validate(directives_, dt.date.max)
+    except exceptions.ConsistencyError as final_error:
+        try:
+            builder.validate(
+                directives_, final_error.directive.date - dt.timedelta(days=1)
+            )
+        except exceptions.ConsistencyError as error:
+            return [error, final_error]
+        return [final_error]
+    return []
+
+
+def sync(
+    journal_file: str | os.PathLike,
+    on_error: typing.Callable[[str], None] | None = None,
+) -> typing.Tuple[str, int]:
+    """
+    Mirror a journal file into its SQLite database, replacing the previous mirror.
+
+    :param journal_file: Path to the journal file.
+    :param on_error: Function called with each parse error.
+    :return: Path to the database, number of mirrored directives.
+    """
+    errors: list[str] = []
+
+    def collect_error(error: str):
+        errors.append(error)
+        if on_error is not None:
+            on_error(error)
+
+    directives_ = list(cache.iter_directives(journal_file, on_error=collect_error))
+    settings = config.snapshot()
+    info = {
+        "version": _SCHEMA_VERSION,
+        "date_fmt": settings.date_fmt,
+        "comment_char": settings.comment_char,
+    }
+    for prefix, error in zip(_CONSISTENCY_ERRORS, _get_consistency_errors(directives_)):
+        info.update(
+            {
+                f"{prefix}_date": error.directive.date.isoformat(),
+                f"{prefix}_habit": error.directive.habit_name,
+                f"{prefix}_lineno": str(error.directive.lineno),
+                f"{prefix}_reason": error.reason,
+            }
+        )
+
+    path = get_sqlite_path(journal_file)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(_SCHEMA)
+        connection.executemany(
+            "INSERT INTO directives VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    directive_id,
+                    directive.date.isoformat(),
+                    directive.habit_name,
+                    _KINDS[directive.directive_type],
+                    getattr(directive, "value", None),
+                    (
+                        directive.frequency.cron_str
+                        if isinstance(directive, directives.TrackDirective)
+                        else None
+                    ),
+                    getattr(directive, "is_measurable", None),
+                    directive.lineno,
+                )
+                for directive_id, directive in enumerate(directives_)
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO metadata VALUES (?, ?, ?)",
+            (
+                (directive_id, key, value)
+                for directive_id, directive in enumerate(directives_)
+                for key, value in (directive.metadata or {}).items()
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO errors (message) VALUES (?)", ((error,) for error in errors)
+        )
+        connection.executemany("INSERT INTO info VALUES (?, ?)", info.items())
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+    return path, len(directives_)
@@ -4,7 +4,6 @@ from enum import Enum
 import click
 
 import habits_txt.config as config
-import habits_txt.defaults as defaults
 import habits_txt.models as models_
 
 
@@ -83,15 +82,14 @@ def _style_str(s: str, key: str) -> str:
     )
 
 
-def style_habit_record(record: models_.HabitRecord) -> str:
+def style_habit_record(
+    record: models_.HabitRecord, settings: config.Snapshot | None = None
+) -> str:
+    if settings is None:
+        settings = config.snapshot()
     return " ".join(
         [
-            _style_str(
-                dt.datetime.strftime(
-                    record.date, config.get("date_fmt", "CLI", defaults.DATE_FMT)
-                ),
-                "DATE",
-            ),
+            _style_str(dt.datetime.strftime(record.date, settings.date_fmt), "DATE"),
             f'"{_style_str(record.habit_name, "HABIT_NAME")}"',
             _style_str(record._str_meta(), "META"),
             _style_str(record._str_value(), "VALUE"),
@@ -99,9 +97,12 @@ def style_habit_record(record: models_.HabitRecord) -> str:
     )
 
 
-def style_habit_input(date: dt.date, habit_name: str) -> str:
-    return f"{_style_str(date.strftime(config.get(
-        "date_fmt", "CLI", defaults.DATE_FMT)), "DATE")} - {_style_str(habit_name, "HABIT_NAME")}: "
+def style_habit_input(
+    date: dt.date, habit_name: str, settings: config.Snapshot | None = None
+) -> str:
+    if settings is None:
+        settings = config.snapshot()
+    return f"{_style_str(date.strftime(settings.date_fmt), "DATE")} - {_style_str(habit_name, "HABIT_NAME")}: "
 
 
 def style_completion_info(habit_completion_info: models_.HabitCompletionInfo) -> str:
@@ -154,13 +155,17 @@ def style_completion_info(habit_completion_info: models_.HabitCompletionInfo) ->
     return string
 
 
-def style_tracked_habit(habit: models_.Habit, tracking_start_date: dt.date) -> str:
+def style_tracked_habit(
+    habit: models_.Habit,
+    tracking_start_date: dt.date,
+    settings: config.Snapshot | None = None,
+) -> str:
+    if settings is None:
+        settings = config.snapshot()
     return (
         "Since "
         + _style_str(
-            dt.datetime.strftime(
-                tracking_start_date, config.get("date_fmt", "CLI", defaults.DATE_FMT)
-            ),
+            dt.datetime.strftime(tracking_start_date, settings.date_fmt),
             "DATE",
         )
         + ": "
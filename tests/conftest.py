@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def directive_key():
+    """
+    Get a function comparing directives by all their fields. Values are compared by their
+    representation, so that True and 1.0 differ.
+    """
+
+    def key(directive):
+        return (
+            type(directive),
+            directive.date,
+            directive.habit_name,
+            directive.lineno,
+            directive.metadata,
+            repr(getattr(directive, "value", None)),
+            str(getattr(directive, "frequency", None)),
+            getattr(directive, "is_measurable", None),
+        )
+
+    return key
@@ -0,0 +1,163 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import habits_txt.analytics as analytics
+import habits_txt.builder as builder
+import habits_txt.directives as directives
+import habits_txt.models as models
+
+DIRECTIVES = [
+    directives.TrackDirective(
+        dt.date(2024, 1, 1), "Read", 1, {}, models.Frequency("* * *"), False
+    ),
+    directives.TrackDirective(
+        dt.date(2024, 1, 1), "Run", 2, {}, models.Frequency("* * 1"), True
+    ),
+    directives.RecordDirective(dt.date(2024, 1, 1), "Read", 3, True, {"place": "home"}),
+    directives.RecordDirective(dt.date(2024, 1, 1), "Run", 4, 2.5, {"value": "x"}),
+    directives.RecordDirective(dt.date(2024, 1, 2), "Read", 5, False, {}),
+    directives.UntrackDirective(dt.date(2024, 1, 3), "Read", 6, {}),
+    directives.RecordDirective(dt.date(2024, 1, 8), "Run", 7, 3.0, {}),
+    directives.TrackDirective(
+        dt.date(2024, 1, 9), "Read", 8, {}, models.Frequency("* * *"), False
+    ),
+    directives.RecordDirective(dt.date(2024, 1, 9), "Read", 9, True, {"place": "work"}),
+]
+
+
+def _index():
+    return builder.get_tracking_index_at_date(DIRECTIVES, dt.date(2024, 1, 10))
+
+
+def test_build_frame():
+    index = _index()
+    frame = analytics.build_frame(index, index.records.filter())
+    assert list(frame.columns) == [
+        "date",
+        "habit",
+        "value",
+        "interval",
+        "place",
+        "metadata.value",
+    ]
+    assert list(frame["date"]) == list(
+        pd.to_datetime(
+            ["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-08", "2024-01-09"]
+        )
+    )
+    assert isinstance(frame["habit"].dtype, pd.CategoricalDtype)
+    assert list(frame["habit"]) == ["Read", "Run", "Read", "Run", "Read"]
+    assert list(frame["value"]) == [1.0, 2.5, 0.0, 3.0, 1.0]
+    assert list(frame["interval"]) == [0, 1, 0, 1, 2]
+    assert list(frame["place"].astype(object).fillna("")) == [
+        "home",
+        "",
+        "",
+        "",
+        "work",
+    ]
+    assert list(frame["metadata.value"].astype(object).fillna("")) == [
+        "",
+        "x",
+        "",
+        "",
+        "",
+    ]
+
+    frame = analytics.build_frame(index, index.records.filter(habit_names=("Run",)))
+    assert list(frame.columns) == [
+        "date",
+        "habit",
+        "value",
+        "interval",
+        "metadata.value",
+    ]
+    assert list(frame["interval"]) == [1, 1]
+
+
+def test_get_completion():
+    index = _index()
+    frame = analytics.build_frame(index, index.records.filter())
+    intervals = analytics.build_interval_frame(
+        index, index.intervals, None, dt.date(2024, 1, 10)
+    )
+    completion = analytics.get_completion(frame, intervals)
+    assert list(completion.index) == [0, 1, 2]
+    assert list(completion["habit"]) == ["Read", "Run", "Read"]
+    assert list(completion["n_records"]) == [2, 2, 1]
+    assert list(completion["n_records_expected"]) == [3, 2, 2]
+    assert list(completion["average_value"]) == pytest.approx([1 / 3, 2.75, 0.5])
+    assert list(completion["end_date"]) == list(
+        pd.to_datetime(["2024-01-03", "2024-01-10", "2024-01-10"])
+    )
+
+    completion = analytics.get_completion(
+        frame.iloc[:0], intervals, ignore_missing=True
+    )
+    assert list(completion["n_records"]) == [0, 0, 0]
+    assert list(completion["average_value"]) == [0.0, 0.0, 0.0]
+
+
+def test_resample():
+    index = _index()
+    frame = analytics.build_frame(index, index.records.filter())
+    weekly = analytics.resample(frame, "W-SUN", "completion")
+    assert list(weekly.columns) == ["Read", "Run"]
+    assert list(weekly.index) == list(pd.to_datetime(["2024-01-07", "2024-01-14"]))
+    assert list(weekly["Read"]) == [0.5, 1.0]
+    assert list(analytics.resample(frame, "MS", "sum")["Run"]) == [5.5]
+    assert list(analytics.resample(frame, "MS", "count")["Read"]) == [3]
+    with pytest.raises(ValueError):
+        analytics.resample(frame, "MS", "median")
+
+
+def test_parse_interval():
+    assert analytics.parse_interval("weekly") == (7, 0)
+    assert analytics.parse_interval("yearly") == (0, 12)
+    assert analytics.parse_interval("28d") == (28, 0)
+    for interval in ("0d", "d", "2w", "fortnightly"):
+        with pytest.raises(ValueError):
+            analytics.parse_interval(interval)
+
+
+def test_get_periods():
+    dates = np.array(
+        [dt.date(2024, 1, 1).toordinal(), dt.date(2024, 2, 29).toordinal()]
+    )
+    for interval, first_dates, last_dates in [
+        ("10d", [(2023, 12, 30), (2024, 2, 28)], [(2024, 1, 8), (2024, 3, 8)]),
+        ("monthly", [(2024, 1, 1), (2024, 2, 1)], [(2024, 1, 31), (2024, 2, 29)]),
+        ("quarterly", [(2024, 1, 1), (2024, 1, 1)], [(2024, 3, 31), (2024, 3, 31)]),
+        ("yearly", [(2024, 1, 1), (2024, 1, 1)], [(2024, 12, 31), (2024, 12, 31)]),
+    ]:
+        starts, ends = analytics.get_periods(dates, interval, dt.date(2023, 12, 30))
+        assert starts.tolist() == [dt.date(*d).toordinal() for d in first_dates]
+        assert ends.tolist() == [dt.date(*d).toordinal() for d in last_dates]
+
+
+def test_get_rolling_completion():
+    index = _index()
+    start_date = dt.date(2024, 1, 1)
+    end_date = dt.date(2024, 1, 10)
+    frame = analytics.build_frame(index, index.records.filter())
+    expected = analytics.build_expected_frame(index.intervals, start_date, end_date)
+    assert list(expected["habit"]).count("Read") == 4
+
+    completion = analytics.get_rolling_completion(
+        frame, expected, start_date, end_date, 2
+    )
+    assert list(completion.columns) == ["Read", "Run"]
+    assert len(completion) == 10
+    assert completion["Read"].tolist()[:3] == [1.0, 0.5, 0.0]
+    assert completion["Read"].tolist()[-2:] == [1.0, 0.5]
+    assert np.isnan(completion.loc["2024-01-05", "Read"])
+    assert completion.loc["2024-01-02", "Run"] == 2.5
+    assert np.isnan(completion.loc["2024-01-03", "Run"])
+
+    completion = analytics.get_rolling_completion(
+        frame, expected, start_date, end_date, 2, ignore_missing=True
+    )
+    assert completion.loc["2024-01-10", "Read"] == 1.0
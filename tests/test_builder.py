@@ -1,4 +1,5 @@
 import datetime as dt
+import itertools
 
 import pytest
 
@@ -63,7 +64,7 @@ def test_get_tracked_habits_at_date():
     }
 
 
-def test_check_track_directive_is_valid():
+def test_validation_context_track():
     directive = builder.directives.TrackDirective(
         dt.datetime(2024, 1, 1),
         "Habit 1",
@@ -72,12 +73,19 @@ def test_check_track_directive_is_valid():
         builder.models.Frequency("0 0 * * *"),
         False,
     )
-    current_state = {
-        builder.models.Habit("Habit 2", builder.models.Frequency("0 0 * * *"))
-    }
-    builder._check_track_directive_is_valid(directive, current_state)
+    context = builder.ValidationContext()
+    habit = context.track(directive)
+    assert habit == builder.models.Habit(
+        "Habit 1", builder.models.Frequency("0 0 * * *"), False
+    )
+    assert context.tracked_habits == {"Habit 1": habit}
 
-    directive = builder.directives.TrackDirective(
+    with pytest.raises(builder.exceptions.ConsistencyError):
+        context.track(directive)
+
+
+def test_validation_context_untrack():
+    track_directive = builder.directives.TrackDirective(
         dt.datetime(2024, 1, 1),
         "Habit 1",
         1,
@@ -85,43 +93,16 @@ def test_check_track_directive_is_valid():
         builder.models.Frequency("0 0 * * *"),
         False,
     )
-    current_state = {
-        builder.models.Habit("Habit 1", builder.models.Frequency("0 0 * * *"))
-    }
-    with pytest.raises(builder.exceptions.ConsistencyError):
-        builder._check_track_directive_is_valid(directive, current_state)
-
-
-def test_check_untrack_directive_is_valid():
     directive = builder.directives.UntrackDirective(
-        dt.datetime(2024, 1, 1), "Habit 1", 1, {}
+        dt.datetime(2024, 1, 2), "Habit 1", 2, {}
     )
-    current_state = {
-        builder.models.Habit("Habit 1", builder.models.Frequency("0 0 * * *"))
-    }
-    builder._check_untrack_directive_is_valid(directive, current_state)
+    context = builder.ValidationContext()
+    habit = context.track(track_directive)
+    assert context.untrack(directive) == habit
+    assert context.tracked_habits == {}
 
-    directive = builder.directives.UntrackDirective(
-        dt.datetime(2024, 1, 1), "Habit 1", 1, {}
-    )
-    current_state = {
-        builder.models.Habit("Habit 2", builder.models.Frequency("0 0 * * *"))
-    }
     with pytest.raises(builder.exceptions.ConsistencyError):
-        builder._check_untrack_directive_is_valid(directive, current_state)
-
-
-def test_remove_habit_from_state():
-    habit1 = builder.models.Habit("Habit 1", builder.models.Frequency("0 0 * * *"))
-    habit2 = builder.models.Habit("Habit 2", builder.models.Frequency("0 0 * * *"))
-    habit3 = builder.models.Habit("Habit 3", builder.models.Frequency("0 0 * * *"))
-    current_state = {habit1, habit2, habit3}
-
-    new_state = builder._remove_habit_from_state("Habit 2", current_state)
-    assert new_state == {habit1, habit3}
-
-    new_state = builder._remove_habit_from_state("Habit 4", current_state)
-    assert new_state == {habit1, habit2, habit3}
+        context.untrack(directive)
 
 
 def test_build_habit_from_track_directive():
@@ -213,77 +194,163 @@ def test_get_records_up_to_date():
     ]
 
 
-def test_check_record_directive_is_valid():
-    directive = builder.directives.RecordDirective(
-        dt.datetime(2024, 1, 1), "Habit 1", 1, 2.0, {}
+def test_iter_records():
+    frequency = builder.models.Frequency("0 0 * * *")
+    track_directive = builder.directives.TrackDirective(
+        dt.date(2024, 1, 1), "Habit 1", 1, {}, frequency, False
+    )
+    record_directive1 = builder.directives.RecordDirective(
+        dt.date(2024, 1, 1), "Habit 1", 2, True, {}
+    )
+    record_directive2 = builder.directives.RecordDirective(
+        dt.date(2024, 1, 2), "Habit 1", 3, False, {}
+    )
+    untrack_directive = builder.directives.UntrackDirective(
+        dt.date(2024, 1, 2), "Habit 1", 4, {}
     )
-    tracked_habits = {
-        builder.models.Habit("Habit 1", builder.models.Frequency("0 0 * * *"), True)
-    }
-    current_records = []
-    builder._check_record_directive_is_valid(directive, tracked_habits, current_records)
 
-    with pytest.raises(builder.exceptions.ConsistencyError):
-        builder._check_record_directive_is_valid(directive, set(), current_records)
+    context = builder.ValidationContext()
+    records = builder._iter_records([track_directive, record_directive1], context)
+    assert next(records) == builder.models.HabitRecord(
+        dt.date(2024, 1, 1), "Habit 1", True
+    )
+    assert list(context.tracked_habits) == ["Habit 1"]
+    assert list(records) == []
 
-    with pytest.raises(builder.exceptions.ConsistencyError):
-        current_records = [
-            builder.models.HabitRecord(dt.datetime(2024, 1, 1), "Habit 1", 2.0)
-        ]
-        builder._check_record_directive_is_valid(
-            directive, tracked_habits, current_records
+    # Untrack directives apply before the records of the same day
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        list(
+            builder._iter_records(
+                [track_directive, record_directive2, untrack_directive],
+                builder.ValidationContext(),
+            )
         )
-
-    with pytest.raises(builder.exceptions.ConsistencyError):
-        tracked_habits = {
-            builder.models.Habit(
-                "Habit 2", builder.models.Frequency("0 0 * * *"), False
+    assert e.value.message == (
+        "Consistency error in line 3: "
+        "Recorded habit without a corresponding track directive: Habit 1"
+    )
+
+    # Track and untrack errors come first, even after an invalid record
+    invalid_untrack_directive = builder.directives.UntrackDirective(
+        dt.date(2024, 1, 3), "Habit 2", 5, {}
+    )
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        list(
+            builder._iter_records(
+                [
+                    track_directive,
+                    record_directive1,
+                    record_directive1,
+                    invalid_untrack_directive,
+                ],
+                builder.ValidationContext(),
             )
-        }
-        builder._check_record_directive_is_valid(
-            directive, tracked_habits, current_records
         )
+    assert e.value.message == (
+        "Consistency error in line 5: "
+        "Untracked habit without a corresponding track directive: Habit 2"
+    )
 
-    with pytest.raises(builder.exceptions.ConsistencyError):
-        tracked_habits = {
-            builder.models.Habit("Habit 1", builder.models.Frequency("0 0 * * *"), True)
-        }
-        record_directive = builder.directives.RecordDirective(
-            dt.datetime(2024, 1, 1), "Habit 1", 1, True, {}
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        list(
+            builder._iter_records(
+                [track_directive, record_directive1, record_directive1],
+                builder.ValidationContext(),
+            )
         )
-        builder._check_record_directive_is_valid(
-            record_directive, tracked_habits, current_records
+    assert e.value.message == (
+        "Consistency error in line 2: "
+        "Several records of the same habit on the same day: Habit 1"
+    )
+
+
+def test_validation_context_record():
+    def context_with(habit_name, is_measurable):
+        context = builder.ValidationContext()
+        context.track(
+            builder.directives.TrackDirective(
+                dt.datetime(2024, 1, 1),
+                habit_name,
+                1,
+                {},
+                builder.models.Frequency("0 0 * * *"),
+                is_measurable,
+            )
         )
+        return context
 
-    with pytest.raises(builder.exceptions.ConsistencyError):
-        tracked_habits = {
-            builder.models.Habit("Habit 1", builder.models.Frequency("0 0 * * *"), True)
-        }
-        record_directive = builder.directives.RecordDirective(
-            dt.datetime(2024, 1, 1), "Habit 1", 1, True, {}
-        )
+    directive = builder.directives.RecordDirective(
+        dt.datetime(2024, 1, 1), "Habit 1", 2, 2.0, {}
+    )
+    context = context_with("Habit 1", True)
+    assert context.get_record_error(directive) is None
+    context.record(directive)
+    assert context.recorded == {("Habit 1", dt.datetime(2024, 1, 1))}
 
-        current_records = []
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        context.record(directive)
+    assert e.value.message == (
+        "Consistency error in line 2: "
+        "Several records of the same habit on the same day: Habit 1"
+    )
 
-        builder._check_record_directive_is_valid(
-            record_directive, tracked_habits, current_records
-        )
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        builder.ValidationContext().record(directive)
+    assert e.value.message == (
+        "Consistency error in line 2: "
+        "Recorded habit without a corresponding track directive: Habit 1"
+    )
 
     with pytest.raises(builder.exceptions.ConsistencyError):
-        tracked_habits = {
-            builder.models.Habit(
-                "Habit 1", builder.models.Frequency("0 0 * * *"), False
-            )
-        }
-        record_directive = builder.directives.RecordDirective(
-            dt.datetime(2024, 1, 1), "Habit 1", 1, 10.0, {}
-        )
+        context_with("Habit 2", False).record(directive)
 
-        current_records = []
+    record_directive = builder.directives.RecordDirective(
+        dt.datetime(2024, 1, 1), "Habit 1", 2, True, {}
+    )
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        context_with("Habit 1", True).record(record_directive)
+    assert e.value.message == (
+        "Consistency error in line 2: "
+        "Measurable habit with a non-float value: Habit 1"
+    )
 
-        builder._check_record_directive_is_valid(
-            record_directive, tracked_habits, current_records
-        )
+    record_directive = builder.directives.RecordDirective(
+        dt.datetime(2024, 1, 1), "Habit 1", 2, 10.0, {}
+    )
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        context_with("Habit 1", False).record(record_directive)
+    assert e.value.message == (
+        "Consistency error in line 2: "
+        "Non-measurable habit with a non-bool value: Habit 1"
+    )
+
+
+def test_validate():
+    track_directive = builder.directives.TrackDirective(
+        dt.date(2024, 1, 1),
+        "Habit 1",
+        1,
+        {},
+        builder.models.Frequency("0 0 * * *"),
+        False,
+    )
+    record_directive = builder.directives.RecordDirective(
+        dt.date(2024, 1, 2), "Habit 1", 2, True, {}
+    )
+    untrack_directive = builder.directives.UntrackDirective(
+        dt.date(2024, 1, 3), "Habit 2", 3, {}
+    )
+    directives_ = [untrack_directive, record_directive, track_directive]
+
+    context = builder.validate(directives_, dt.date(2024, 1, 2))
+    assert list(context.tracked_habits) == ["Habit 1"]
+    assert context.recorded == {("Habit 1", dt.date(2024, 1, 2))}
+
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        builder.validate(directives_, dt.date(2024, 1, 3))
+    with pytest.raises(builder.exceptions.ConsistencyError) as e_state:
+        builder.get_state_at_date(directives_, dt.date(2024, 1, 3))
+    assert e.value.message == e_state.value.message
 
 
 def test_get_state_at_date():
@@ -426,3 +493,337 @@ def test_get_track_untrack_record_matches_at_date():
         ],
         dt.datetime(2024, 1, 3),
     ) == [(directive1, None, [directive_5, directive_6]), (directive2, directive3, [])]
+
+    # A retracked habit is matched with the untrack directive following each track directive
+    directive8 = builder.directives.UntrackDirective(
+        dt.datetime(2024, 1, 5), "Habit 1", 8, {}
+    )
+    directive9 = builder.directives.TrackDirective(
+        dt.datetime(2024, 1, 5),
+        "Habit 1",
+        9,
+        {},
+        builder.models.Frequency("0 0 * * *"),
+        False,
+    )
+    directive10 = builder.directives.RecordDirective(
+        dt.datetime(2024, 1, 5), "Habit 1", 10, True, {}
+    )
+    directive11 = builder.directives.UntrackDirective(
+        dt.datetime(2024, 1, 7), "Habit 1", 11, {}
+    )
+    assert builder.get_track_untrack_record_matches_at_date(
+        [directive1, directive_5, directive8, directive9, directive10, directive11],
+        dt.datetime(2024, 1, 31),
+    ) == [
+        (directive1, directive8, [directive_5]),
+        (directive9, directive11, [directive10]),
+    ]
+
+
+def test_tracking_index():
+    frequency = builder.models.Frequency("0 0 * * *")
+    track_directive1 = builder.directives.TrackDirective(
+        dt.date(2024, 1, 1), "Habit 1", 1, {}, frequency, False
+    )
+    track_directive2 = builder.directives.TrackDirective(
+        dt.date(2024, 1, 2), "Habit 2", 2, {}, frequency, False
+    )
+    untrack_directive1 = builder.directives.UntrackDirective(
+        dt.date(2024, 1, 10), "Habit 1", 3, {}
+    )
+    retrack_directive1 = builder.directives.TrackDirective(
+        dt.date(2024, 1, 20), "Habit 1", 4, {}, frequency, False
+    )
+    record_directives = [
+        builder.directives.RecordDirective(
+            dt.date(2024, 1, day), "Habit 1", 4 + day, True, {}
+        )
+        for day in (25, 3, 9, 21)
+    ]
+    directives_ = [
+        track_directive1,
+        track_directive2,
+        retrack_directive1,
+        untrack_directive1,
+        *record_directives,
+    ]
+    index = builder.TrackingIndex(directives_)
+
+    first, second = index.get_intervals("Habit 1")
+    assert (first.start_date, first.end_date) == (
+        dt.date(2024, 1, 1),
+        dt.date(2024, 1, 10),
+    )
+    assert (second.start_date, second.end_date) == (dt.date(2024, 1, 20), None)
+    assert index.get_intervals("Habit 3") == []
+    assert index.intervals == [first, index.get_intervals("Habit 2")[0], second]
+
+    assert index.get_interval_at("Habit 1", dt.date(2023, 12, 31)) is None
+    assert index.get_interval_at("Habit 1", dt.date(2024, 1, 9)) is first
+    assert index.get_interval_at("Habit 1", dt.date(2024, 1, 10)) is None
+    assert index.get_interval_at("Habit 1", dt.date(2024, 2, 1)) is second
+    assert index.get_interval_at("Habit 3", dt.date(2024, 2, 1)) is None
+
+    assert [
+        interval.habit.name for interval in index.get_tracked_at(dt.date(2024, 1, 2))
+    ] == ["Habit 1", "Habit 2"]
+    assert [
+        interval.habit.name for interval in index.get_tracked_at(dt.date(2024, 1, 15))
+    ] == ["Habit 2"]
+    assert index.get_tracked_at(dt.date(2024, 1, 20))[1] is second
+
+    # Record directives are left to the record table, matches keep them in file order
+    assert len(index.records) == 0
+    matches = builder.get_track_untrack_record_matches_at_date(
+        directives_, dt.date(2024, 2, 1)
+    )
+    assert [records for _, _, records in matches] == [
+        [record_directives[1], record_directives[2]],
+        [],
+        [record_directives[0], record_directives[3]],
+    ]
+
+
+def test_build_habit_record_match():
+    frequency = builder.models.Frequency("0 0 * * *")
+    track_directive = builder.directives.TrackDirective(
+        dt.date(2024, 1, 1), "Habit 1", 1, {}, frequency, False
+    )
+    record_directives = [
+        builder.directives.RecordDirective(
+            dt.date(2024, 1, day), "Habit 1", 1 + day, True, {"day": str(day % 2)}
+        )
+        for day in (3, 1, 2)
+    ]
+    index = builder.get_tracking_index_at_date(
+        [track_directive, *record_directives], dt.date(2024, 1, 3)
+    )
+
+    match = builder.build_habit_record_match(
+        index, index.intervals[0], dt.date(2024, 1, 2)
+    )
+    assert match == builder.models.HabitRecordMatch(
+        builder.models.Habit("Habit 1", frequency, False),
+        [
+            builder.models.HabitRecord(
+                dt.date(2024, 1, 2), "Habit 1", True, {"day": "0"}
+            ),
+            builder.models.HabitRecord(
+                dt.date(2024, 1, 3), "Habit 1", True, {"day": "1"}
+            ),
+        ],
+        dt.date(2024, 1, 1),
+        None,
+    )
+
+    match = builder.build_habit_record_match(
+        index, index.intervals[0], None, dt.date(2024, 1, 2), {"day": "1"}
+    )
+    assert match.habit_records == [
+        builder.models.HabitRecord(dt.date(2024, 1, 1), "Habit 1", True, {"day": "1"})
+    ]
+    assert len(index.records) == 3
+
+
+def test_iter_states():
+    frequency = builder.models.Frequency("0 0 * * *")
+    directives_ = [
+        builder.directives.RecordDirective(dt.date(2024, 1, 3), "Habit 1", 4, True, {}),
+        builder.directives.TrackDirective(
+            dt.date(2024, 1, 1), "Habit 1", 1, {}, frequency, False
+        ),
+        builder.directives.RecordDirective(dt.date(2024, 1, 1), "Habit 1", 2, True, {}),
+        builder.directives.TrackDirective(
+            dt.date(2024, 1, 3), "Habit 2", 3, {}, frequency, True
+        ),
+        builder.directives.UntrackDirective(dt.date(2024, 1, 5), "Habit 1", 5, {}),
+        builder.directives.RecordDirective(dt.date(2024, 1, 6), "Habit 2", 6, 1.0, {}),
+    ]
+    start_date = dt.date(2024, 1, 2)
+    end_date = dt.date(2024, 1, 7)
+    states = list(builder.iter_states(directives_, start_date, end_date))
+    assert [date for date, _, _ in states] == [
+        start_date + dt.timedelta(days=i) for i in range(6)
+    ]
+    for date, tracked_habits, records in builder.iter_states(
+        directives_, start_date, end_date
+    ):
+        assert (tracked_habits, list(records)) == builder.get_state_at_date(
+            directives_, date
+        )[:2]
+
+    # Errors are raised when reaching the first date they affect
+    directives_.append(
+        builder.directives.RecordDirective(dt.date(2024, 1, 7), "Habit 1", 7, True, {})
+    )
+    states = builder.iter_states(directives_, start_date, end_date)
+    assert [date for date, _, _ in itertools.islice(states, 5)][-1] == dt.date(
+        2024, 1, 6
+    )
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        next(states)
+    assert e.value.message == (
+        "Consistency error in line 7: "
+        "Recorded habit without a corresponding track directive: Habit 1"
+    )
+
+
+def _checkpoint_directives():
+    frequency = builder.models.Frequency("0 0 * * *")
+    directives_ = [
+        builder.directives.TrackDirective(
+            dt.date(2024, 1, 1), "Habit 1", 1, {}, frequency, False
+        ),
+        builder.directives.TrackDirective(
+            dt.date(2024, 1, 15), "Habit 2", 2, {}, frequency, True
+        ),
+        builder.directives.UntrackDirective(dt.date(2024, 2, 10), "Habit 1", 3, {}),
+        builder.directives.TrackDirective(
+            dt.date(2024, 3, 5), "Habit 1", 4, {}, frequency, False
+        ),
+    ]
+    for day in range(0, 120, 3):
+        date = dt.date(2024, 1, 1) + dt.timedelta(days=day)
+        if date < dt.date(2024, 2, 10) or date >= dt.date(2024, 3, 5):
+            directives_.append(
+                builder.directives.RecordDirective(date, "Habit 1", 5, True, {})
+            )
+        if date >= dt.date(2024, 1, 15):
+            directives_.append(
+                builder.directives.RecordDirective(date, "Habit 2", 6, 1.0, {})
+            )
+    return directives_
+
+
+def test_build_checkpoints():
+    directives_ = _checkpoint_directives()
+    checkpoints = builder.build_checkpoints(reversed(directives_))
+    assert [checkpoint.date for checkpoint in checkpoints] == [
+        dt.date(2024, 1, 31),
+        dt.date(2024, 2, 29),
+        dt.date(2024, 3, 31),
+    ]
+    assert checkpoints[1] == builder.Checkpoint(
+        dt.date(2024, 2, 29),
+        {"Habit 2": builder.models.Habit("Habit 2", directives_[1].frequency, True)},
+        {"Habit 2": dt.date(2024, 1, 15)},
+        {"Habit 1": dt.date(2024, 2, 9), "Habit 2": dt.date(2024, 2, 27)},
+    )
+    for checkpoint in checkpoints:
+        assert builder.get_checkpoint_at_date(directives_, checkpoint.date) == (
+            checkpoint
+        )
+
+    # Checkpoints stop before the first inconsistent day
+    directives_.append(
+        builder.directives.RecordDirective(dt.date(2024, 3, 1), "Habit 1", 7, True, {})
+    )
+    assert [
+        checkpoint.date for checkpoint in builder.build_checkpoints(directives_)
+    ] == [dt.date(2024, 1, 31), dt.date(2024, 2, 29)]
+
+
+def test_get_checkpoint_at_date():
+    directives_ = _checkpoint_directives()
+    checkpoints = builder.build_checkpoints(directives_)
+    for date in (dt.date(2024, 2, 1), dt.date(2024, 3, 5), dt.date(2024, 4, 30)):
+        checkpoint = builder.get_checkpoint_at_date(directives_, date)
+        tracked_habits, records, _ = builder.get_state_at_date(directives_, date)
+        assert set(checkpoint.tracked_habits.values()) == tracked_habits
+        assert checkpoint.last_record_dates == {
+            record.habit_name: record.date for record in records
+        }
+        for previous_checkpoint in checkpoints:
+            if previous_checkpoint.date <= date:
+                assert (
+                    builder.get_checkpoint_at_date(
+                        directives_, date, previous_checkpoint
+                    )
+                    == checkpoint
+                )
+
+    invalid_directive = builder.directives.UntrackDirective(
+        dt.date(2024, 4, 1), "Habit 3", 8, {}
+    )
+    with pytest.raises(builder.exceptions.ConsistencyError) as e:
+        builder.get_checkpoint_at_date(
+            [*directives_, invalid_directive], dt.date(2024, 4, 1), checkpoints[-1]
+        )
+    assert e.value.message == (
+        "Consistency error in line 8: "
+        "Untracked habit without a corresponding track directive: Habit 3"
+    )
+
+
+def test_journal_state():
+    directives_ = _checkpoint_directives()
+    end_date = dt.date(2024, 4, 29)
+    tracked_habits, records, habits_records_matches = builder.get_state_at_date(
+        directives_, end_date
+    )
+
+    state = builder.JournalState()
+    state.apply_many(directives_)
+    assert state.get_state() == (tracked_habits, records, habits_records_matches)
+    assert state.date == dt.date(2024, 4, 27)
+    assert state.get_checkpoint() == builder.get_checkpoint_at_date(
+        directives_, state.date
+    )
+    assert state.n_records == {"Habit 1": 32, "Habit 2": 35}
+    assert state.value_sums == {"Habit 1": 32.0, "Habit 2": 35.0}
+
+    state = builder.JournalState()
+    for directive in builder._sort_directives(directives_):
+        if directive.date < dt.date(2024, 3, 5):
+            state.apply(directive)
+    state.apply_many(d for d in directives_ if d.date >= dt.date(2024, 3, 5))
+    assert state.get_state() == (tracked_habits, records, habits_records_matches)
+
+
+def test_journal_state_errors():
+    frequency = builder.models.Frequency("0 0 * * *")
+    state = builder.JournalState()
+    with pytest.raises(ValueError):
+        state.get_checkpoint()
+    state.apply(
+        builder.directives.TrackDirective(
+            dt.date(2024, 1, 1), "Habit 1", 1, {}, frequency, False
+        )
+    )
+    state.apply(
+        builder.directives.RecordDirective(dt.date(2024, 1, 2), "Habit 1", 2, True, {})
+    )
+
+    invalid_directives = [
+        builder.directives.RecordDirective(dt.date(2024, 1, 2), "Habit 1", 3, True, {}),
+        builder.directives.RecordDirective(dt.date(2024, 1, 2), "Habit 2", 4, True, {}),
+        builder.directives.RecordDirective(dt.date(2024, 1, 3), "Habit 1", 5, 1.0, {}),
+        builder.directives.UntrackDirective(dt.date(2024, 1, 3), "Habit 2", 6, {}),
+        builder.directives.TrackDirective(
+            dt.date(2024, 1, 3), "Habit 1", 7, {}, frequency, False
+        ),
+    ]
+    for directive in invalid_directives:
+        with pytest.raises(builder.exceptions.ConsistencyError):
+            state.apply(directive)
+    assert len(state.records) == 1
+    assert state.habits_records_matches[0].habit_records == state.records
+    assert state.date == dt.date(2024, 1, 2)
+
+    with pytest.raises(ValueError):
+        state.apply(
+            builder.directives.RecordDirective(
+                dt.date(2024, 1, 1), "Habit 1", 8, True, {}
+            )
+        )
+    with pytest.raises(ValueError):
+        state.apply(
+            builder.directives.UntrackDirective(dt.date(2024, 1, 2), "Habit 1", 9, {})
+        )
+
+    state.apply(
+        builder.directives.UntrackDirective(dt.date(2024, 1, 3), "Habit 1", 10, {})
+    )
+    assert state.tracked_habits == set()
+    assert state.habits_records_matches[0].tracking_end_date == dt.date(2024, 1, 3)
@@ -0,0 +1,179 @@
+import datetime as dt
+
+import pytest
+
+import habits_txt.cache as cache
+
+
+@pytest.fixture
+def parsed_lines(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata"))
+    parsed = []
+    iter_directives = cache.parser.iter_directives
+
+    def spy(lines, on_error, first_lineno):
+        parsed.extend(lines)
+        return iter_directives(lines, on_error, first_lineno)
+
+    monkeypatch.setattr(cache.parser, "iter_directives", spy)
+    return parsed
+
+
+def _parse(journal_file):
+    errors = []
+    return list(cache.iter_directives(journal_file, errors.append)), errors
+
+
+def test_iter_directives(parsed_lines, tmp_path):
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text('2024-01-01 track "Read" (* * *)\n2024-01-02 invalid\n')
+
+    directives_, errors = _parse(journal_file)
+    assert [(repr(d), d.lineno) for d in directives_] == [
+        ('2024-01-01 track "Read" (* * *) ', 1)
+    ]
+    assert errors == ["Error parsing line 2: Invalid directive type: invalid"]
+    assert len(parsed_lines) == 2
+
+    parsed_lines.clear()
+    assert _parse(journal_file) == (directives_, errors)
+    assert parsed_lines == []
+
+    with open(journal_file, "a") as f:
+        f.write('2024-01-03 "Read" yes\n2024-01-04 invalid\n')
+    new_directives, new_errors = _parse(journal_file)
+    assert parsed_lines == ['2024-01-03 "Read" yes\n', "2024-01-04 invalid\n"]
+    assert [(repr(d), d.lineno) for d in new_directives] == [
+        ('2024-01-01 track "Read" (* * *) ', 1),
+        ('2024-01-03 record "Read" yes', 3),
+    ]
+    assert new_errors == errors + [
+        "Error parsing line 4: Invalid directive type: invalid"
+    ]
+
+
+def test_iter_directives_partial_line(parsed_lines, tmp_path):
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text('2024-01-01 track "Read" (* * *)\n2024-01-02 "Read" y')
+
+    directives_, errors = _parse(journal_file)
+    assert len(directives_) == 1
+    assert errors == ["Error parsing line 2: Value must be a boolean or a number: y"]
+
+    with open(journal_file, "a") as f:
+        f.write("es\n")
+    parsed_lines.clear()
+    directives_, errors = _parse(journal_file)
+    assert parsed_lines == ['2024-01-02 "Read" yes\n']
+    assert (directives_[1].date, directives_[1].value, directives_[1].lineno) == (
+        dt.date(2024, 1, 2),
+        True,
+        2,
+    )
+    assert errors == []
+
+
+def test_iter_directives_invalidation(parsed_lines, tmp_path, monkeypatch):
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text('2024-01-01 "Read" yes\n2024-01-02 "Read" no\n')
+    _parse(journal_file)
+
+    journal_file.write_text('2024-01-01 "Read" no\n2024-01-02 "Read" no\n')
+    parsed_lines.clear()
+    directives_, _ = _parse(journal_file)
+    assert len(parsed_lines) == 2
+    assert [d.value for d in directives_] == [False, False]
+
+    journal_file.write_text('2024-01-01 "Read" no\n')
+    parsed_lines.clear()
+    directives_, _ = _parse(journal_file)
+    assert len(parsed_lines) == 1
+    assert len(directives_) == 1
+
+    monkeypatch.setattr(
+        cache.config,
+        "snapshot",
+        lambda: cache.config.Snapshot(date_fmt="%d/%m/%Y"),
+    )
+    parsed_lines.clear()
+    directives_, errors = _parse(journal_file)
+    assert len(parsed_lines) == 1
+    assert directives_ == []
+    assert errors == [
+        'Error parsing line 1: Could not find a date in the directive: 2024-01-01 "Read" no'
+    ]
+
+
+def test_load_entry(monkeypatch, tmp_path):
+    settings = cache.config.Snapshot()
+    cache_path = tmp_path / "cache.pickle"
+    assert cache._load_entry(str(cache_path), settings) is None
+
+    cache_path.write_bytes(b"corrupted")
+    assert cache._load_entry(str(cache_path), settings) is None
+
+    entry = cache.ParseCacheEntry(settings, offset=10)
+    cache._save_entry(str(cache_path), entry)
+    assert cache._load_entry(str(cache_path), settings) == entry
+    assert cache._load_entry(str(cache_path), cache.config.Snapshot("%d")) is None
+
+    monkeypatch.setattr(cache, "_CACHE_VERSION", cache._CACHE_VERSION + 1)
+    assert cache._load_entry(str(cache_path), settings) is None
+
+
+def test_load_checkpoint(parsed_lines, tmp_path, monkeypatch):
+    journal_file = tmp_path / "habits.journal"
+    lines = ['2024-01-01 track "Read" (* * *)\n'] + [
+        f'2024-{month:02}-01 "Read" yes\n' for month in (1, 2, 3)
+    ]
+    journal_file.write_text("".join(lines))
+    built = []
+    build_checkpoints = cache.builder.build_checkpoints
+
+    def spy(directives_):
+        built.append(len(directives_))
+        return build_checkpoints(directives_)
+
+    monkeypatch.setattr(cache.builder, "build_checkpoints", spy)
+
+    checkpoint, directives_ = cache.load_checkpoint(journal_file, dt.date(2024, 3, 1))
+    assert checkpoint.date == dt.date(2024, 2, 29)
+    assert [d.date for d in directives_] == [dt.date(2024, 3, 1)]
+    assert built == [4]
+
+    # Checkpoints are saved with the cache
+    checkpoint, directives_ = cache.load_checkpoint(journal_file, dt.date(2024, 2, 1))
+    assert checkpoint.date == dt.date(2024, 1, 31)
+    assert [d.date for d in directives_] == [dt.date(2024, 2, 1), dt.date(2024, 3, 1)]
+    assert cache.load_checkpoint(journal_file, dt.date(2024, 1, 31))[0] == checkpoint
+    checkpoint, directives_ = cache.load_checkpoint(journal_file, dt.date(2024, 1, 30))
+    assert checkpoint is None
+    assert len(directives_) == 4
+    assert built == [4]
+
+    # A directive appended before a checkpoint disables it, but not the earlier ones
+    with open(journal_file, "a") as f:
+        f.write('2024-02-15 "Read" yes\n')
+    checkpoint, directives_ = cache.load_checkpoint(journal_file, dt.date(2024, 3, 1))
+    assert checkpoint.date == dt.date(2024, 1, 31)
+    assert [d.date for d in directives_] == [
+        dt.date(2024, 2, 1),
+        dt.date(2024, 3, 1),
+        dt.date(2024, 2, 15),
+    ]
+    assert built == [4]
+
+    # Checkpoints are built again once the journal reaches a new month
+    with open(journal_file, "a") as f:
+        f.write('2024-04-01 "Read" yes\n2024-04-02 "Read" yes')
+    checkpoint, directives_ = cache.load_checkpoint(journal_file, dt.date(2024, 4, 2))
+    assert checkpoint.date == dt.date(2024, 3, 31)
+    assert [d.date for d in directives_] == [dt.date(2024, 4, 1), dt.date(2024, 4, 2)]
+    assert built == [4, 6]
+
+    # Editing the cached part of the file drops the checkpoints
+    journal_file.write_text("".join(lines).replace("yes", "no"))
+    checkpoint, directives_ = cache.load_checkpoint(journal_file, dt.date(2024, 3, 1))
+    assert checkpoint.date == dt.date(2024, 2, 29)
+    assert [d.value for d in directives_] == [False]
+    assert built == [4, 6, 4]
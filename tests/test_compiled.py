@@ -0,0 +1,88 @@
+import datetime as dt
+import os
+
+import pytest
+
+import habits_txt.compiled as compiled
+import habits_txt.directives as directives
+import habits_txt.models as models
+import habits_txt.parser as parser
+
+
+def test_get_path():
+    assert compiled.get_path("habits.journal") == "habits.journal.hbtxtc"
+
+
+def test_write_load(tmp_path, directive_key):
+    settings = compiled.config.Snapshot()
+    directives_ = [
+        directives.TrackDirective(
+            dt.date(2024, 1, 1),
+            "Read",
+            1,
+            {"author": "me"},
+            models.Frequency("* * *"),
+            False,
+        ),
+        directives.TrackDirective(
+            dt.date(2024, 1, 1), "Run", 2, {}, models.Frequency("* * 1"), True
+        ),
+        directives.RecordDirective(dt.date(2024, 1, 2), "Read", 3, True, {}),
+        directives.RecordDirective(
+            dt.date(2024, 1, 2), "Run", 4, 2.5, {"author": "me", "place": "park"}
+        ),
+        directives.RecordDirective(dt.date(2024, 1, 3), "Read", 6, False, {}),
+        directives.UntrackDirective(dt.date(2024, 1, 4), "Run", 7, {"why": "é"}),
+    ]
+    errors = ["Error parsing line 5: Invalid directive type: invalid"]
+    path = tmp_path / "habits.journal.hbtxtc"
+
+    compiled.write(path, directives_, errors, settings)
+    loaded_directives, loaded_errors = compiled.load(path, settings)
+    assert [directive_key(d) for d in loaded_directives] == [
+        directive_key(d) for d in directives_
+    ]
+    assert loaded_errors == errors
+
+    assert compiled.load(path, compiled.config.Snapshot(date_fmt="%d/%m/%Y")) is None
+
+    compiled.write(path, [], [], settings)
+    assert compiled.load(path, settings) == ([], [])
+
+
+def test_load_invalid(tmp_path):
+    settings = compiled.config.Snapshot()
+    path = tmp_path / "habits.journal.hbtxtc"
+    path.write_bytes(b"not a compiled journal")
+    with pytest.raises(ValueError):
+        compiled.load(path, settings)
+
+    compiled.write(path, [], [], settings)
+    path.write_bytes(path.read_bytes()[:-20])
+    with pytest.raises(ValueError):
+        compiled.load(path, settings)
+
+
+def test_load_if_fresh(tmp_path):
+    settings = compiled.config.Snapshot()
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text('2024-01-01 "Read" yes\n')
+    sidecar_path = compiled.get_path(journal_file)
+    assert compiled.load_if_fresh(journal_file, settings) is None
+
+    compiled.write(sidecar_path, [], ["error"], settings)
+    stat = journal_file.stat()
+    os.utime(sidecar_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert compiled.is_fresh(journal_file)
+    assert compiled.load_if_fresh(journal_file, settings) == ([], ["error"])
+    assert parser.parse_file(str(journal_file)) == ([], ["error"])
+
+    os.utime(sidecar_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert not compiled.is_fresh(journal_file)
+    assert compiled.load_if_fresh(journal_file, settings) is None
+    assert len(parser.parse_file(str(journal_file))[0]) == 1
+
+    with open(sidecar_path, "wb") as f:
+        f.write(b"corrupted")
+    os.utime(sidecar_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert compiled.load_if_fresh(journal_file, settings) is None
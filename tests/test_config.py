@@ -101,3 +101,26 @@ def test_get_section(monkeypatch):
     assert config.get_section("CLI") == {"key": "value"}
 
     assert config.get_section("INVALID") == {}
+
+
+def test_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setattr(config.defaults, "APPDATA_PATH", str(tmp_path))
+    assert config.snapshot() == config.Snapshot()
+
+    config_path = tmp_path / "config.ini"
+    config_path.write_text("[CLI]\ndate_fmt = %%d/%%m/%%Y\njournal = /habits.journal\n")
+    snapshot = config.snapshot()
+    assert snapshot == config.Snapshot(
+        date_fmt="%d/%m/%Y",
+        comment_char=config.defaults.COMMENT_CHAR,
+        journal="/habits.journal",
+    )
+    assert config.snapshot() is snapshot
+
+    config_path.write_text("[CLI]\ncomment_char = ;\n")
+    stat = config_path.stat()
+    config.os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert config.snapshot() == config.Snapshot(comment_char=";")
+
+    config.set("comment_char", "%", "CLI")
+    assert config.snapshot().comment_char == "%"
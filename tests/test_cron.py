@@ -0,0 +1,118 @@
+import datetime as dt
+
+import croniter
+import pytest
+
+import habits_txt.cron as cron
+
+EXPRESSIONS = [
+    "0 0 * * *",
+    "0 0 * * 1",
+    "0 0 * * 0",
+    "0 0 * * 7",
+    "0 0 * * 1,3,5",
+    "0 0 * * mon-fri",
+    "0 0 * * 0,6",
+    "0 0 1 * *",
+    "0 0 15 * *",
+    "0 0 31 * *",
+    "0 0 29 2 *",
+    "0 0 1,15 */3 *",
+    "0 0 */2 * *",
+    "0 0 */5 * *",
+    "0 0 */3 * 1",
+    "0 0 1,31 * *",
+    "0 0 1 * 0,1,2,3,4,5,6",
+    "0 0 15 * 1-7",
+    "0 0 1-7 * 1",
+    "0 0 13 * 5",
+    "0 0 1 * 1",
+    "0 0 * 2 *",
+    "0 0 * jan,jul *",
+    "0 0 10-20 6-8 2-4",
+    "30 8 * * *",
+    "0 12 * * 1",
+    "0 * 1 * *",
+    "* * * * 1",
+    "@daily",
+    "@weekly",
+    "@monthly",
+    "@yearly",
+]
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_next_date(expression):
+    schedule = cron.compile(expression)
+    assert schedule is not None
+    start = dt.date(2023, 12, 1)
+    for days in range(0, 800, 3):
+        date = start + dt.timedelta(days=days)
+        expected = (
+            croniter.croniter(expression, dt.datetime.combine(date, dt.time()))
+            .get_next(dt.datetime)
+            .date()
+        )
+        next_date = schedule.next_date(date)
+        if next_date != expected:
+            # croniter jumps past the end of the month to reach a day the month does not
+            # have, then skips the matching days at the start of the next month
+            assert date.month != next_date.month and next_date < expected, date
+            assert schedule.matches(next_date), date
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_matches(expression):
+    schedule = cron.compile(expression)
+    start = dt.date(2024, 1, 1)
+    for days in range(366):
+        date = start + dt.timedelta(days=days)
+        day_before = dt.datetime.combine(date - dt.timedelta(days=1), dt.time(23, 59))
+        next_fire_date = (
+            croniter.croniter(expression, day_before).get_next(dt.datetime).date()
+        )
+        assert schedule.matches(date) == (next_fire_date == date), date
+
+
+def test_next_date_month_rollover():
+    schedule = cron.compile("0 0 */5 * *")
+    assert schedule.next_date(dt.date(2024, 2, 26)) == dt.date(2024, 3, 1)
+    assert schedule.next_date(dt.date(2024, 1, 26)) == dt.date(2024, 1, 31)
+
+
+def test_compile_unsupported():
+    assert cron.compile("0 0 L * *") is None
+    assert cron.compile("0 0 * * 1#2") is None
+    assert cron.compile("0 0 0 * * *") is None
+    assert cron.compile("invalid") is None
+
+
+def test_next_date_never():
+    schedule = cron.DaySchedule(1 << 31, 1 << 2, 0b1111111, False, False)
+    assert schedule.next_date(dt.date(2024, 1, 1)) is None
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_count(expression):
+    schedule = cron.compile(expression)
+    start = dt.date(2023, 11, 20)
+    for n_days in (0, 1, 6, 7, 8, 30, 45, 400):
+        end = start + dt.timedelta(days=n_days)
+        expected = sum(
+            schedule.matches(start + dt.timedelta(days=i)) for i in range(n_days + 1)
+        )
+        assert schedule.count(start, end) == expected, end
+    assert schedule.count(start, start - dt.timedelta(days=1)) == 0
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_dates(expression):
+    schedule = cron.compile(expression)
+    start = dt.date(2023, 11, 20)
+    end = start + dt.timedelta(days=800)
+    assert schedule.dates(start, end).tolist() == [
+        (start + dt.timedelta(days=i)).toordinal()
+        for i in range(801)
+        if schedule.matches(start + dt.timedelta(days=i))
+    ]
+    assert schedule.dates(start, start - dt.timedelta(days=1)).tolist() == []
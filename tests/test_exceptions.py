@@ -14,3 +14,5 @@ def test_consistency_error():
     error = exceptions.ConsistencyError("Error message", directive)
     assert str(error) == "Consistency error in line 1: Error message"
     assert error.message == "Consistency error in line 1: Error message"
+    assert error.reason == "Error message"
+    assert error.directive is directive
@@ -1,6 +1,9 @@
 import datetime as dt
+import os
 import unittest.mock as mock
 
+import numpy as np
+import pandas as pd
 import pytest
 from freezegun import freeze_time
 
@@ -8,33 +11,79 @@ import habits_txt.journal as journal
 import habits_txt.models as models
 
 
-def test_get_state_at_date(monkeypatch):
+def _directives(habits_records_matches):
+    directives = []
+    for match in habits_records_matches:
+        directives.append(
+            journal.builder.directives.TrackDirective(
+                match.tracking_start_date,
+                match.habit.name,
+                0,
+                match.habit.metadata,
+                match.habit.frequency,
+                match.habit.is_measurable,
+            )
+        )
+        if match.tracking_end_date is not None:
+            directives.append(
+                journal.builder.directives.UntrackDirective(
+                    match.tracking_end_date, match.habit.name, 0, {}
+                )
+            )
+        directives.extend(
+            journal.builder.directives.RecordDirective(
+                record.date, record.habit_name, 0, record.value, record.metadata
+            )
+            for record in match.habit_records
+        )
+    return directives
+
+
+def _tracking_index(records, habits_records_matches):
+    index = journal.builder.TrackingIndex(
+        _directives(habits_records_matches),
+        journal.builder.record_table.RecordTable.from_records(records),
+    )
+    return index, index.records.get_min_date()
+
+
+def test_get_state_at_date(monkeypatch, caplog):
     mock_directive = mock.MagicMock()
     mock_habit = mock.MagicMock()
     mock_record = mock.MagicMock()
     mock_habits_records_matches = mock.MagicMock()
-    monkeypatch.setattr(journal.parser, "parse_file", lambda x: ([mock_directive], []))
     monkeypatch.setattr(
-        journal.builder,
-        "get_state_at_date",
-        lambda x, y: ([mock_habit], [mock_record], mock_habits_records_matches),
+        journal.storage.cache,
+        "iter_directives",
+        lambda x, on_error: iter([mock_directive]),
     )
+
+    def get_state_at_date(directives, date):
+        assert list(directives) == [mock_directive]
+        return [mock_habit], [mock_record], mock_habits_records_matches
+
+    monkeypatch.setattr(journal.builder, "get_state_at_date", get_state_at_date)
     assert journal.get_state_at_date("journal_file", dt.date(2021, 1, 1)) == (
         [mock_habit],
         [mock_record],
         mock_habits_records_matches,
     )
 
-    monkeypatch.setattr(
-        journal.parser, "parse_file", lambda x: ([mock_directive], ["error"])
-    )
-    monkeypatch.setattr(journal, "_log_errors", mock.MagicMock())
+    def iter_directives(x, on_error):
+        on_error("error1")
+        yield mock_directive
+        on_error("error2")
+
+    monkeypatch.setattr(journal.storage.cache, "iter_directives", iter_directives)
     assert journal.get_state_at_date("journal_file", dt.date(2021, 1, 1)) == (
         [mock_habit],
         [mock_record],
         mock_habits_records_matches,
     )
-    journal._log_errors.assert_called_with(["error"])
+    assert [(r.levelname, r.message) for r in caplog.records] == [
+        ("ERROR", "error1"),
+        ("ERROR", "error2"),
+    ]
 
     def raise_error(*args):
         raise journal.exceptions.ConsistencyError("error", mock.MagicMock())
@@ -45,25 +94,87 @@ def test_get_state_at_date(monkeypatch):
         journal.get_state_at_date("journal_file", dt.date(2021, 1, 1))
 
 
-def test_log_errors(caplog):
-    journal._log_errors(["error1", "error2"])
-    assert caplog.records[0].levelname == "ERROR"
-    assert caplog.records[0].message == "error1"
-    assert caplog.records[1].levelname == "ERROR"
-    assert caplog.records[1].message == "error2"
+def test_get_tracking_index_at_date(monkeypatch):
+    track_directive = journal.builder.directives.TrackDirective(
+        dt.date(2021, 1, 1), "habit1", 1, {}, models.Frequency("* * *"), False
+    )
+    untrack_directive = journal.builder.directives.UntrackDirective(
+        dt.date(2021, 1, 2), "habit2", 2, {}
+    )
+    monkeypatch.setattr(
+        journal.storage.cache,
+        "iter_directives",
+        lambda x, on_error: iter([track_directive, untrack_directive]),
+    )
+    index, first_record_date = journal.get_tracking_index_at_date(
+        "journal_file", dt.date(2021, 1, 1)
+    )
+    assert first_record_date is None
+    assert [
+        interval.track_directive
+        for interval in index.get_tracked_at(dt.date(2021, 1, 1))
+    ] == [track_directive]
+
+    with pytest.raises(SystemExit):
+        journal.get_tracking_index_at_date("journal_file", dt.date(2021, 1, 2))
+
+
+def test_get_checkpoint_at_date(monkeypatch):
+    track_directive = journal.builder.directives.TrackDirective(
+        dt.date(2021, 1, 1), "habit1", 1, {}, models.Frequency("* * *"), False
+    )
+    record_directive = journal.builder.directives.RecordDirective(
+        dt.date(2021, 2, 1), "habit1", 2, True, {}
+    )
+    untrack_directive = journal.builder.directives.UntrackDirective(
+        dt.date(2021, 2, 2), "habit2", 3, {}
+    )
+    checkpoint = journal.builder.Checkpoint(
+        dt.date(2021, 1, 31),
+        {"habit1": models.Habit("habit1", models.Frequency("* * *"))},
+        {"habit1": dt.date(2021, 1, 1)},
+    )
+
+    def load_checkpoint(journal_file, date, on_error):
+        if date < dt.date(2021, 1, 31):
+            return None, [track_directive, record_directive, untrack_directive]
+        return checkpoint, [record_directive, untrack_directive]
+
+    monkeypatch.setattr(journal.storage.cache, "load_checkpoint", load_checkpoint)
+    assert journal.get_checkpoint_at_date(
+        "journal_file", dt.date(2021, 2, 1)
+    ) == journal.builder.Checkpoint(
+        dt.date(2021, 2, 1),
+        checkpoint.tracked_habits,
+        checkpoint.tracking_start_dates,
+        {"habit1": dt.date(2021, 2, 1)},
+    )
+    assert journal.get_checkpoint_at_date(
+        "journal_file", dt.date(2021, 1, 1)
+    ) == journal.builder.Checkpoint(
+        dt.date(2021, 1, 1),
+        checkpoint.tracked_habits,
+        checkpoint.tracking_start_dates,
+    )
+
+    with pytest.raises(SystemExit):
+        journal.get_checkpoint_at_date("journal_file", dt.date(2021, 2, 2))
 
 
 def test_fill_day(monkeypatch):
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], [], []))
+    monkeypatch.setattr(
+        journal, "get_checkpoint_at_date", lambda x, y: journal.builder.Checkpoint(y)
+    )
     assert journal._fill_day("journal_file", dt.date(2021, 1, 1)) == ([], False)
 
-    habits = [models.Habit("habit1", models.Frequency("* * *"))]
-    records = []
-    habits_records_matches = []
+    habits = {"habit1": models.Habit("habit1", models.Frequency("* * *"))}
+    last_record_dates = {}
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: (habits, records, habits_records_matches),
+        "get_checkpoint_at_date",
+        lambda x, y: journal.builder.Checkpoint(
+            y, habits, {"habit1": dt.date(2021, 1, 1)}, last_record_dates
+        ),
     )
     assert journal._fill_day("journal_file", dt.date(2021, 1, 1)) == (
         [models.HabitRecord(dt.date(2021, 1, 1), "habit1", None)],
@@ -106,32 +217,36 @@ def test_fill_day(monkeypatch):
         mock_input.assert_called_once()
         mock_input.reset_mock()
 
-    records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)]
-    monkeypatch.setattr(
-        journal,
-        "get_state_at_date",
-        lambda x, y: (habits, records, habits_records_matches),
-    )
+    last_record_dates["habit1"] = dt.date(2021, 1, 1)
     assert journal._fill_day("journal_file", dt.date(2021, 1, 1)) == ([], False)
-
-    records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", False)]
-    monkeypatch.setattr(
-        journal,
-        "get_state_at_date",
-        lambda x, y: (habits, records, habits_records_matches),
+    assert journal._fill_day("journal_file", dt.date(2021, 1, 2)) == (
+        [models.HabitRecord(dt.date(2021, 1, 2), "habit1", None)],
+        False,
     )
-    assert journal._fill_day("journal_file", dt.date(2021, 1, 1)) == ([], False)
 
 
 @freeze_time("2021-01-02")
 def test_fill_range(monkeypatch):
-    mock_fill_day = mock.MagicMock()
-    mock_fill_day.side_effect = [
+    habits = {models.Habit("habit1", models.Frequency("* * *"))}
+    record = models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)
+
+    def iter_states(journal_file, start_date, end_date):
+        records = []
+        date = start_date
+        while date <= end_date:
+            if date == dt.date(2021, 1, 2):
+                records.append(record)
+            yield date, habits, records
+            date += dt.timedelta(days=1)
+
+    monkeypatch.setattr(journal, "iter_states", iter_states)
+    mock_fill_state = mock.MagicMock()
+    mock_fill_state.side_effect = [
         (["record1"], False),
         (["record2"], False),
         (["record3"], False),
     ]
-    monkeypatch.setattr(journal, "_fill_day", mock_fill_day)
+    monkeypatch.setattr(journal, "_fill_state", mock_fill_state)
     assert journal._fill_range(
         "journal_file", dt.date(2021, 1, 1), dt.date(2021, 1, 3)
     ) == [
@@ -139,16 +254,16 @@ def test_fill_range(monkeypatch):
         "record2",
         "record3",
     ]
-    journal._fill_day.assert_has_calls(
+    journal._fill_state.assert_has_calls(
         [
-            mock.call("journal_file", dt.date(2021, 1, 1), False),
-            mock.call("journal_file", dt.date(2021, 1, 2), False),
-            mock.call("journal_file", dt.date(2021, 1, 3), False),
+            mock.call(dt.date(2021, 1, 1), habits, {"habit1": record.date}, False),
+            mock.call(dt.date(2021, 1, 2), habits, {"habit1": record.date}, False),
+            mock.call(dt.date(2021, 1, 3), habits, {"habit1": record.date}, False),
         ]
     )
 
-    mock_fill_day.reset_mock()
-    mock_fill_day.side_effect = [
+    mock_fill_state.reset_mock()
+    mock_fill_state.side_effect = [
         (["record1"], False),
         (["record2"], False),
         (["record3"], False),
@@ -158,15 +273,13 @@ def test_fill_range(monkeypatch):
         "record1",
         "record2",
     ]
-    journal._fill_day.assert_has_calls(
-        [
-            mock.call("journal_file", dt.date(2021, 1, 2), False),
-            mock.call("journal_file", dt.date(2021, 1, 3), False),
-        ]
-    )
+    assert [call.args[0] for call in mock_fill_state.call_args_list] == [
+        dt.date(2021, 1, 2),
+        dt.date(2021, 1, 3),
+    ]
 
-    mock_fill_day.reset_mock()
-    mock_fill_day.side_effect = [
+    mock_fill_state.reset_mock()
+    mock_fill_state.side_effect = [
         (["record1"], False),
         (["record2"], False),
         (["record3"], False),
@@ -175,24 +288,17 @@ def test_fill_range(monkeypatch):
         "record1",
         "record2",
     ]
-    journal._fill_day.assert_has_calls(
-        [
-            mock.call("journal_file", dt.date(2021, 1, 1), False),
-            mock.call("journal_file", dt.date(2021, 1, 2), False),
-        ]
-    )
-
-    mock_fill_day.reset_mock()
-    mock_fill_day.side_effect = [
-        (["record1"], False),
-        (["record2"], False),
-        (["record3"], False),
+    assert [call.args[0] for call in mock_fill_state.call_args_list] == [
+        dt.date(2021, 1, 1),
+        dt.date(2021, 1, 2),
     ]
+
+    mock_fill_state.reset_mock()
     assert journal._fill_range("journal_file", None, None) == []
-    journal._fill_day.assert_not_called()
+    journal._fill_state.assert_not_called()
 
-    mock_fill_day.reset_mock()
-    mock_fill_day.side_effect = [
+    mock_fill_state.reset_mock()
+    mock_fill_state.side_effect = [
         (["record1"], False),
         (["record2"], True),
         (["record3"], False),
@@ -203,12 +309,35 @@ def test_fill_range(monkeypatch):
         "record1",
         "record2",
     ]
-    journal._fill_day.assert_has_calls(
-        [
-            mock.call("journal_file", dt.date(2021, 1, 1), False),
-            mock.call("journal_file", dt.date(2021, 1, 2), False),
-        ]
+    assert mock_fill_state.call_count == 2
+
+
+def test_iter_states(monkeypatch):
+    track_directive = journal.builder.directives.TrackDirective(
+        dt.date(2021, 1, 1), "habit1", 1, {}, models.Frequency("* * *"), False
     )
+    record_directive = journal.builder.directives.RecordDirective(
+        dt.date(2021, 1, 2), "habit1", 2, 1.0, {}
+    )
+    n_reads = 0
+
+    def iter_directives(x, on_error):
+        nonlocal n_reads
+        n_reads += 1
+        yield track_directive
+        yield record_directive
+
+    monkeypatch.setattr(journal.storage.cache, "iter_directives", iter_directives)
+    states = journal.iter_states(
+        "journal_file", dt.date(2021, 1, 1), dt.date(2021, 1, 3)
+    )
+    date, tracked_habits, records = next(states)
+    assert date == dt.date(2021, 1, 1)
+    assert [habit.name for habit in tracked_habits] == ["habit1"]
+    assert records == []
+    with pytest.raises(SystemExit):
+        next(states)
+    assert n_reads == 1
 
 
 def test_fill(monkeypatch):
@@ -238,7 +367,9 @@ def test_get_first_date(monkeypatch):
 
 
 def test_filter_state(monkeypatch):
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], [], []))
+    monkeypatch.setattr(
+        journal, "get_tracking_index_at_date", lambda *args: _tracking_index([], [])
+    )
     assert journal._filter_state(
         "journal_file", None, dt.date(2021, 1, 1), None, {}
     ) == (
@@ -281,8 +412,8 @@ def test_filter_state(monkeypatch):
     ]
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: (tracked_habits, records, habits_records_matches),
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, habits_records_matches),
     )
     assert journal._filter_state(
         "journal_file", None, dt.date(2024, 1, 1), None, {}
@@ -375,24 +506,38 @@ def test_filter_state(monkeypatch):
 
 
 def test_filter(monkeypatch):
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], [], []))
+    monkeypatch.setattr(
+        journal, "get_tracking_index_at_date", lambda *args: _tracking_index([], [])
+    )
     assert journal.filter("journal_file", None, dt.date(2021, 1, 1), None, {}) == []
 
     records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)]
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], records, []))
+    monkeypatch.setattr(
+        journal,
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, []),
+    )
     assert (
         journal.filter("journal_file", None, dt.date(2021, 1, 1), None, {}) == records
     )
 
     records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)]
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], records, []))
+    monkeypatch.setattr(
+        journal,
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, []),
+    )
     assert (
         journal.filter("journal_file", None, dt.date(2021, 1, 1), "habit1", {})
         == records
     )
 
     records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)]
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], records, []))
+    monkeypatch.setattr(
+        journal,
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, []),
+    )
     assert (
         journal.filter(
             "journal_file", dt.date(2021, 1, 1), dt.date(2021, 1, 1), "habit1", {}
@@ -401,7 +546,11 @@ def test_filter(monkeypatch):
     )
 
     records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)]
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], records, []))
+    monkeypatch.setattr(
+        journal,
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, []),
+    )
     assert (
         journal.filter(
             "journal_file", dt.date(2021, 1, 2), dt.date(2021, 1, 2), "habit1", {}
@@ -410,7 +559,11 @@ def test_filter(monkeypatch):
     )
 
     records = [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)]
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], records, []))
+    monkeypatch.setattr(
+        journal,
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, []),
+    )
     assert (
         journal.filter(
             "journal_file", dt.date(2021, 1, 1), dt.date(2021, 1, 1), "habit2", {}
@@ -422,7 +575,11 @@ def test_filter(monkeypatch):
         models.HabitRecord(dt.date(2021, 1, 1), "habit1", True, {"note": "note"}),
         models.HabitRecord(dt.date(2021, 1, 1), "habit1", True, {"note": "note2"}),
     ]
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], records, []))
+    monkeypatch.setattr(
+        journal,
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(records, []),
+    )
     assert journal.filter(
         "journal_file",
         dt.date(2021, 1, 1),
@@ -432,9 +589,141 @@ def test_filter(monkeypatch):
     ) == [models.HabitRecord(dt.date(2021, 1, 1), "habit1", True, {"note": "note"})]
 
 
+def test_to_frame(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        journal.storage.cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata")
+    )
+    journal_file = str(tmp_path / "habits.journal")
+    with open(journal_file, "w") as file:
+        file.write(
+            '2024-01-01 track "Read" (* * *)\n'
+            '2024-01-01 track "Run" (* * 1) measurable\n'
+            '2024-01-02 "Read" place:home yes\n'
+            '2024-01-02 "Run" 2.5\n'
+            '2024-01-03 "Read" no\n'
+        )
+
+    frame = journal.to_frame(journal_file, None, dt.date(2024, 1, 3), None, None)
+    assert list(frame["habit"]) == ["Read", "Run", "Read"]
+    assert list(frame["value"]) == [1.0, 2.5, 0.0]
+    assert list(frame["interval"]) == [0, 1, 0]
+    assert list(frame["place"].astype(object).fillna("")) == ["home", "", ""]
+
+    frame = journal.to_frame(
+        journal_file, dt.date(2024, 1, 3), dt.date(2024, 1, 3), ("Read",), None
+    )
+    assert list(frame.columns) == ["date", "habit", "value", "interval"]
+    assert list(frame["value"]) == [0.0]
+
+    for ignore_missing in (False, True):
+        infos = journal.info(
+            journal_file, None, dt.date(2024, 1, 8), None, None, ignore_missing
+        )
+        completion = journal.get_completion_frame(
+            journal_file, None, dt.date(2024, 1, 8), None, None, ignore_missing
+        )
+        assert [
+            (
+                info.habit.name,
+                info.n_records,
+                info.n_records_expected,
+                info.average_value,
+                info.start_date,
+                info.end_date,
+            )
+            for info in infos
+        ] == [
+            (
+                habit,
+                n_records,
+                n_records_expected,
+                round(average_value, 2),
+                start_date.date(),
+                end_date.date(),
+            )
+            for (
+                habit,
+                n_records,
+                n_records_expected,
+                average_value,
+                start_date,
+                end_date,
+            ) in completion.itertuples(index=False)
+        ]
+
+    assert journal.get_completion_frame(
+        journal_file, None, dt.date(2023, 12, 31), None, None
+    ).empty
+
+
 def test_check(monkeypatch):
-    monkeypatch.setattr(journal, "get_state_at_date", lambda x, y: ([], [], []))
+    track_directive = journal.builder.directives.TrackDirective(
+        dt.date(2021, 1, 1), "habit1", 1, {}, models.Frequency("* * *"), False
+    )
+    record_directive = journal.builder.directives.RecordDirective(
+        dt.date(2021, 1, 2), "habit1", 2, 1.0, {}
+    )
+    monkeypatch.setattr(
+        journal.storage.cache,
+        "load_checkpoint",
+        lambda x, y, on_error: (None, [track_directive, record_directive]),
+    )
     assert journal.check("journal_file", dt.date(2021, 1, 1)) is True
+    with pytest.raises(SystemExit):
+        journal.check("journal_file", dt.date(2021, 1, 2))
+
+
+def test_compile(monkeypatch, tmp_path, caplog):
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text('2024-01-01 track "Read" (* * *)\n2024-01-02 invalid\n')
+    sidecar_path, n_directives = journal.compile(str(journal_file))
+    assert (sidecar_path, n_directives) == (str(journal_file) + ".hbtxtc", 1)
+    assert [r.message for r in caplog.records] == [
+        "Error parsing line 2: Invalid directive type: invalid"
+    ]
+    assert journal.compiled.load(sidecar_path, journal.config.snapshot()) == (
+        journal.parser.parse_file(str(journal_file))
+    )
+
+
+def test_sync(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(
+        journal.storage.cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata")
+    )
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text(
+        '2024-01-01 track "Read" (* * *)\n'
+        '2024-01-01 track "Run" (* * *)\n'
+        '2024-01-02 "Read" place:home yes\n'
+        '2024-01-03 "Run" place:home yes\n'
+        '2024-01-04 "Read" place:work no\n'
+        "2024-01-05 invalid\n"
+    )
+    end_date = dt.date(2024, 1, 10)
+    queries = [
+        lambda: journal.filter(str(journal_file), None, end_date, ("Read",), None),
+        lambda: journal.filter(
+            str(journal_file), dt.date(2024, 1, 3), end_date, None, {"place": "home"}
+        ),
+        lambda: journal.info(str(journal_file), None, end_date, ("Read",), None),
+        lambda: journal.info(
+            str(journal_file), None, end_date, None, {"place": "home"}
+        ),
+        lambda: journal.tracked(str(journal_file), end_date),
+    ]
+    results = [query() for query in queries]
+
+    database_path, n_directives = journal.sync(str(journal_file))
+    assert (database_path, n_directives) == (str(journal_file) + ".sqlite", 5)
+    assert caplog.records[-1].message == (
+        "Error parsing line 6: Invalid directive type: invalid"
+    )
+    stat = journal_file.stat()
+    os.utime(journal_file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    assert isinstance(
+        journal.storage.get_storage(str(journal_file)), journal.storage.SqliteStorage
+    )
+    assert [query() for query in queries] == results
 
 
 def test_info(monkeypatch):
@@ -449,8 +738,8 @@ def test_info(monkeypatch):
     )
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: ([habit1], [record11, record12], [habit_record_matches1]),
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index([record11, record12], [habit_record_matches1]),
     )
 
     info = journal.info("journal_file", None, dt.date(2021, 1, 3), None, {})
@@ -475,18 +764,16 @@ def test_info(monkeypatch):
     record22 = models.HabitRecord(dt.date(2021, 1, 2), "habit2", True)
     record24 = models.HabitRecord(dt.date(2021, 1, 4), "habit2", True)
     tracking_start_date2 = dt.date(2021, 1, 1)
-    tracking_end_date2 = dt.date(2021, 1, 4)
+    tracking_end_date2 = None
 
     habit_record_matches2 = models.HabitRecordMatch(
         habit2, [record21, record22, record24], tracking_start_date2, tracking_end_date2
     )
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: (
-            [habit2],
-            [record21, record22, record24],
-            [habit_record_matches2],
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(
+            [record21, record22, record24], [habit_record_matches2]
         ),
     )
 
@@ -508,7 +795,7 @@ def test_info(monkeypatch):
     record32 = models.HabitRecord(dt.date(2021, 1, 2), "habit3", 10)
     record34 = models.HabitRecord(dt.date(2021, 1, 4), "habit3", 20)
     tracking_start_date3 = dt.date(2021, 1, 1)
-    tracking_end_date3 = dt.date(2021, 1, 4)
+    tracking_end_date3 = None
 
     habit_record_matches3 = models.HabitRecordMatch(
         habit3, [record31, record32, record34], tracking_start_date3, tracking_end_date3
@@ -516,11 +803,9 @@ def test_info(monkeypatch):
 
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: (
-            [habit3],
-            [record31, record32, record34],
-            [habit_record_matches3],
+        "get_tracking_index_at_date",
+        lambda *args: _tracking_index(
+            [record31, record32, record34], [habit_record_matches3]
         ),
     )
 
@@ -531,6 +816,194 @@ def test_info(monkeypatch):
     assert info[0].latest_streak == 1
 
 
+def test_info_jobs(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        journal.storage.cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata")
+    )
+    journal_file = str(tmp_path / "habits.journal")
+    lines = [f'2024-01-01 track "Habit {i}" (* * {i % 7})' for i in range(10)]
+    lines += [
+        f'2024-01-{day:02} "Habit {i}" {"yes" if (day + i) % 3 else "no"}'
+        for day in range(2, 29)
+        for i in range(10)
+    ]
+    lines += ['2024-01-29 untrack "Habit 3"', '2024-02-05 track "Habit 3" (* * *)']
+    with open(journal_file, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+    for ignore_missing in (False, True):
+        infos = journal.info(
+            journal_file, None, dt.date(2024, 2, 10), None, None, ignore_missing
+        )
+        assert len(infos) == 11
+        assert (
+            journal.info(
+                journal_file,
+                None,
+                dt.date(2024, 2, 10),
+                None,
+                None,
+                ignore_missing,
+                jobs=3,
+            )
+            == infos
+        )
+
+    assert journal._split_batches(list(range(5)), 3) == [[0], [1, 2], [3, 4]]
+    assert journal._split_batches([1], 4) == [[1]]
+
+
+def test_get_interval_completions(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        journal.storage.cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata")
+    )
+    journal_file = str(tmp_path / "habits.journal")
+    with open(journal_file, "w") as file:
+        file.write(
+            '2024-01-01 track "Read" (* * *)\n'
+            '2024-01-01 track "Run" (* * 1) measurable\n'
+            '2024-01-02 "Read" yes\n'
+            '2024-01-03 "Read" place:home no\n'
+            '2024-01-08 "Run" 2.5\n'
+            '2024-01-09 "Read" place:home yes\n'
+            '2024-01-10 untrack "Read"\n'
+            '2024-01-15 "Run" 3\n'
+            '2024-01-16 track "Read" (* * *)\n'
+            '2024-01-17 "Read" yes\n'
+        )
+    end_date = dt.date(2024, 1, 17)
+
+    for start_date, habit_name, metadata, ignore_missing in [
+        (None, None, None, False),
+        (dt.date(2024, 1, 3), None, None, True),
+        (None, ("Read",), {"place": "home"}, False),
+    ]:
+        completions = journal.get_interval_completions(
+            journal_file,
+            "weekly",
+            start_date,
+            end_date,
+            habit_name,
+            metadata,
+            ignore_missing,
+        )
+        assert completions
+        for interval_start, interval_completions in completions.items():
+            infos = journal.info(
+                journal_file,
+                interval_start,
+                interval_start + dt.timedelta(days=6),
+                habit_name,
+                metadata,
+                ignore_missing,
+            )
+            assert [
+                (
+                    completion.habit,
+                    completion.n_records,
+                    completion.n_records_expected,
+                    completion.average_value,
+                    completion.start_date,
+                    completion.end_date,
+                )
+                for completion in interval_completions
+            ] == [
+                (
+                    info.habit,
+                    info.n_records,
+                    info.n_records_expected,
+                    info.average_value,
+                    info.start_date,
+                    info.end_date,
+                )
+                for info in infos
+            ]
+
+    completions = journal.get_interval_completions(
+        journal_file, "weekly", None, end_date, None, None
+    )
+    assert list(completions) == [
+        dt.date(2024, 1, 2),
+        dt.date(2024, 1, 9),
+        dt.date(2024, 1, 16),
+    ]
+    assert [
+        completion.average_value for completion in completions[dt.date(2024, 1, 2)]
+    ] == [
+        0.14,
+        1.25,
+    ]
+    assert (
+        journal.get_interval_completions(
+            journal_file, "monthly", None, dt.date(2023, 12, 31), None, None
+        )
+        == {}
+    )
+    for interval, start_date, interval_starts in [
+        ("daily", None, [2, 3, 8, 9, 15, 17]),
+        ("3d", None, [2, 8, 14, 17]),
+        ("monthly", None, [2]),
+        ("quarterly", dt.date(2023, 12, 20), [1]),
+    ]:
+        completions = journal.get_interval_completions(
+            journal_file, interval, start_date, end_date, None, None
+        )
+        assert list(completions) == [dt.date(2024, 1, day) for day in interval_starts]
+    completions = journal.get_interval_completions(
+        journal_file, "monthly", None, end_date, None, None
+    )
+    assert [
+        (completion.n_records, completion.n_records_expected, completion.end_date)
+        for completion in completions[dt.date(2024, 1, 2)]
+    ] == [
+        (3, 9, dt.date(2024, 1, 10)),
+        (2, 5, dt.date(2024, 1, 31)),
+        (1, 16, dt.date(2024, 1, 31)),
+    ]
+    with pytest.raises(ValueError):
+        journal.get_interval_completions(
+            journal_file, "fortnightly", None, end_date, None, None
+        )
+
+
+def test_get_rolling_completions(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        journal.storage.cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata")
+    )
+    journal_file = str(tmp_path / "habits.journal")
+    with open(journal_file, "w") as file:
+        file.write(
+            '2024-01-01 track "Read" (* * *)\n'
+            '2024-01-01 track "Run" (* * 1) measurable\n'
+            '2024-01-02 "Read" yes\n'
+            '2024-01-03 "Read" no\n'
+            '2024-01-08 "Run" 2.5\n'
+            '2024-01-09 "Read" yes\n'
+            '2024-01-10 untrack "Read"\n'
+        )
+    end_date = dt.date(2024, 1, 15)
+
+    completion = journal.get_rolling_completions(
+        journal_file, 7, None, end_date, None, None
+    )
+    assert list(completion.columns) == ["Read", "Run"]
+    assert completion.index[0] == pd.Timestamp(2024, 1, 2)
+    assert completion.index[-1] == pd.Timestamp(2024, 1, 15)
+    assert completion.loc["2024-01-08"].tolist() == pytest.approx([1 / 7, 2.5])
+    assert completion.loc["2024-01-14"].tolist() == pytest.approx([0.5, 2.5])
+    assert completion.loc["2024-01-15", "Read"] == 1.0
+    assert np.isnan(completion.loc["2024-01-02", "Run"])
+
+    completion = journal.get_rolling_completions(
+        journal_file, 7, None, end_date, ("Read",), None, ignore_missing=True
+    )
+    assert list(completion.columns) == ["Read"]
+    assert completion.loc["2024-01-08", "Read"] == 0.5
+    assert journal.get_rolling_completions(
+        journal_file, 7, None, dt.date(2023, 12, 31), None, None
+    ).empty
+
+
 def test_tracked(monkeypatch):
     habit1 = models.Habit("habit1", models.Frequency("* * *"))
     record11 = models.HabitRecord(dt.date(2021, 1, 1), "habit1", True)
@@ -550,11 +1023,9 @@ def test_tracked(monkeypatch):
     )
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: (
-            [habit1, habit2],
-            [record11, record12, record21, record22],
-            [habit_record_matches1, habit_record_matches2],
+        "get_checkpoint_at_date",
+        lambda x, y, with_records: journal.builder.get_checkpoint_at_date(
+            _directives([habit_record_matches1, habit_record_matches2]), y
         ),
     )
 
@@ -566,16 +1037,14 @@ def test_tracked(monkeypatch):
     assert tracked[1][1] == tracking_start_date2
 
     habit_record_matches1 = models.HabitRecordMatch(
-        habit1, [record11, record12], tracking_start_date1, dt.date(2021, 1, 3)
+        habit1, [record11], tracking_start_date1, dt.date(2021, 1, 2)
     )
 
     monkeypatch.setattr(
         journal,
-        "get_state_at_date",
-        lambda x, y: (
-            [habit1, habit2],
-            [record11, record12, record21, record22],
-            [habit_record_matches1, habit_record_matches2],
+        "get_checkpoint_at_date",
+        lambda x, y, with_records: journal.builder.get_checkpoint_at_date(
+            _directives([habit_record_matches1, habit_record_matches2]), y
         ),
     )
 
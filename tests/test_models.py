@@ -1,4 +1,7 @@
 import datetime as dt
+import pickle
+
+import pytest
 
 import habits_txt.models as models
 
@@ -85,3 +88,73 @@ def test_frequency_repr():
 
     frequency = models.Frequency("@daily")
     assert frequency.__repr__() == "@daily"
+
+
+def test_frequency_from_string():
+    frequency = models.Frequency.from_string("* * 1")
+    assert frequency is models.Frequency.from_string("* * 1")
+    assert frequency is models.Frequency.from_string("0 0 * * 1")
+    assert frequency == models.Frequency("* * 1")
+    assert hash(frequency) == hash(models.Frequency("* * 1"))
+    assert frequency != models.Frequency.from_string("* * 2")
+    assert pickle.loads(pickle.dumps(frequency)) is frequency
+
+    with pytest.raises(AttributeError):
+        frequency.cron_str = "* * *"
+
+    with pytest.raises(ValueError):
+        models.Frequency.from_string("invalid")
+    with pytest.raises(ValueError):
+        models.Frequency.from_string("* * * * *")
+
+
+def test_frequency_next_date_reuse():
+    frequency = models.Frequency.from_string("* * 1")
+    assert frequency.get_next_date(dt.date(2024, 1, 1)) == dt.date(2024, 1, 8)
+    assert frequency.get_next_date(dt.date(2023, 12, 31)) == dt.date(2024, 1, 1)
+    assert frequency.get_next_date(dt.date(2024, 1, 1)) == dt.date(2024, 1, 8)
+
+    # Expressions computed with croniter do not share state between lookups
+    frequency = models.Frequency.from_string("L * *")
+    assert frequency.get_next_date(dt.date(2024, 2, 10)) == dt.date(2024, 2, 29)
+    assert frequency.get_next_date(dt.date(2023, 2, 10)) == dt.date(2023, 2, 28)
+    assert models.Frequency("L * *").get_next_date(dt.date(2024, 2, 10)) == dt.date(
+        2024, 2, 29
+    )
+
+
+def test_frequency_get_n_dates_walk():
+    for cron_str in ("* * *", "* * 1,3,5", "1,15 * *", "13 * 5", "29 2 *"):
+        frequency = models.Frequency.from_string(cron_str)
+        start_date = dt.date(2023, 12, 30)
+        for end_date in (
+            dt.date(2023, 12, 29),
+            dt.date(2023, 12, 30),
+            dt.date(2024, 1, 15),
+            dt.date(2028, 3, 1),
+        ):
+            n_dates = 1
+            date = start_date
+            while date <= end_date:
+                date = frequency.get_next_date(date)
+                if date <= end_date:
+                    n_dates += 1
+            assert frequency.get_n_dates(start_date, end_date) == n_dates
+
+
+def test_frequency_get_dates():
+    for cron_str in ("* * *", "* * 1,3,5", "1,15 * *", "L * *", "* * 5#2"):
+        frequency = models.Frequency.from_string(cron_str)
+        start_date = dt.date(2023, 12, 30)
+        for end_date in (
+            dt.date(2023, 12, 29),
+            dt.date(2023, 12, 30),
+            dt.date(2024, 1, 15),
+            dt.date(2026, 3, 1),
+        ):
+            dates = []
+            date = frequency.get_next_date(start_date - dt.timedelta(days=1))
+            while date <= end_date:
+                dates.append(date.toordinal())
+                date = frequency.get_next_date(date)
+            assert frequency.get_dates(start_date, end_date).tolist() == dates
@@ -8,6 +8,8 @@ import habits_txt.parser as parser
 
 
 def test_parse_file(monkeypatch):
+    # Load the settings before mocking the files
+    settings = parser.config.snapshot()
     with mock.patch(
         "builtins.open",
         mock.mock_open(read_data="  2024-01-01 track 'Sample habit' (* * *)  "),
@@ -18,6 +20,7 @@ def test_parse_file(monkeypatch):
         parser._parse_directive.assert_called_once_with(
             "2024-01-01 track 'Sample habit' (* * *)",
             1,
+            settings,
         )
         assert len(errors) == 0
 
@@ -216,3 +219,258 @@ def test_handle_index_error_decorator():
 
     with pytest.raises(parser.exceptions.ParseError):
         _parse_value(["2024-01-01", "'habit name'", "10"])
+
+
+def test_parse_metadata():
+    directive_line = "2024-01-02 'Sample habit' meta1:value1 meta2:value2 yes"
+    assert parser.parse_metadata(directive_line) == {
+        "meta1": "value1",
+        "meta2": "value2",
+    }
+
+    assert parser.parse_metadata("2024-01-02 'Sample habit' yes") == {}
+
+    with pytest.raises(parser.exceptions.ParseError):
+        parser.parse_metadata("2024-01-02 'Sample habit' meta:value:other yes")
+
+    with pytest.raises(parser.exceptions.ParseError):
+        parser.parse_metadata("2024-01-02 'Sample habit' meta: yes")
+
+
+def test_tokenize_directive():
+    tokens = parser._tokenize_directive(
+        "2024-01-02 'Sample habit' meta:value yes", parser.defaults.DATE_FMT
+    )
+    assert tokens == parser._DirectiveTokens(
+        dt.date(2024, 1, 2),
+        parser.directives.DirectiveType.RECORD,
+        "Sample habit",
+        {"meta": "value"},
+        value=True,
+    )
+
+    tokens = parser._tokenize_directive(
+        f"2024-01-01 track 'Sample habit' (* * 1) {parser.defaults.MEASURABLE_KEYWORD}",
+        parser.defaults.DATE_FMT,
+    )
+    assert tokens == parser._DirectiveTokens(
+        dt.date(2024, 1, 1),
+        parser.directives.DirectiveType.TRACK,
+        "Sample habit",
+        {},
+        models.Frequency("* * 1"),
+        True,
+    )
+
+    tokens = parser._tokenize_directive(
+        "2024-01-03 untrack 'Sample habit'", parser.defaults.DATE_FMT
+    )
+    assert tokens == parser._DirectiveTokens(
+        dt.date(2024, 1, 3),
+        parser.directives.DirectiveType.UNTRACK,
+        "Sample habit",
+        {},
+    )
+
+    # Lines without the canonical shape, or with an invalid field, are left to
+    # the field-by-field tokenizer
+    assert (
+        parser._tokenize_directive(
+            "2024-01-01 track x 'Sample habit' (* * *)", parser.defaults.DATE_FMT
+        )
+        is None
+    )
+    assert (
+        parser._tokenize_directive(
+            "2024-01-01 invalid 'Sample habit' 5", parser.defaults.DATE_FMT
+        )
+        is None
+    )
+    assert (
+        parser._tokenize_directive(
+            "2024-01-01 'Sample habit' a", parser.defaults.DATE_FMT
+        )
+        is None
+    )
+    assert (
+        parser._tokenize_directive(
+            "2024-01-0 'Sample habit' yes", parser.defaults.DATE_FMT
+        )
+        is None
+    )
+    assert (
+        parser._tokenize_directive(
+            "2024-01-01 track 'Sample (habit)' (* * *)", parser.defaults.DATE_FMT
+        )
+        is None
+    )
+
+
+def test_tokenize_directive_by_fields():
+    directive_lines = [
+        "2024-01-01 track 'Sample habit' (* * *) meta:value",
+        "2024-01-01 track 'Sample habit' (* * 1,3) measurable",
+        "2024-01-02 'Sample habit' yes",
+        "2024-01-02 record 'Sample habit' meta:value 2.5",
+        "2024-01-03 untrack 'Sample habit'",
+    ]
+    for directive_line in directive_lines:
+        assert parser._tokenize_directive_by_fields(
+            directive_line, parser.defaults.DATE_FMT
+        ) == parser._tokenize_directive(directive_line, parser.defaults.DATE_FMT)
+
+    tokens = parser._tokenize_directive_by_fields(
+        "2024-01-01 track x 'Sample habit' (* * *)", parser.defaults.DATE_FMT
+    )
+    assert tokens.habit_name == "Sample habit"
+
+    with pytest.raises(parser.exceptions.ParseError) as e:
+        parser._tokenize_directive_by_fields(
+            "2024-01-01 invalid 'Sample habit' 5", parser.defaults.DATE_FMT
+        )
+    assert e.value.message == "Invalid directive type: invalid"
+
+    with pytest.raises(parser.exceptions.ParseError) as e:
+        parser._tokenize_directive_by_fields(
+            "2024-01-01 'Sample habit' a", parser.defaults.DATE_FMT
+        )
+    assert e.value.message == "Value must be a boolean or a number: a"
+
+
+def test_get_date_matcher():
+    assert parser._get_date_matcher("%Y-%m-%d") is parser._match_iso_date
+    assert parser._get_date_matcher("%d/%m/%Y").func is parser._match_date_fields
+    assert parser._get_date_matcher("%d %b %Y").func is parser._match_date_strptime
+    assert parser._get_date_matcher("%Y.%m.%d").func is parser._match_date_strptime
+
+
+def test_match_date():
+    directive_lines = {
+        "%Y-%m-%d": ["2024-01-31 'a' yes", "2024-02-30 'a' yes", "2024-13-01 'a' yes"],
+        "%d/%m/%Y": ["31/01/2024 'a' yes", "30/02/2024 'a' yes", "2024-01-31 'a' yes"],
+        "%m-%d-%y": ["01-31-24 'a' yes", "01-31-99 'a' yes", "02-30-24 'a' yes"],
+        "%d %b %Y": [
+            "31 Jan 2024 'a' yes",
+            "30 Feb 2024 'a' yes",
+            "31/01/2024 'a' yes",
+        ],
+    }
+    for date_fmt, lines in directive_lines.items():
+        for directive_line in lines:
+            try:
+                expected = parser._match_date_strptime(date_fmt, directive_line)
+            except parser.exceptions.ParseError as e:
+                with pytest.raises(parser.exceptions.ParseError) as e_fast:
+                    parser._match_date(directive_line, date_fmt)
+                assert e_fast.value.message == e.message
+            else:
+                assert parser._match_date(directive_line, date_fmt) == expected
+
+    assert parser._match_date("2024-01-31 'a' yes", "%Y-%m-%d") == (
+        dt.date(2024, 1, 31),
+        10,
+    )
+    assert parser._match_date("01-31-99 'a' yes", "%m-%d-%y") == (
+        dt.date(1999, 1, 31),
+        8,
+    )
+    with pytest.raises(parser.exceptions.ParseError) as excinfo:
+        parser._match_date("2024-02-30 'a' yes", "%Y-%m-%d")
+    assert excinfo.value.message == "Found a date but it is invalid: 2024-02-30"
+
+
+def test_iter_directives(tmp_path):
+    journal_file = tmp_path / "example.journal"
+    journal_file.write_text(
+        "2024-01-01 track 'Sample habit' (* * *)\n"
+        "# comment\n"
+        "\n"
+        "2024-01-02 'Sample habit' invalid\n"
+        "  2024-01-03 'Sample habit' yes  \n"
+    )
+
+    errors = []
+    directives = parser.iter_directives(str(journal_file), errors.append)
+    assert next(directives) == parser.directives.TrackDirective(
+        dt.date(2024, 1, 1), "Sample habit", 1, {}, models.Frequency("* * *"), False
+    )
+    assert errors == []
+    record_directive = next(directives)
+    assert record_directive == parser.directives.RecordDirective(
+        dt.date(2024, 1, 3), "Sample habit", 5, True, {}
+    )
+    assert record_directive.lineno == 5
+    assert errors == [
+        "Error parsing line 4: Value must be a boolean or a number: invalid"
+    ]
+    assert list(directives) == []
+
+    with open(journal_file) as file:
+        assert len(list(parser.iter_directives(file))) == 2
+
+
+def test_split_chunks():
+    data = b"line1\nline2\nline3\nline4"
+    assert parser._split_chunks(data, 1) == [data]
+    assert parser._split_chunks(data, 2) == [b"line1\nline2\n", b"line3\nline4"]
+    assert parser._split_chunks(data, 4) == [
+        b"line1\n",
+        b"line2\n",
+        b"line3\n",
+        b"line4",
+    ]
+    assert parser._split_chunks(b"line1\nline2\n", 10) == [b"line1\n", b"line2\n"]
+    assert parser._split_chunks(b"", 4) == [b""]
+
+
+def test_count_lines():
+    assert parser._count_lines(b"") == 0
+    assert parser._count_lines(b"a\nb\n") == 2
+    assert parser._count_lines(b"a\nb") == 2
+    assert parser._count_lines(b"a\r\nb\rc\n\n") == 4
+
+
+def test_parse_bytes(monkeypatch):
+    data = (
+        b"2024-01-01 track 'Sample habit' (* * *)\n"
+        b"# comment\r\n"
+        b"2024-01-02 'Sample habit' invalid\r"
+        b"2024-01-03 'Sample habit' yes\n"
+        b"\n"
+        b"2024-01-04 invalid\n"
+        b"2024-01-05 'Sample habit' no"
+    )
+    errors = []
+    directives, n_lines = parser.parse_bytes(data, errors.append, 10)
+    assert n_lines == 7
+    assert [d.lineno for d in directives] == [10, 13, 16]
+    assert errors == [
+        "Error parsing line 12: Value must be a boolean or a number: invalid",
+        "Error parsing line 15: Invalid directive type: invalid",
+    ]
+
+    monkeypatch.setattr(parser, "_MIN_CHUNK_SIZE", 1)
+    parser.set_jobs(3)
+    try:
+        parallel_errors = []
+        parallel_directives, parallel_n_lines = parser.parse_bytes(
+            data, parallel_errors.append, 10
+        )
+    finally:
+        parser.set_jobs(None)
+    assert parallel_n_lines == n_lines
+    assert [(d, d.lineno) for d in parallel_directives] == [
+        (d, d.lineno) for d in directives
+    ]
+    assert parallel_errors == errors
+
+
+def test_get_jobs(monkeypatch):
+    monkeypatch.setattr(parser.os, "cpu_count", lambda: 8)
+    assert parser._get_jobs(1000) == 1
+    assert parser._get_jobs(parser.PARALLEL_THRESHOLD) == 8
+    assert parser._get_jobs(3 * parser._MIN_CHUNK_SIZE) == 1
+
+    monkeypatch.setattr(parser, "_jobs", 4)
+    assert parser._get_jobs(3 * parser._MIN_CHUNK_SIZE) == 3
+    assert parser._get_jobs(parser.PARALLEL_THRESHOLD) == 4
@@ -0,0 +1,115 @@
+import datetime as dt
+
+import numpy as np
+
+import habits_txt.directives as directives
+import habits_txt.models as models
+import habits_txt.record_table as record_table
+
+RECORDS = [
+    models.HabitRecord(dt.date(2024, 1, 3), "habit1", True, {"place": "home"}),
+    models.HabitRecord(dt.date(2024, 1, 1), "habit2", 2.5, {}),
+    models.HabitRecord(dt.date(2024, 1, 2), "habit1", False, {"place": "work"}),
+    models.HabitRecord(dt.date(2024, 1, 4), "habit2", None, {"place": "home"}),
+    models.HabitRecord(dt.date(2024, 1, 5), "habit1", None, {}),
+]
+
+
+def test_from_records():
+    table = record_table.RecordTable.from_records(RECORDS)
+    assert len(table) == 5
+    assert list(table) == RECORDS
+    assert table[1] == RECORDS[1]
+    assert table.dates.dtype == np.int32
+    assert table.values.dtype == np.float64
+    assert list(table.is_bool) == [True, False, True, False, False]
+    assert table.strings == ["habit1", "place", "home", "habit2", "work"]
+    assert table.metadata_sets == [(), ((1, 2),), ((1, 4),)]
+    assert list(table.metadata_ids) == [1, 0, 2, 1, 0]
+
+    record = table[0]
+    record.metadata["place"] = "work"
+    assert table[3].metadata == {"place": "home"}
+
+    assert list(record_table.RecordTable.from_records([])) == []
+
+
+def test_from_directives():
+    record_directives = [
+        directives.RecordDirective(
+            record.date, record.habit_name, i, record.value, record.metadata
+        )
+        for i, record in enumerate(RECORDS)
+    ]
+    table = record_table.RecordTable.from_directives(record_directives)
+    assert list(table) == RECORDS
+
+
+def test_get_habit():
+    table = record_table.RecordTable.from_records(RECORDS)
+    assert list(table.get_habit_rows("habit1")) == [2, 0, 4]
+    assert list(table.get_habit("habit1")) == [RECORDS[2], RECORDS[0], RECORDS[4]]
+    assert list(table.get_habit("habit2")) == [RECORDS[1], RECORDS[3]]
+    assert list(table.get_habit("habit3")) == []
+    assert list(table.get_habit("place")) == []
+    assert table.get_habit("habit1").strings is table.strings
+
+
+def test_get_mask():
+    table = record_table.RecordTable.from_records(RECORDS)
+    assert list(table.get_mask()) == [True] * 5
+    assert list(table.get_mask(dt.date(2024, 1, 2), dt.date(2024, 1, 4))) == [
+        True,
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert list(table.get_mask(habit_names=("habit2", "habit3"))) == [
+        False,
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert list(
+        table.take(table.get_mask(habit_names=("habit1",), metadata={"place": "home"}))
+    ) == [RECORDS[0]]
+    assert not table.get_mask(metadata={"place": "garden"}).any()
+
+
+def test_get_min_date():
+    table = record_table.RecordTable.from_records(RECORDS)
+    assert table.get_min_date() == dt.date(2024, 1, 1)
+    assert record_table.RecordTable.from_records([]).get_min_date() is None
+
+
+def test_get_view():
+    table = record_table.RecordTable.from_records(RECORDS)
+    view = table.get_view("habit1", dt.date(2024, 1, 3))
+    assert view == [RECORDS[0], RECORDS[4]]
+    assert view.rows.base is not None
+    assert list(view.dates) == [
+        dt.date(2024, 1, 3).toordinal(),
+        dt.date(2024, 1, 5).toordinal(),
+    ]
+    assert table.get_view("habit1", end_date=dt.date(2024, 1, 2)) == [RECORDS[2]]
+    assert table.get_view("habit1", dt.date(2024, 1, 4), dt.date(2024, 1, 4)) == []
+    assert table.get_view("habit3") == []
+    assert table.get_view("habit1", metadata={"place": "home"}) == [RECORDS[0]]
+
+
+def test_record_view():
+    table = record_table.RecordTable.from_records(RECORDS)
+    view = table.filter(habit_names=("habit1",))
+    assert len(view) == 3
+    assert view[0] == RECORDS[0]
+    assert view[-1] == RECORDS[4]
+    assert view[1:] == [RECORDS[2], RECORDS[4]]
+    assert list(reversed(view)) == [RECORDS[4], RECORDS[2], RECORDS[0]]
+    assert view != [RECORDS[0]]
+    assert RECORDS[2] in view
+    assert repr(table.filter(metadata={"place": "work"})) == repr([RECORDS[2]])
+
+    view[0].metadata["place"] = "work"
+    assert view[0].metadata == {"place": "home"}
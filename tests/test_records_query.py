@@ -1,5 +1,7 @@
 import datetime as dt
 
+import numpy as np
+
 import habits_txt.models as models
 import habits_txt.records_query as records_query
 
@@ -153,3 +155,66 @@ def test_get_current_streak():
         ],
     )
     assert latest_streak == 4
+
+
+def test_get_streak_lengths():
+    completions = [
+        np.array([True, True, False, True, True, True, False, True]),
+        np.array([], dtype=bool),
+        np.array([False, False]),
+        np.array([True, True, True]),
+    ]
+    longest_streaks, latest_streaks = records_query.get_streak_lengths(completions)
+    assert longest_streaks.tolist() == [3, 0, 0, 3]
+    assert latest_streaks.tolist() == [1, 0, 0, 3]
+
+    longest_streaks, latest_streaks = records_query.get_streak_lengths([])
+    assert longest_streaks.tolist() == latest_streaks.tolist() == []
+
+
+def test_get_streaks():
+    start = dt.date(2024, 1, 1).toordinal()
+    completions = [
+        np.array([True, True, False, True, True, False]),
+        np.array([False, True, True]),
+        np.array([], dtype=bool),
+    ]
+    dates = [
+        np.arange(start, start + 12, 2),
+        np.arange(start, start + 3),
+        np.array([], dtype=np.int64),
+    ]
+    longest_streaks, latest_streaks = records_query.get_streaks(completions, dates)
+    assert longest_streaks == [
+        models.Streak(2, dt.date(2024, 1, 1), dt.date(2024, 1, 3)),
+        models.Streak(2, dt.date(2024, 1, 2), dt.date(2024, 1, 3)),
+        None,
+    ]
+    assert latest_streaks == [
+        None,
+        models.Streak(2, dt.date(2024, 1, 2), dt.date(2024, 1, 3)),
+        None,
+    ]
+
+
+def test_get_completions_with_missing():
+    completions = records_query.get_completions_with_missing(
+        np.array([1, 2, 5, 6]),
+        np.array([True, True, True, False]),
+        np.array([2, 3, 4, 6, 8]),
+    )
+    assert completions.tolist() == [True, True, False, True, False, False]
+
+    completions = records_query.get_completions_with_missing(
+        np.array([1, 3]), np.array([True, True]), np.array([3])
+    )
+    assert completions.tolist() == [True, True]
+    longest_streaks, latest_streaks = records_query.get_streak_lengths([completions])
+    assert longest_streaks.tolist() == latest_streaks.tolist() == [2]
+
+    completions = records_query.get_completions_with_missing(
+        np.array([], dtype=np.int64),
+        np.array([], dtype=bool),
+        np.array([1, 2]),
+    )
+    assert completions.tolist() == []
@@ -0,0 +1,160 @@
+import datetime as dt
+import os
+import sqlite3
+
+import pytest
+
+import habits_txt.builder as builder
+import habits_txt.exceptions as exceptions
+import habits_txt.storage as storage
+
+JOURNAL = """2024-01-01 track "Read" (* * *) author:me
+2024-01-01 track "Run" (* * 1) measurable
+2024-01-02 "Read" place:home yes
+2024-01-02 "Run" place:park 2.5
+2024-01-03 invalid
+2024-01-03 "Read" place:work no
+2024-01-04 "Run" 3
+2024-01-05 untrack "Run"
+"""
+
+
+@pytest.fixture
+def journal_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        storage.cache.defaults, "APPDATA_PATH", str(tmp_path / "appdata")
+    )
+    journal_file = tmp_path / "habits.journal"
+    journal_file.write_text(JOURNAL)
+    return journal_file
+
+
+def _sync(journal_file):
+    path, n_directives = storage.sync(journal_file)
+    # Make sure the database is newer than the journal on coarse clocks
+    stat = os.stat(journal_file)
+    os.utime(journal_file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    return path, n_directives
+
+
+def test_storage_abstract():
+    class IncompleteStorage(storage.Storage):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteStorage()
+
+
+def test_get_sqlite_path():
+    assert storage.get_sqlite_path("habits.journal") == "habits.journal.sqlite"
+
+
+def test_sync(journal_file, directive_key):
+    errors = []
+    assert isinstance(storage.get_storage(journal_file), storage.TextStorage)
+    text_directives = list(storage.get_storage(journal_file).iter_directives())
+
+    assert _sync(journal_file) == (str(journal_file) + ".sqlite", 7)
+    sqlite_storage = storage.get_storage(journal_file, errors.append)
+    assert isinstance(sqlite_storage, storage.SqliteStorage)
+    assert [directive_key(d) for d in sqlite_storage.iter_directives()] == [
+        directive_key(d) for d in text_directives
+    ]
+    assert errors == ["Error parsing line 5: Invalid directive type: invalid"]
+
+    journal_file.write_text(JOURNAL + '2024-01-06 "Read" yes\n')
+    assert isinstance(storage.get_storage(journal_file), storage.TextStorage)
+
+
+def test_close(journal_file):
+    with storage.get_storage(journal_file) as text_storage:
+        assert isinstance(text_storage, storage.TextStorage)
+
+    _sync(journal_file)
+    with storage.get_storage(journal_file) as sqlite_storage:
+        assert len(list(sqlite_storage.iter_directives())) == 7
+    with pytest.raises(sqlite3.ProgrammingError):
+        sqlite_storage.connection.execute("SELECT 1")
+
+
+def test_sync_settings(journal_file, monkeypatch):
+    _sync(journal_file)
+    monkeypatch.setattr(
+        storage.config,
+        "snapshot",
+        lambda: storage.config.Snapshot(date_fmt="%d/%m/%Y"),
+    )
+    assert isinstance(storage.get_storage(journal_file), storage.TextStorage)
+
+
+def test_select(journal_file):
+    _sync(journal_file)
+    sqlite_storage = storage.get_storage(journal_file)
+
+    selection = sqlite_storage.select(dt.date(2024, 1, 3), ("Read",))
+    assert selection.is_filtered
+    assert selection.first_record_date == dt.date(2024, 1, 2)
+    assert [d.lineno for d in selection.directives] == [1, 3, 6]
+
+    selection = sqlite_storage.select(dt.date(2024, 1, 5), metadata={"place": "home"})
+    assert [d.lineno for d in selection.directives] == [1, 2, 3, 8]
+
+    selection = sqlite_storage.select(
+        dt.date(2024, 1, 5), start_date=dt.date(2024, 1, 3)
+    )
+    assert [d.lineno for d in selection.directives] == [1, 2, 6, 7, 8]
+    assert selection.first_record_date == dt.date(2024, 1, 2)
+
+    selection = sqlite_storage.select(dt.date(2024, 1, 1))
+    assert [d.lineno for d in selection.directives] == [1, 2]
+    assert selection.first_record_date is None
+
+    checkpoint, directives_ = sqlite_storage.load_checkpoint(
+        dt.date(2024, 1, 4), with_records=False
+    )
+    assert checkpoint is None
+    assert [d.lineno for d in directives_] == [1, 2]
+
+    text_storage = storage.TextStorage(journal_file)
+    assert not text_storage.select(dt.date(2024, 1, 3), ("Read",)).is_filtered
+
+
+def test_select_consistency_error(journal_file):
+    journal_file.write_text(JOURNAL + '2024-01-06 "Run" 1.0\n')
+    _sync(journal_file)
+    sqlite_storage = storage.get_storage(journal_file)
+
+    assert len(sqlite_storage.select(dt.date(2024, 1, 5), ("Read",)).directives) == 3
+    with pytest.raises(exceptions.ConsistencyError) as e:
+        sqlite_storage.select(dt.date(2024, 1, 6), ("Read",))
+    assert e.value.message == (
+        "Consistency error in line 9: "
+        "Recorded habit without a corresponding track directive: Run"
+    )
+    with pytest.raises(exceptions.ConsistencyError):
+        sqlite_storage.load_checkpoint(dt.date(2024, 1, 6), with_records=False)
+
+
+def test_select_earliest_consistency_error(journal_file):
+    # The untrack error is reported first when validating the whole journal, but a query that
+    # stops before its date must still raise the earlier record error
+    journal_file.write_text(
+        '2024-01-01 track "A" (* * *)\n'
+        '2024-01-01 track "B" (* * *)\n'
+        '2024-01-02 "A" yes\n'
+        '2024-01-02 "A" no\n'
+        '2024-01-03 "B" yes\n'
+        '2024-03-01 untrack "C"\n'
+    )
+    text_directives = list(storage.TextStorage(journal_file).iter_directives())
+    _sync(journal_file)
+    sqlite_storage = storage.get_storage(journal_file)
+
+    assert len(sqlite_storage.select(dt.date(2024, 1, 1), ("B",)).directives) == 1
+    for date, lineno in [(dt.date(2024, 2, 1), 4), (dt.date(2024, 3, 1), 6)]:
+        with pytest.raises(exceptions.ConsistencyError) as text_error:
+            builder.validate(text_directives, date)
+        assert text_error.value.directive.lineno == lineno
+        with pytest.raises(exceptions.ConsistencyError) as sqlite_error:
+            sqlite_storage.select(date, ("B",))
+        assert sqlite_error.value.message == text_error.value.message